@@ -0,0 +1,220 @@
+"""
+Drop-in replacements for `djangorestframework_camel_case`'s renderers,
+parser & middleware, producing the exact same output.
+
+The library re-runs its regexes on every key of every dict of every
+response (and request). Here each distinct key is converted once, then
+looked up: the mapping is precomputed for every serializer field of the
+API & cached for any other key. Rows made of plain values, e.g. list
+results, are converted in a single pass without recursing into them.
+"""
+
+import json
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.core.files import File
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.settings import api_settings
+from djangorestframework_camel_case.util import (
+    camelize_re,
+    get_underscoreize_re,
+    is_iterable,
+    underscore_to_camel,
+)
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.settings import api_settings as drf_settings
+from rest_framework.utils import encoders
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+OPTIONS = api_settings.JSON_UNDERSCOREIZE
+IGNORE_FIELDS = frozenset(OPTIONS.get("ignore_fields") or ())
+IGNORE_KEYS = frozenset(OPTIONS.get("ignore_keys") or ())
+UNDERSCOREIZE_RE = get_underscoreize_re(OPTIONS)
+
+# Values a plain row may hold, which camelize() leaves untouched.
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=4096)
+def camelize_key(key: str) -> str:
+    return camelize_re.sub(underscore_to_camel, key) if "_" in key else key
+
+
+@lru_cache(maxsize=4096)
+def underscoreize_key(key: str) -> str:
+    return UNDERSCOREIZE_RE.sub(r"\1_\2", key).lower()
+
+
+def warm_up(serializer_classes) -> None:
+    """Precompute the key mapping of given serializers' fields."""
+    for serializer_class in serializer_classes:
+        for name in serializer_class().fields:
+            underscoreize_key(camelize_key(name))
+
+
+def _camelize_row(row: dict) -> dict | None:
+    """
+    Single pass camelize() of a flat dict (no ignored keys), or None if it
+    holds anything but plain values.
+    """
+
+    new_dict = OrderedDict()
+    for key, value in row.items():
+        if type(key) is not str or type(value) not in SCALAR_TYPES:
+            return None
+        new_dict[camelize_key(key)] = value
+    return new_dict
+
+
+def camelize(data):
+    """Same as `djangorestframework_camel_case.util.camelize()`."""
+    if isinstance(data, Promise):
+        data = force_str(data)
+    if isinstance(data, dict):
+        if not IGNORE_FIELDS and not IGNORE_KEYS and type(data) is not ReturnDict:
+            if (new_dict := _camelize_row(data)) is not None:
+                return new_dict
+
+        if isinstance(data, ReturnDict):
+            new_dict = ReturnDict(serializer=data.serializer)
+        else:
+            new_dict = OrderedDict()
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            new_key = camelize_key(key) if isinstance(key, str) else key
+
+            if key not in IGNORE_FIELDS and new_key not in IGNORE_FIELDS:
+                result = camelize(value)
+            else:
+                result = value
+            if key in IGNORE_KEYS or new_key in IGNORE_KEYS:
+                new_dict[key] = result
+            else:
+                new_dict[new_key] = result
+        return new_dict
+    if isinstance(data, SCALAR_TYPES):
+        return data
+    if is_iterable(data):
+        return [camelize(item) for item in data]
+    return data
+
+
+def underscoreize(data):
+    """Same as `djangorestframework_camel_case.util.underscoreize()`."""
+    if isinstance(data, dict):
+        if type(data) is MultiValueDict:
+            new_data = MultiValueDict()
+            for key in data:
+                new_data.setlist(underscoreize_key(key), data.getlist(key))
+            return new_data
+
+        new_dict = {}
+        items = data.lists() if isinstance(data, QueryDict) else data.items()
+        for key, value in items:
+            new_key = underscoreize_key(key) if isinstance(key, str) else key
+
+            if key not in IGNORE_FIELDS and new_key not in IGNORE_FIELDS:
+                result = underscoreize(value)
+            else:
+                result = value
+            if key in IGNORE_KEYS or new_key in IGNORE_KEYS:
+                new_dict[key] = result
+            else:
+                new_dict[new_key] = result
+
+        if isinstance(data, QueryDict):
+            new_query = QueryDict(mutable=True)
+            for key, value in new_dict.items():
+                new_query.setlist(key, value)
+            return new_query
+        return new_dict
+    if isinstance(data, SCALAR_TYPES) or isinstance(data, File):
+        return data
+    if is_iterable(data):
+        return [underscoreize(item) for item in data]
+    return data
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    def render(self, data, *args, **kwargs):
+        return super().render(camelize(data), *args, **kwargs)
+
+
+class CamelCaseBrowsableAPIRenderer(BrowsableAPIRenderer):
+    def render(self, data, *args, **kwargs):
+        return super().render(camelize(data), *args, **kwargs)
+
+
+class CamelCaseNDJSONRenderer(BaseRenderer):
+    """
+    Newline delimited JSON: one camelCase JSON object per line, encoded the
+    same way `CamelCaseJSONRenderer` encodes each of them.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+    # Rows encoded into each block handed over by `stream()`.
+    lines_per_block = 500
+
+    def __init__(self):
+        self.encoder = encoders.JSONEncoder(
+            ensure_ascii=not drf_settings.UNICODE_JSON,
+            allow_nan=not drf_settings.STRICT_JSON,
+            separators=(",", ":"),
+        )
+
+    def encode(self, data) -> str:
+        # U+2028/U+2029 are line breaks to `str.splitlines()` based readers
+        return (
+            self.encoder.encode(camelize(data))
+            .replace("\u2028", "\\u2028")
+            .replace("\u2029", "\\u2029")
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(rows))
+
+    def stream(self, rows: Iterable[dict]) -> Iterator[bytes]:
+        """Yield encoded lines of `rows`, `lines_per_block` at a time."""
+        rows = iter(rows)
+        while block := list(islice(rows, self.lines_per_block)):
+            yield "".join(f"{self.encode(row)}\n" for row in block).encode("utf-8")
+
+
+class CamelCaseJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read().decode(encoding)
+            return underscoreize(json.loads(data))
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class CamelCaseMiddleWare:
+    """
+    Rewrites camelCase query params into snake_case ones.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.GET = underscoreize(request.GET)
+        return self.get_response(request)
@@ -1,6 +1,8 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from apps.pages.models import Category, Transaction
+from apps.pages.search import search
 
 
 class TransactionFilter(filters.FilterSet):
@@ -42,3 +44,22 @@ class CategoryFilter(filters.FilterSet):
             "id",
             "name",
         ]
+
+
+class TransactionSearchFilter(SearchFilter):
+    """
+    `?search=` over the full-text index of Transaction remarks (every word
+    as a word prefix). Listed results are annotated with their relevance,
+    for `KeysetPagination` to order them by.
+    """
+
+    search_description = (
+        "Words the remarks must contain, each as a word prefix. Results are "
+        "ordered by relevance."
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        if not query.strip():
+            return queryset
+        return search(queryset, query, ranked=getattr(view, "action", None) == "list")
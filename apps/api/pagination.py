@@ -0,0 +1,200 @@
+import base64
+import json
+import operator
+from functools import reduce
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import FloatField, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from apps.pages.search import SEARCH_RANK
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique `ordering`.
+
+    Pages are fetched with `WHERE (ordering) < (position) LIMIT page_size + 1`
+    instead of an OFFSET, so every page costs the same index range scan no
+    matter how deep a client pages, and no COUNT(*) is ever issued. Cursors
+    are opaque (base64 encoded) positions of the first or last row served.
+    """
+
+    ordering = ("-date_time", "-id")
+    # Ordering of ranked search results, see `apps.pages.search`.
+    ranked_ordering = (f"-{SEARCH_RANK}", "-id")
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.page_ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.page_ordering
+        if reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(ordering, position))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_ordering(self, queryset: QuerySet) -> tuple[str, ...]:
+        if SEARCH_RANK in queryset.query.annotations:
+            return self.ranked_ordering
+        return self.ordering
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def _flip(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def seek(ordering: tuple[str, ...], position: list) -> Q:
+        """
+        Rows strictly after `position` in `ordering`, as
+        `a <= x AND (a < x OR (a = x AND b < y) ...)` for descending fields:
+        the leading non-strict bound keeps it an index range scan.
+        """
+
+        lookups = [
+            (field.lstrip("-"), "lt" if field.startswith("-") else "gt")
+            for field in ordering
+        ]
+        name, lookup = lookups[0]
+        after = reduce(
+            operator.or_,
+            (
+                Q(
+                    **{lookups[j][0]: position[j] for j in range(i)},
+                    **{f"{name}__{lookup}": position[i]},
+                )
+                for i, (name, lookup) in enumerate(lookups)
+            ),
+        )
+        return Q(**{f"{name}__{lookup}e": position[0]}) & after
+
+    def position_of(self, row) -> list:
+        names = [field.lstrip("-") for field in self.page_ordering]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        position = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in self.position_of(row)
+        ]
+        payload = json.dumps({"p": position, "r": reverse}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model) -> tuple[list | None, bool]:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            fields = [
+                # Annotations (i.e. the search rank) aren't model fields
+                FloatField() if name == SEARCH_RANK else model._meta.get_field(name)
+                for name in (field.lstrip("-") for field in self.page_ordering)
+            ]
+            position = [
+                field.to_python(value) for field, value in zip(fields, payload["p"])
+            ]
+            if len(position) != len(fields) or None in position:
+                raise ValueError
+            return position, bool(payload["r"])
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        example = "http://api.example.org/transactions/?" + urlencode(
+            {self.cursor_query_param: "eyJwIjpbXX0="}
+        )
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": example,
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": example,
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results to return per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,6 +1,20 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from apps.pages import categorization, fingerprints
 from apps.pages.models import Transaction, Category
+from apps.pages.search import SEARCH_RANK
+from apps.pages.series import BUCKETS, GROUP_BY_FIELDS
+from apps.pages.sync import Token, decode_token
+from .filters import TransactionFilter
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -13,12 +27,274 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Transaction
-        fields = "__all__"
+        # Internal, for duplicate detection & delta sync
+        exclude = ["fingerprint", "change_seq"]
 
     def get_category_name(self, obj: Transaction):
         return obj.category.name if obj and obj.category else None
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    `PrimaryKeyRelatedField` resolving pks against the instances prefetched
+    into `context["prefetched"][model]` by its parent list serializer, rather
+    than with one query per item.
+    """
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        prefetched = self.context.get("prefetched", {}).get(queryset.model)
+        if prefetched is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = queryset.model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return prefetched[pk]
+        except (KeyError, TypeError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TransactionBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates & creates many Transactions at once: every related pk of the
+    payload is resolved in a single `IN` query per foreign key, and rows are
+    inserted by batched `bulk_create()` within one DB transaction.
+
+    Errors are reported per item, in the payload's order, and nothing gets
+    created unless every item is valid. Items matching (the fingerprint of)
+    an existing Transaction are skipped & counted in `duplicates`, unless
+    the context's `skip_duplicates` is False.
+    """
+
+    batch_size = 1000
+    duplicates = 0
+
+    def prefetch_related(self, data: list) -> None:
+        """Fetch the instances of every pk referenced by `data`."""
+        prefetched = self._context.setdefault("prefetched", {})
+        for name, field in self.child.fields.items():
+            if not isinstance(field, PrefetchedPrimaryKeyRelatedField):
+                continue
+            queryset = field.get_queryset()
+            pks = set()
+            for item in data:
+                if not isinstance(item, dict) or isinstance(item.get(name), bool):
+                    continue
+                try:
+                    pks.add(queryset.model._meta.pk.to_python(item.get(name)))
+                except DjangoValidationError:
+                    continue
+            pks.discard(None)
+            prefetched[queryset.model] = queryset.in_bulk(pks) if pks else {}
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and (
+            self.max_length is None or len(data) <= self.max_length
+        ):
+            self.prefetch_related(data)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data: list[dict]) -> list[Transaction]:
+        objs = [Transaction(**attrs) for attrs in validated_data]
+        for obj in objs:
+            obj.fingerprint = fingerprints.instance_fingerprint(obj)
+
+        with transaction.atomic():
+            if self.context.get("skip_duplicates", True):
+                existing = Transaction.objects.existing_fingerprints(objs)
+                self.duplicates = len(objs)
+                objs = [obj for obj in objs if obj.fingerprint not in existing]
+                self.duplicates -= len(objs)
+            if categorized := categorization.categorize(objs):
+                # For `category_name`, in one query rather than one per row
+                categories = Category.objects.in_bulk(
+                    {obj.category_id for obj in categorized}
+                )
+                for obj in categorized:
+                    obj.category = categories[obj.category_id]
+            return Transaction.objects.bulk_create(objs, batch_size=self.batch_size)
+
+
+class TransactionBulkSerializer(TransactionSerializer):
+    """
+    Serializer for the items of a bulk create, see
+    `TransactionBulkListSerializer`.
+    """
+
+    category = PrefetchedPrimaryKeyRelatedField(
+        queryset=Category.objects.all(), allow_null=True, required=False
+    )
+    created_by = PrefetchedPrimaryKeyRelatedField(
+        queryset=get_user_model().objects.all()
+    )
+
+    class Meta(TransactionSerializer.Meta):
+        list_serializer_class = TransactionBulkListSerializer
+
+
+class TransactionBulkCreateResultSerializer(serializers.Serializer):
+    """
+    Serializer for the outcome of a bulk create.
+    """
+
+    count = serializers.IntegerField()
+    duplicates = serializers.IntegerField()
+    results = TransactionSerializer(many=True)
+
+
+class TransactionSelectionSerializer(serializers.Serializer):
+    """
+    Selects the requester's Transactions a bulk update or delete applies
+    to: either an `ids` list, or a `filter` of the same params as the list
+    endpoint. Needs the `request` in its context.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.API_BULK_MAX_ITEMS,
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_filter(self, value: dict) -> dict:
+        # A mistyped filter must not widen the selection to every row
+        unknown = set(value).difference(TransactionFilter.base_filters)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filters: {', '.join(sorted(unknown))}."
+            )
+        # Blank values apply no condition, selecting every row alike
+        if all(
+            item in (None, []) or (isinstance(item, str) and not item.strip())
+            for item in value.values()
+        ):
+            raise serializers.ValidationError("No filter value given.")
+        filterset = TransactionFilter(data=value, queryset=Transaction.objects.all())
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Exactly one of `ids` or `filter` is required."
+            )
+        return attrs
+
+    def get_queryset(self):
+        """The requester's Transactions selected by the validated data."""
+        queryset = Transaction.objects.filter(created_by=self.context["request"].user)
+        if "ids" in self.validated_data:
+            return queryset.filter(pk__in=self.validated_data["ids"])
+        return TransactionFilter(
+            data=self.validated_data["filter"], queryset=queryset
+        ).qs
+
+
+class TransactionBulkFieldsSerializer(serializers.ModelSerializer):
+    """
+    Fields a bulk update may set, all optional.
+    """
+
+    class Meta:
+        model = Transaction
+        fields = ["category", "payment_type", "remarks"]
+        extra_kwargs = {name: {"required": False} for name in fields}
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs:
+            raise serializers.ValidationError("No field to update.")
+        return attrs
+
+
+class TransactionBulkUpdateSerializer(TransactionSelectionSerializer):
+    """
+    Serializer for the payload of a bulk update.
+    """
+
+    update = TransactionBulkFieldsSerializer()
+
+
+class TransactionBulkResultSerializer(serializers.Serializer):
+    """
+    Serializer for the outcome of a bulk update or delete.
+    """
+
+    count = serializers.IntegerField()
+    dry_run = serializers.BooleanField()
+
+
+class TransactionReadSerializer:
+    """
+    Read-only counterpart of `TransactionSerializer` for list & retrieve.
+
+    Only the serialized columns are fetched (`values()`, category name
+    joined in) & rows are turned into the exact same representation as
+    plain dicts, skipping DRF's per-field `to_representation()` calls.
+    """
+
+    # Columns read off the DB, keyed by `values()` lookups.
+    fields = (
+        "id",
+        "category__name",
+        "amount",
+        "date_time",
+        "payment_type",
+        "transaction_type",
+        "remarks",
+        "updated_at",
+        "category_id",
+        "created_by_id",
+    )
+    cents = Decimal("0.01")
+
+    @classmethod
+    def values(cls, queryset) -> Any:
+        if SEARCH_RANK in queryset.query.annotations:
+            # Position of ranked search results, for `KeysetPagination`
+            return queryset.values(*cls.fields, SEARCH_RANK)
+        return queryset.values(*cls.fields)
+
+    @staticmethod
+    def datetime_representation(value: datetime | None) -> str | None:
+        if value is None:
+            return None
+        # Same as DRF's DateTimeField: current time zone, ISO 8601 & "Z"
+        value = timezone.localtime(value).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    @classmethod
+    def to_representation(cls, row: dict) -> dict:
+        amount = row["amount"]
+
+        return {
+            "id": row["id"],
+            "category_name": row["category__name"],
+            "amount": None if amount is None else f"{amount.quantize(cls.cents):f}",
+            "date_time": cls.datetime_representation(row["date_time"]),
+            "payment_type": row["payment_type"],
+            "transaction_type": row["transaction_type"],
+            "remarks": row["remarks"],
+            "updated_at": cls.datetime_representation(row["updated_at"]),
+            "category": row["category_id"],
+            "created_by": row["created_by_id"],
+        }
+
+    @classmethod
+    def many(cls, rows) -> list[dict]:
+        to_representation = cls.to_representation
+        return [to_representation(row) for row in rows]
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """
     Serializer for Category's data model.
@@ -29,3 +305,96 @@ class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
+
+
+class TransactionSummarySerializer(serializers.Serializer):
+    """
+    Serializer for `TransactionSummary`'s totals.
+    """
+
+    income = serializers.DecimalField(max_digits=21, decimal_places=2)
+    expenses = serializers.DecimalField(max_digits=21, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=21, decimal_places=2)
+    count = serializers.IntegerField()
+    first_date_time = serializers.DateTimeField(allow_null=True)
+    last_date_time = serializers.DateTimeField(allow_null=True)
+
+
+class TransactionSeriesParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query params of the aggregate endpoint.
+    """
+
+    group_by = serializers.ChoiceField(
+        choices=list(GROUP_BY_FIELDS), required=False, allow_null=True, default=None
+    )
+    bucket = serializers.ChoiceField(
+        choices=list(BUCKETS), required=False, allow_null=True, default=None
+    )
+    date_min = serializers.DateField(required=False, allow_null=True, default=None)
+    date_max = serializers.DateField(required=False, allow_null=True, default=None)
+    max_points = serializers.IntegerField(
+        min_value=2,
+        max_value=settings.CHART_MAX_POINTS,
+        default=settings.CHART_MAX_POINTS,
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        if (
+            attrs["date_min"]
+            and attrs["date_max"]
+            and attrs["date_min"] > attrs["date_max"]
+        ):
+            raise serializers.ValidationError("`dateMin` is after `dateMax`.")
+        return attrs
+
+
+class TransactionSeriesItemSerializer(serializers.Serializer):
+    """
+    Serializer for one group's totals & counts, in the order of the buckets.
+    """
+
+    key = serializers.CharField(allow_null=True)
+    totals = serializers.ListField(child=serializers.FloatField())
+    counts = serializers.ListField(child=serializers.IntegerField())
+
+
+class TransactionSeriesSerializer(serializers.Serializer):
+    """
+    Serializer for time-bucketed totals, see `transaction_series()`.
+    """
+
+    bucket = serializers.CharField(allow_null=True)
+    group_by = serializers.CharField(allow_null=True)
+    buckets = serializers.ListField(child=serializers.DateField(allow_null=True))
+    series = TransactionSeriesItemSerializer(many=True)
+
+
+class TransactionSyncParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query params of the sync endpoint.
+    """
+
+    token = serializers.CharField(required=False, allow_blank=True, default="")
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.API_SYNC_BATCH_SIZE,
+        default=settings.API_SYNC_BATCH_SIZE,
+    )
+
+    def validate_token(self, value: str) -> Token:
+        try:
+            return decode_token(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+
+
+class TransactionSyncSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of changes, see `changes_since()`.
+    """
+
+    changes = TransactionSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
+    token = serializers.CharField()
+    has_more = serializers.BooleanField()
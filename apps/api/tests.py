@@ -1,10 +1,36 @@
+import json
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.test import APITestCase
 from rest_framework.status import is_success
-from apps.pages.models import Transaction, Category
+from apps.pages import rollups, series
+from apps.pages.cache import get_versions
+from apps.pages.models import Transaction, Category, CategoryRule
+from apps.pages.sync import prune_tombstones
+from djangorestframework_camel_case import middleware as camel_case_middleware
+from djangorestframework_camel_case import parser as camel_case_parser
+from djangorestframework_camel_case import render as camel_case_render
 from model_bakery import baker
 
+from apps.api import camel_case
+from apps.api.pagination import KeysetPagination
+from apps.api.serializers import TransactionReadSerializer, TransactionSerializer
+
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -110,3 +136,992 @@ class TransactionViewSetTestCase(APITestCase):
         response = self.client.delete(delete_url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Transaction.objects.filter(pk=transaction.pk).exists())
+
+    def test_summary(self):
+        """Test GET summary of the filtered transactions in a single query"""
+        baker.make(
+            Transaction,
+            amount="1000",
+            transaction_type=Transaction.TransactionType.INCOME,
+            created_by=self.user,
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("transactions-summary"), {"amount_min": "100"}
+            )
+        json_data = response.json()
+
+        self.assertTrue(is_success(response.status_code))
+        self.assertEqual(json_data["income"], "1000.00")
+        self.assertEqual(json_data["expenses"], "150.50")
+        self.assertEqual(json_data["balance"], "849.50")
+        self.assertEqual(json_data["count"], 2)
+        self.assertIn("firstDateTime", json_data)
+
+
+class TransactionBulkCreateTestCase(APITestCase):
+    """
+    Unit tests for the bulk create endpoint of Transactions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+        cls.categories = [
+            baker.make(Category, name=name) for name in ("Food", "Health", "Other")
+        ]
+
+    def setUp(self):
+        self.endpoint = reverse("transactions-bulk-create")
+
+    def payload(self, count: int, start: int = 0) -> list[dict]:
+        return [
+            {
+                "category": self.categories[i % 3].pk if i % 4 else None,
+                "amount": f"{i + 1}.50",
+                "dateTime": f"2025-09-{i % 28 + 1:02d}T12:00:00Z",
+                "paymentType": Transaction.PaymentType.CARD,
+                "transactionType": Transaction.TransactionType.EXPENSES,
+                "remarks": f"Item {start + i}",
+                "createdBy": (self.user if i % 2 else self.other_user).pk,
+            }
+            for i in range(count)
+        ]
+
+    def post(self, payload):
+        return self.client.post(self.endpoint, data=payload, format="json")
+
+    def test_creates_all_items(self):
+        response = self.post(self.payload(10))
+        json_data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((json_data["count"], json_data["duplicates"]), (10, 0))
+        self.assertEqual(Transaction.objects.count(), 10)
+        self.assertEqual(json_data["results"][1]["categoryName"], "Health")
+        self.assertIsNone(json_data["results"][0]["category"])
+        self.assertEqual(
+            sorted(row["id"] for row in json_data["results"]),
+            sorted(Transaction.objects.values_list("id", flat=True)),
+        )
+        self.assertEqual(rollups.verify_rollups(), [])
+
+    def test_query_count_does_not_grow_with_items(self):
+        # Same (already created) rollup rows touched by both payloads, each
+        # fitting one INSERT
+        self.post(self.payload(12))
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.post(self.payload(12, start=100)).status_code, 201)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(self.post(self.payload(80, start=200)).status_code, 201)
+        self.assertEqual(len(many), len(few))
+
+    def test_categorizes_by_rules(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryRule.objects.create(
+                pattern="item 4",
+                category=self.categories[2],
+                created_by=self.other_user,
+            )
+        json_data = self.post(self.payload(5)).json()
+
+        # Items 0 & 4 are uncategorized, only the latter matches
+        self.assertIsNone(json_data["results"][0]["category"])
+        self.assertEqual(json_data["results"][4]["categoryName"], "Other")
+        self.assertEqual(
+            Transaction.objects.filter(category=self.categories[2]).count(), 2
+        )
+
+    def test_skips_duplicates(self):
+        self.post(self.payload(4))
+        payload = self.payload(6)
+        # Same line, modulo case, whitespace & sub-second precision
+        payload[0]["remarks"] = "  ITEM   0 "
+        payload[0]["dateTime"] = payload[0]["dateTime"].replace("Z", ".250Z")
+        # Repeated within the payload itself: both kept
+        payload[5] = payload[4]
+        response = self.post(payload)
+        json_data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((json_data["count"], json_data["duplicates"]), (2, 4))
+        self.assertEqual(Transaction.objects.count(), 6)
+        self.assertEqual(rollups.verify_rollups(), [])
+
+        response = self.client.post(
+            f"{self.endpoint}?keepDuplicates=true", data=payload, format="json"
+        )
+        self.assertEqual(response.json()["duplicates"], 0)
+        self.assertEqual(Transaction.objects.count(), 12)
+
+    def test_per_item_errors(self):
+        payload = self.payload(4)
+        payload[1]["category"] = 999_999
+        payload[2]["createdBy"] = "x"
+        payload[3]["amount"] = "nope"
+        response = self.post(payload)
+        json_data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json_data[0], {})
+        self.assertEqual(list(json_data[1]), ["category"])
+        self.assertEqual(list(json_data[2]), ["createdBy"])
+        self.assertEqual(list(json_data[3]), ["amount"])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_rejects_empty_and_oversized_payloads(self):
+        self.assertEqual(self.post([]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post({}).status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(API_BULK_MAX_ITEMS=3):
+            response = self.post(self.payload(4))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransactionBulkUpdateDeleteTestCase(APITestCase):
+    """
+    Unit tests for the filter/ids based bulk update & delete endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.food, cls.health = (
+            baker.make(Category, name=name) for name in ("Food", "Health")
+        )
+        cls.transactions = [
+            baker.make(
+                Transaction,
+                category=cls.food,
+                amount=Decimal(amount),
+                date_time=timezone.make_aware(datetime(2025, 9, day, 12)),
+                payment_type=Transaction.PaymentType.CASH,
+                created_by=cls.user,
+            )
+            for day, amount in enumerate(("10", "20", "30", "40"), start=1)
+        ]
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+        cls.others = baker.make(
+            Transaction, amount=Decimal("50"), created_by=cls.other_user, _quantity=2
+        )
+
+    def setUp(self):
+        self.endpoint = reverse("transactions-bulk-create")
+        self.client.force_authenticate(self.user)
+
+    def test_update_by_filter(self):
+        payload = {
+            "filter": {"amountMin": "20", "createdBy": self.user.pk},
+            "update": {"category": self.health.pk, "paymentType": "Card"},
+        }
+        versions = get_versions(self.user.pk)
+        response = self.client.patch(self.endpoint, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"count": 3, "dryRun": False})
+        self.assertEqual(
+            Transaction.objects.filter(
+                category=self.health, payment_type="Card"
+            ).count(),
+            3,
+        )
+        self.assertEqual(rollups.verify_rollups(), [])
+        # Per-user cache versions move
+        self.assertNotEqual(get_versions(self.user.pk), versions)
+
+    def test_update_by_ids_and_dry_run(self):
+        ids = [self.transactions[0].pk, self.transactions[1].pk]
+        payload = {"ids": ids, "update": {"remarks": "Groceries"}, "dryRun": True}
+        with self.assertNumQueries(1):
+            response = self.client.patch(self.endpoint, payload, format="json")
+        self.assertEqual(response.json(), {"count": 2, "dryRun": True})
+        self.assertFalse(Transaction.objects.filter(remarks="Groceries").exists())
+
+        del payload["dryRun"]
+        response = self.client.patch(self.endpoint, payload, format="json")
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(
+            set(
+                Transaction.objects.filter(remarks="Groceries").values_list(
+                    "pk", flat=True
+                )
+            ),
+            set(ids),
+        )
+
+    def test_delete_by_filter(self):
+        payload = {"filter": {"dateTimeMax": "2025-09-02T23:59:59+08:00"}}
+        response = self.client.delete(
+            self.endpoint, {**payload, "dryRun": True}, format="json"
+        )
+        self.assertEqual(response.json(), {"count": 2, "dryRun": True})
+        self.assertEqual(Transaction.objects.count(), 6)
+
+        response = self.client.delete(self.endpoint, payload, format="json")
+        self.assertEqual(response.json(), {"count": 2, "dryRun": False})
+        self.assertEqual(Transaction.objects.count(), 4)
+        self.assertEqual(rollups.verify_rollups(), [])
+
+    def test_invalid_payloads(self):
+        for payload in (
+            {},
+            {"ids": [1], "filter": {"id": 1}},
+            {"ids": []},
+            {"filter": {}},
+            {"filter": {"amountMn": "20"}},
+            {"filter": {"amountMin": "x"}},
+            # No condition at all
+            {"filter": {"amountMin": ""}},
+            {"filter": {"amountMin": "  ", "createdBy": None}},
+            {"ids": [1], "update": {}},
+            {"ids": [1], "update": {"paymentType": "Cheque"}},
+        ):
+            with self.subTest(payload=payload):
+                method = (
+                    self.client.patch if "update" in payload else self.client.delete
+                )
+                response = method(self.endpoint, payload, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Transaction.objects.count(), 6)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        payload = {"filter": {"amountMin": "0"}}
+        for method in (self.client.patch, self.client.delete):
+            with self.subTest(method=method.__name__):
+                response = method(
+                    self.endpoint,
+                    {**payload, "update": {"remarks": "x"}},
+                    format="json",
+                )
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Transaction.objects.count(), 6)
+        self.assertFalse(Transaction.objects.filter(remarks="x").exists())
+
+    def test_other_users_transactions_left_alone(self):
+        other_ids = [transaction.pk for transaction in self.others]
+        payload = {"ids": other_ids, "update": {"remarks": "Mine"}}
+        response = self.client.patch(self.endpoint, payload, format="json")
+        self.assertEqual(response.json()["count"], 0)
+
+        # Even when filtering on them explicitly
+        payload = {"filter": {"createdBy": self.other_user.pk}}
+        response = self.client.delete(self.endpoint, payload, format="json")
+        self.assertEqual(response.json()["count"], 0)
+        response = self.client.delete(
+            self.endpoint, {"filter": {"amountMin": "0"}}, format="json"
+        )
+        self.assertEqual(response.json()["count"], 4)
+
+        self.assertEqual(
+            sorted(Transaction.objects.values_list("pk", flat=True)), sorted(other_ids)
+        )
+        self.assertFalse(Transaction.objects.filter(remarks="Mine").exists())
+
+
+class TransactionKeysetPaginationTestCase(APITestCase):
+    """
+    Unit tests for keyset pagination of the Transaction list endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        # Several rows share a date_time, so pages must break ties on id
+        for day, remarks in enumerate(["a", "b", "c", "d", "e", "f", "g"]):
+            baker.make(
+                Transaction,
+                date_time=timezone.make_aware(datetime(2025, 9, 1 + day // 3, 12)),
+                amount=day + 1,
+                remarks=f"Lunch {remarks}",
+                created_by=cls.user,
+            )
+        cls.expected_ids = list(
+            Transaction.objects.order_by("-date_time", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def setUp(self):
+        self.list_endpoint = reverse("transactions-list")
+
+    def walk(self, url: str, link: str = "next", **params) -> list[list[int]]:
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            params = {}
+            self.assertTrue(is_success(response.status_code))
+            json_data = response.json()
+            pages.append([row["id"] for row in json_data["results"]])
+            url = json_data[link]
+        return pages
+
+    def test_pages_forward_and_backward(self):
+        with CaptureQueriesContext(connection) as context:
+            pages = self.walk(self.list_endpoint, page_size=3)
+        self.assertEqual(pages, [self.expected_ids[i : i + 3] for i in (0, 3, 6)])
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in context.captured_queries)
+        )
+
+        response = self.client.get(self.list_endpoint, {"page_size": 3})
+        last_page_url = self.client.get(response.json()["next"]).json()["next"]
+        self.assertEqual(
+            self.walk(last_page_url, link="previous"),
+            [self.expected_ids[i : i + 3] for i in (6, 3, 0)],
+        )
+
+    def test_pages_with_filter_and_search(self):
+        pages = self.walk(self.list_endpoint, page_size=2, amount_min=3, search="lunch")
+        expected_ids = list(
+            Transaction.objects.filter(amount__gte=3)
+            .order_by("-date_time", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected_ids)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+    def test_search_pages_by_relevance(self):
+        ids = [
+            baker.make(Transaction, remarks=remarks, created_by=self.user).pk
+            for remarks in (
+                "Weekly grocery shopping at the night market",
+                "Grocery run",
+                "Grocery: groceries & more groceries",
+                "Agrochemicals",
+            )
+        ]
+        pages = self.walk(self.list_endpoint, page_size=1, search="GROC")
+        self.assertEqual(pages, [[ids[2]], [ids[1]], [ids[0]]])
+
+        response = self.client.get(
+            self.list_endpoint, {"page_size": 2, "search": "groc"}
+        )
+        last_page_url = response.json()["next"]
+        self.assertEqual(
+            self.walk(last_page_url, link="previous"), [[ids[0]], [ids[2], ids[1]]]
+        )
+        # Every word has to match
+        pages = self.walk(self.list_endpoint, search="grocery run")
+        self.assertEqual(pages, [[ids[1]]])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 4):
+            response = self.client.get(self.list_endpoint, {"page_size": 1000})
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    def test_invalid_cursor(self):
+        for cursor in ("garbage", "eyJwIjpbXX0="):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.list_endpoint, {"cursor": cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TransactionReadSerializerTestCase(APITestCase):
+    """
+    Unit tests for the values() based read path of list & retrieve.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        categories = [*baker.make(Category, _quantity=3), None]
+        for i, amount in enumerate(["0", "0.5", "150.50", "99999.99", "12"]):
+            baker.make(
+                Transaction,
+                category=categories[i % 4],
+                amount=amount,
+                # Microseconds or not, across a date & UTC offset change
+                date_time=datetime(
+                    2025, 9, 30, 17, 30, i * 7, i * 150_000, tzinfo=dt_timezone.utc
+                ).astimezone(timezone.get_fixed_timezone(i * 60)),
+                remarks=f"Row {i}" if i else "",
+                created_by=cls.user,
+            )
+
+    renderer = camel_case.CamelCaseJSONRenderer()
+
+    def test_matches_model_serializer(self):
+        queryset = Transaction.objects.order_by("id")
+        # Same bytes: keys in the same order too
+        self.assertEqual(
+            self.renderer.render(
+                TransactionReadSerializer.many(
+                    TransactionReadSerializer.values(queryset)
+                )
+            ),
+            self.renderer.render(TransactionSerializer(queryset, many=True).data),
+        )
+
+    def test_list_and_retrieve_responses(self):
+        # Rows & the last-modified marker
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("transactions-list"))
+        expected = TransactionSerializer(
+            Transaction.objects.order_by("-date_time", "-id"), many=True
+        ).data
+        self.assertEqual(
+            self.renderer.render(response.json()["results"]),
+            self.renderer.render(expected),
+        )
+
+        transaction = Transaction.objects.filter(category=None).first()
+        # The row & its validators
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("transactions-detail", args=[transaction.pk])
+            )
+        self.assertEqual(
+            response.content,
+            self.renderer.render(TransactionSerializer(transaction).data),
+        )
+
+        response = self.client.get(reverse("transactions-detail", args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CamelCaseTestCase(SimpleTestCase):
+    """
+    Unit tests for the cached key mapping camelCase renderer, parser &
+    middleware, against the `djangorestframework_camel_case` ones.
+    """
+
+    payload = {
+        "next": None,
+        "results": [
+            {
+                "id": 1,
+                "category_name": "Food",
+                "amount": "150.50",
+                "date_time": "2025-09-30T17:30:00Z",
+                "is_ok": True,
+                "ratio_2": 0.5,
+                "a_1_b": None,
+            },
+            {"nested_dict": {"inner_key": [1, {"deep_key": "x_y"}]}},
+            {gettext_lazy("lazy_key"): gettext_lazy("lazy value"), 3: "int key"},
+            {"decimal_value": Decimal("1.10"), "date_time": datetime(2025, 9, 1)},
+        ],
+        "_leading": "x",
+        "trailing_": ("tuple", "values"),
+    }
+
+    def test_renderer_output_is_identical(self):
+        renderer = camel_case.CamelCaseJSONRenderer()
+        expected_renderer = camel_case_render.CamelCaseJSONRenderer()
+        for data in (self.payload, self.payload["results"], [], None, "a_b"):
+            with self.subTest(data=data):
+                self.assertEqual(renderer.render(data), expected_renderer.render(data))
+
+    def test_parser_output_is_identical(self):
+        body = json.dumps(
+            {
+                "categoryName": "Food",
+                "paymentType": "Cash",
+                "nestedDict": {"innerKey": [{"deepKey": 1}]},
+                "address1": "x",
+                "HTTPResponse": "y",
+                "ABCDef": "z",
+            }
+        ).encode("utf-8")
+        self.assertEqual(
+            camel_case.CamelCaseJSONParser().parse(BytesIO(body)),
+            camel_case_parser.CamelCaseJSONParser().parse(BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            camel_case.CamelCaseJSONParser().parse(BytesIO(b"{"))
+
+    def test_middleware_output_is_identical(self):
+        query_string = "dateTimeMin=2025-09-01&amountMax=10&amountMax=20&search=a"
+        results = []
+        for middleware_class in (
+            camel_case.CamelCaseMiddleWare,
+            camel_case_middleware.CamelCaseMiddleWare,
+        ):
+            request = RequestFactory().get(f"/?{query_string}")
+            middleware_class(lambda request: None)(request)
+            self.assertIsInstance(request.GET, QueryDict)
+            results.append(dict(request.GET.lists()))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0]["amount_max"], ["10", "20"])
+
+
+class TransactionStreamTestCase(APITestCase):
+    """
+    Unit tests for the NDJSON stream of Transactions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        for day in range(1, 6):
+            baker.make(
+                Transaction,
+                date_time=timezone.make_aware(datetime(2025, 9, day, 12)),
+                remarks="Line\nbreak \u2028 separator" if day == 3 else "Lunch",
+                created_by=cls.user,
+            )
+
+    def stream(self, **params) -> list[dict]:
+        response = self.client.get(reverse("transactions-stream"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(not content or content.endswith("\n"))
+        # One object per line, even with line breaks in the data
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_rows_match_list_endpoint(self):
+        rows = self.stream()
+        self.assertEqual(
+            rows, self.client.get(reverse("transactions-list")).json()["results"]
+        )
+        self.assertIn("dateTime", rows[0])
+
+    def test_applies_filters_and_blocks(self):
+        with mock.patch.object(
+            camel_case.CamelCaseNDJSONRenderer, "lines_per_block", 2
+        ):
+            rows = self.stream(
+                date_time_min="2025-09-02T00:00:00Z",
+                date_time_max="2025-09-04T23:59:59Z",
+            )
+        self.assertEqual(
+            [row["dateTime"][:10] for row in rows],
+            ["2025-09-04", "2025-09-03", "2025-09-02"],
+        )
+        self.assertEqual(self.stream(search="nothing"), [])
+
+    def test_invalid_filter(self):
+        response = self.client.get(reverse("transactions-stream"), {"amount_min": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("amountMin", json.loads(response.content))
+
+
+class TransactionAggregateTestCase(APITestCase):
+    """
+    Unit tests for the time-bucketed totals endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.food = baker.make(Category, name="Food")
+        for day, hour, category, transaction_type, amount in [
+            (datetime(2025, 1, 15), 12, cls.food, "Expenses", "20"),
+            # Still January 31st in UTC
+            (datetime(2025, 2, 1), 0, cls.food, "Expenses", "10"),
+            (datetime(2025, 2, 10), 12, None, "Income", "100"),
+        ]:
+            baker.make(
+                Transaction,
+                date_time=timezone.make_aware(day.replace(hour=hour, minute=30)),
+                category=category,
+                transaction_type=transaction_type,
+                amount=amount,
+                created_by=cls.user,
+            )
+        baker.make(Transaction, amount="999", created_by=baker.make(User))
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.user)
+
+    def aggregate(self, **params) -> dict:
+        response = self.client.get(reverse("transactions-aggregate"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse("transactions-aggregate"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_monthly_by_category(self):
+        data = self.aggregate(groupBy="category", bucket="month")
+        self.assertEqual(data["groupBy"], "category")
+        self.assertEqual(data["buckets"], ["2025-01-01", "2025-02-01"])
+        self.assertEqual(
+            data["series"],
+            [
+                {"key": "Food", "totals": [20.0, 10.0], "counts": [1, 1]},
+                {"key": None, "totals": [0.0, 100.0], "counts": [0, 1]},
+            ],
+        )
+
+    def test_rollups_match_transactions(self):
+        for params in [
+            {"group_by": "category"},
+            {"group_by": "payment_type", "bucket": "month"},
+            {"group_by": "transaction_type", "bucket": "year"},
+        ]:
+            with self.subTest(**params):
+                with CaptureQueriesContext(connection) as context:
+                    from_rollups = series.transaction_series(self.user, **params)
+                self.assertIn(
+                    "pages_transactionrollup", context.captured_queries[0]["sql"]
+                )
+                with mock.patch.object(series, "can_use_rollups", return_value=False):
+                    self.assertEqual(
+                        series.transaction_series(self.user, **params), from_rollups
+                    )
+
+    def test_daily_and_weekly_buckets_in_range(self):
+        data = self.aggregate(
+            groupBy="transaction_type",
+            bucket="day",
+            dateMin="2025-02-01",
+            dateMax="2025-02-09",
+        )
+        self.assertEqual(data["buckets"], ["2025-02-01"])
+        self.assertEqual(
+            data["series"],
+            [{"key": "Expenses", "totals": [10.0], "counts": [1]}],
+        )
+
+        data = self.aggregate(bucket="week")
+        self.assertEqual(data["buckets"], ["2025-01-13", "2025-01-27", "2025-02-10"])
+        self.assertEqual(data["series"][0]["totals"], [20.0, 10.0, 100.0])
+
+    def test_totals_without_bucket(self):
+        data = self.aggregate()
+        self.assertEqual(data["buckets"], [None])
+        self.assertEqual(
+            data["series"], [{"key": None, "totals": [130.0], "counts": [3]}]
+        )
+
+    def test_cached_per_user_and_range(self):
+        self.aggregate(bucket="day")
+        # Only the markers: last-modified for the response's validators &
+        # the cache's versions
+        with self.assertNumQueries(2):
+            self.aggregate(bucket="day")
+        with self.assertNumQueries(3):
+            self.aggregate(bucket="day", dateMin="2025-02-01")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(category=None).update(amount="50")
+        self.assertEqual(self.aggregate(bucket="day")["series"][0]["totals"][-1], 50.0)
+
+    def test_downsamples_to_max_points(self):
+        data = self.aggregate(bucket="day", maxPoints=2)
+        # The minimum & maximum of the only series
+        self.assertEqual(data["buckets"], ["2025-02-01", "2025-02-10"])
+        self.assertEqual(data["series"][0]["totals"], [10.0, 100.0])
+
+    def test_invalid_params(self):
+        for params in [
+            {"bucket": "hour"},
+            {"maxPoints": 1},
+            {"maxPoints": settings.CHART_MAX_POINTS + 1},
+            {"groupBy": "remarks"},
+            {"dateMin": "2025-02-01", "dateMax": "2025-01-01"},
+        ]:
+            with self.subTest(**params):
+                response = self.client.get(reverse("transactions-aggregate"), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalRequestsTestCase(APITestCase):
+    """
+    Unit tests for ETag & Last-Modified validators of Transaction endpoints.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+        cls.category = baker.make(Category, name="Food")
+        cls.transaction = baker.make(
+            Transaction, category=cls.category, remarks="Lunch", created_by=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.user)
+
+    def assertNotModified(self, url: str, response, **params):
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(
+                url, params, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertIn("no-cache", not_modified["Cache-Control"])
+
+    def assertModified(self, url: str, response, **params):
+        modified = self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified["ETag"], response["ETag"])
+
+    def test_list(self):
+        url = reverse("transactions-list")
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        self.assertNotModified(url, response)
+
+        # Dated by whole seconds, once the data's last one is over
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=timezone.now() + timedelta(seconds=1),
+        ):
+            response = self.client.get(url)
+            with self.assertNumQueries(1):
+                not_modified = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+                )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Other params, other representation
+        self.assertModified(url, response, search="lunch")
+
+        own = self.client.get(url, {"created_by": self.user.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            baker.make(Transaction, created_by=self.other_user)
+        self.assertModified(url, response)
+        self.assertNotModified(url, own, created_by=self.user.pk)
+
+    def test_if_modified_since_within_a_second(self):
+        url = reverse("transactions-list")
+        second = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+
+        def write_at(milliseconds: int):
+            now = second + timedelta(milliseconds=milliseconds)
+            with mock.patch("django.utils.timezone.now", return_value=now):
+                Transaction.objects.filter(pk=self.transaction.pk).update(
+                    remarks=f"At {milliseconds}ms"
+                )
+
+        def get_at(milliseconds: int, **headers):
+            now = second + timedelta(milliseconds=milliseconds)
+            with mock.patch("django.utils.timezone.now", return_value=now):
+                return self.client.get(url, **headers)
+
+        write_at(200)
+        response = get_at(300)
+        write_at(700)
+        modified = get_at(800, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(modified.data["results"][0]["remarks"], "At 700ms")
+
+        # Once the second is over, later writes fall past it
+        response = get_at(1500)
+        self.assertEqual(
+            get_at(1600, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        write_at(1700)
+        self.assertEqual(
+            get_at(1800, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_retrieve(self):
+        url = reverse("transactions-detail", args=[self.transaction.pk])
+        response = self.client.get(url)
+        self.assertNotModified(url, response)
+
+        writes = [
+            lambda: Transaction.objects.get(pk=self.transaction.pk).save(
+                update_fields=["remarks"]
+            ),
+            lambda: Transaction.objects.filter(pk=self.transaction.pk).update(
+                remarks="Dinner"
+            ),
+            lambda: Category.objects.get(pk=self.category.pk).save(),
+        ]
+        for write in writes:
+            write()
+            self.assertModified(url, response)
+            response = self.client.get(url)
+
+        Transaction.objects.filter(pk=self.transaction.pk).delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_aggregate(self):
+        url = reverse("transactions-aggregate")
+        response = self.client.get(url, {"bucket": "month"})
+        self.assertNotModified(url, response, bucket="month")
+
+        # Other users' data isn't theirs
+        baker.make(Transaction, created_by=self.other_user)
+        self.assertNotModified(url, response, bucket="month")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(created_by=self.user).delete()
+        self.assertModified(url, response, bucket="month")
+
+    def test_fingerprint_refresh_keeps_updated_at(self):
+        updated_at = Transaction.objects.get(pk=self.transaction.pk).updated_at
+        Transaction.objects.update(fingerprint="")
+        Transaction.objects.all().refresh_fingerprints()
+        self.assertEqual(
+            Transaction.objects.get(pk=self.transaction.pk).updated_at, updated_at
+        )
+
+
+class TransactionSyncTestCase(APITestCase):
+    """
+    Unit tests for the delta sync endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other_user = User.objects.create_user(username="other", password="pw")
+        cls.category = baker.make(Category, name="Food")
+        cls.transactions = baker.make(
+            Transaction, category=cls.category, created_by=cls.user, _quantity=3
+        )
+        baker.make(Transaction, created_by=cls.other_user)
+
+    def setUp(self):
+        self.endpoint = reverse("transactions-sync")
+        self.client.force_authenticate(self.user)
+
+    def sync(self, token: str = "", **params) -> dict:
+        response = self.client.get(self.endpoint, {"token": token, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_initial_sync(self):
+        data = self.sync()
+
+        self.assertEqual(
+            [row["id"] for row in data["changes"]],
+            [transaction.pk for transaction in self.transactions],
+        )
+        self.assertEqual(data["changes"][0]["categoryName"], "Food")
+        self.assertEqual((data["deleted"], data["hasMore"]), ([], False))
+        # Nothing new since
+        self.assertEqual(self.sync(data["token"])["changes"], [])
+        self.assertEqual(self.sync(data["token"])["token"], data["token"])
+
+    def test_changes_since_token(self):
+        first, second, third = self.transactions
+        token = self.sync()["token"]
+
+        second.remarks = "Lunch"
+        second.save()
+        Transaction.objects.filter(pk=first.pk).update(amount=Decimal("5"))
+        self.client.delete(reverse("transactions-detail", args=[third.pk]))
+        created = baker.make(Transaction, created_by=self.user)
+        baker.make(Transaction, created_by=self.other_user)
+        data = self.sync(token)
+
+        # In the order they happened, other users' left out
+        self.assertEqual(
+            [row["id"] for row in data["changes"]], [second.pk, first.pk, created.pk]
+        )
+        self.assertEqual(data["changes"][0]["remarks"], "Lunch")
+        self.assertEqual(data["changes"][1]["amount"], "5.00")
+        self.assertEqual(data["deleted"], [third.pk])
+
+        # Deleted then gone, changed again then sent again
+        Transaction.objects.filter(pk__in=[first.pk, created.pk]).delete()
+        second.save(update_fields=["remarks"])
+        data = self.sync(data["token"])
+        self.assertEqual([row["id"] for row in data["changes"]], [second.pk])
+        self.assertEqual(sorted(data["deleted"]), sorted([first.pk, created.pk]))
+
+    def test_moved_to_another_user(self):
+        token = self.sync()["token"]
+        Transaction.objects.filter(pk=self.transactions[0].pk).update(
+            created_by=self.other_user
+        )
+        self.assertEqual(self.sync(token)["deleted"], [self.transactions[0].pk])
+
+        self.client.force_authenticate(self.other_user)
+        self.assertIn(
+            self.transactions[0].pk, [row["id"] for row in self.sync()["changes"]]
+        )
+
+    def test_category_deleted(self):
+        token = self.sync()["token"]
+        Category.objects.get(pk=self.category.pk).delete()
+
+        data = self.sync(token)
+        self.assertEqual(len(data["changes"]), 3)
+        self.assertIsNone(data["changes"][0]["category"])
+        self.assertEqual(rollups.verify_rollups(), [])
+
+    def test_batches(self):
+        baker.make(Transaction, created_by=self.user, _quantity=4)
+        Transaction.objects.filter(pk=self.transactions[1].pk).delete()
+        expected = set(
+            Transaction.objects.filter(created_by=self.user).values_list(
+                "pk", flat=True
+            )
+        )
+
+        changes, deleted, token, requests = [], [], "", 0
+        while True:
+            data = self.sync(token, limit=2)
+            requests += 1
+            changes += [row["id"] for row in data["changes"]]
+            deleted += data["deleted"]
+            token = data["token"]
+            if not data["hasMore"]:
+                break
+
+        self.assertEqual(
+            (sorted(changes), deleted), (sorted(expected), [self.transactions[1].pk])
+        )
+        self.assertEqual(requests, 4)
+
+    def test_query_count_does_not_grow_with_ledger(self):
+        # Marker, changed rows & tombstones, however many Transactions
+        token = self.sync()["token"]
+        baker.make(Transaction, created_by=self.user)
+        with self.assertNumQueries(3):
+            token = self.sync(token)["token"]
+
+        baker.make(Transaction, created_by=self.user, _quantity=50)
+        token = self.sync(token, limit=50)["token"]
+        baker.make(Transaction, created_by=self.user)
+        with self.assertNumQueries(3):
+            data = self.sync(token)
+        self.assertEqual(len(data["changes"]), 1)
+
+    def test_expired_token(self):
+        token = self.sync()["token"]
+        Transaction.objects.filter(pk=self.transactions[0].pk).delete()
+        newer = self.sync(token)["token"]
+        Transaction.objects.filter(pk=self.transactions[1].pk).delete()
+
+        self.assertEqual(prune_tombstones(timezone.now() + timedelta(seconds=1)), 2)
+        for old in (token, newer):
+            response = self.client.get(self.endpoint, {"token": old})
+            self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        # From scratch, past older changes than the pruned tombstones
+        created = baker.make(Transaction, created_by=self.user)
+        data = self.sync(limit=1)
+        self.assertEqual(
+            [row["id"] for row in data["changes"]], [self.transactions[2].pk]
+        )
+        data = self.sync(data["token"], limit=1)
+        self.assertEqual([row["id"] for row in data["changes"]], [created.pk])
+        self.assertEqual(self.sync(data["token"])["changes"], [])
+
+    def test_invalid_params(self):
+        # Not base64, 2 values instead of 3, negative
+        for params in (
+            {"token": "nope"},
+            {"token": "WzEsMl0="},
+            {"token": "WzEsMiwtM10="},
+            {"limit": 0},
+        ):
+            response = self.client.get(self.endpoint, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,17 +1,52 @@
-from djangorestframework_camel_case.parser import CamelCaseJSONParser
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
-from djangorestframework_camel_case.render import (
-    CamelCaseBrowsableAPIRenderer,
-    CamelCaseJSONRenderer,
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    OpenApiResponse,
+    extend_schema,
+    extend_schema_view,
 )
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import permissions, viewsets
-from rest_framework.filters import SearchFilter
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
+from apps.pages.markers import (
+    last_modified,
+    transaction_last_modified,
+    user_last_modified,
+)
 from apps.pages.models import Transaction
-from .filters import TransactionFilter
+from apps.pages.series import get_transaction_series
+from apps.pages.summary import TransactionSummary
+from apps.pages.sync import TokenExpired, changes_since
+from .camel_case import (
+    CamelCaseBrowsableAPIRenderer,
+    CamelCaseJSONParser,
+    CamelCaseJSONRenderer,
+    CamelCaseNDJSONRenderer,
+    warm_up,
+)
+from .conditional import conditional
+from .filters import TransactionFilter, TransactionSearchFilter
+from .pagination import KeysetPagination
 
-from .serializers import TransactionSerializer
+from .serializers import (
+    CategorySerializer,
+    TransactionBulkCreateResultSerializer,
+    TransactionBulkResultSerializer,
+    TransactionBulkSerializer,
+    TransactionBulkUpdateSerializer,
+    TransactionReadSerializer,
+    TransactionSelectionSerializer,
+    TransactionSerializer,
+    TransactionSeriesParamsSerializer,
+    TransactionSeriesSerializer,
+    TransactionSummarySerializer,
+    TransactionSyncParamsSerializer,
+    TransactionSyncSerializer,
+)
 
 from .openapi_schema import (
     CREATE_TRANSACTION_REQUEST_PAYLOAD,
@@ -20,6 +55,29 @@ from .openapi_schema import (
     UPDATE_TRANSACTION_RESPONSE_PAYLOAD,
 )
 
+# Rows fetched per DB round-trip (server-side cursor on PostgreSQL) by the
+# NDJSON stream.
+STREAM_CHUNK_SIZE = 2000
+
+warm_up([TransactionSerializer, CategorySerializer, TransactionSummarySerializer])
+
+
+def list_last_modified(view, request, *args, **kwargs):
+    created_by = request.query_params.get("created_by", "")
+    if created_by.isdigit():
+        return user_last_modified(int(created_by))
+    # Anyone's Transactions
+    return last_modified()
+
+
+def detail_last_modified(view, request, *args, **kwargs):
+    lookup = str(kwargs[view.lookup_url_kwarg or view.lookup_field])
+    return transaction_last_modified(int(lookup)) if lookup.isdigit() else None
+
+
+def aggregate_last_modified(view, request, *args, **kwargs):
+    return user_last_modified(request.user.pk)
+
 
 # Hides documentation for PATCH request
 @extend_schema_view(partial_update=extend_schema(exclude=True))
@@ -31,19 +89,34 @@ class TransactionViewSet(viewsets.ModelViewSet):
     http_method_names = ["get", "post", "put", "patch", "delete"]
     permission_classes = [permissions.AllowAny]
     serializer_class = TransactionSerializer
-    queryset = Transaction.objects.all()
+    queryset = Transaction.objects.select_related("category")
     renderer_classes = [CamelCaseJSONRenderer, CamelCaseBrowsableAPIRenderer]
     parser_classes = [CamelCaseJSONParser]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter]
     filterset_class = TransactionFilter
-    search_fields = ["remarks"]
+    pagination_class = KeysetPagination
+    # Only ever applied to the requester's own Transactions
+    owner_actions = {"bulk_update", "bulk_destroy"}
+
+    def get_permissions(self):
+        # `bulk/` methods mapped onto `bulk_create` share its action kwargs
+        if self.action in self.owner_actions:
+            return [permissions.IsAuthenticated()]
+        return super().get_permissions()
 
     @extend_schema(
         summary="Endpoint to retrieve a list of all Transactions",
-        description="Retrieve entire list of available Transactions",
+        description="Retrieve entire list of available Transactions. Responses carry `ETag` & `Last-Modified` validators: a request whose `If-None-Match` (or `If-Modified-Since`) still holds gets a 304 instead",
     )
+    @conditional(list_last_modified)
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        queryset = TransactionReadSerializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(TransactionReadSerializer.many(page))
+        return Response(TransactionReadSerializer.many(queryset))
 
     @extend_schema(
         summary="Endpoint to create a new Transaction",
@@ -56,15 +129,107 @@ class TransactionViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
+    @extend_schema(
+        summary="Endpoint to create many Transactions at once",
+        description="Create up to API_BULK_MAX_ITEMS Transactions from a list of create payloads, all or none: invalid payloads get a list of per-item errors, in the same order. Items duplicating an existing Transaction (same user, date & time, amount, type and remarks) are skipped & counted, unless `keepDuplicates=true` is given",
+        request=TransactionBulkSerializer(many=True),
+        parameters=[
+            OpenApiParameter(
+                "keep_duplicates",
+                bool,
+                description="Also create items duplicating an existing Transaction.",
+            )
+        ],
+        responses={201: TransactionBulkCreateResultSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = TransactionBulkSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.API_BULK_MAX_ITEMS,
+            context={
+                **self.get_serializer_context(),
+                "skip_duplicates": request.query_params.get("keep_duplicates")
+                not in ("true", "1"),
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            {
+                "count": len(serializer.instance),
+                "duplicates": serializer.duplicates,
+                "results": serializer.data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        summary="Endpoint to update many Transactions at once",
+        description="Set the given fields on every one of the authenticated user's Transactions selected by `ids` or by `filter` (same params as the list endpoint, at least one given a value) in a single UPDATE, and return how many got updated; with `dryRun`, only count them",
+        request=TransactionBulkUpdateSerializer,
+        responses=TransactionBulkResultSerializer,
+    )
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        serializer = TransactionBulkUpdateSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        queryset = serializer.get_queryset()
+        dry_run = serializer.validated_data["dry_run"]
+
+        if dry_run:
+            count = queryset.count()
+        else:
+            count = queryset.update(**serializer.validated_data["update"])
+        return Response(
+            TransactionBulkResultSerializer({"count": count, "dry_run": dry_run}).data
+        )
+
+    @extend_schema(
+        summary="Endpoint to delete many Transactions at once",
+        description="Delete every one of the authenticated user's Transactions selected by `ids` or by `filter` (same params as the list endpoint, at least one given a value) in a single DELETE, and return how many got deleted; with `dryRun`, only count them",
+        request=TransactionSelectionSerializer,
+        responses=TransactionBulkResultSerializer,
+    )
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        serializer = TransactionSelectionSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        queryset = serializer.get_queryset()
+        dry_run = serializer.validated_data["dry_run"]
+
+        if dry_run:
+            count = queryset.count()
+        else:
+            _, deleted = queryset.delete()
+            count = deleted.get(Transaction._meta.label, 0)
+        return Response(
+            TransactionBulkResultSerializer({"count": count, "dry_run": dry_run}).data
+        )
+
     @extend_schema(
         summary="Endpoint to retrieve details of a specific transaction using its ID",
-        description="Retrieve a specific transaction based on given ID in the request's path parameter",
+        description="Retrieve a specific transaction based on given ID in the request's path parameter. Conditional requests are supported, as for the list endpoint",
         examples=[
             CREATE_TRANSACTION_RESPONSE_PAYLOAD,
         ],
     )
+    @conditional(detail_last_modified)
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        # Same lookup as `get_object()`, minus object level permissions
+        # (none on this viewset) which need a model instance
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            TransactionReadSerializer.values(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: kwargs[lookup_url_kwarg]},
+        )
+        return Response(TransactionReadSerializer.to_representation(row))
 
     @extend_schema(
         summary="Endpoint to fully update a transaction using its ID",
@@ -83,3 +248,93 @@ class TransactionViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Endpoint to summarize the filtered Transactions",
+        description="Retrieve total income, expenses & balance, count and first/last date of the Transactions matching the same filters as the list endpoint",
+        responses=TransactionSummarySerializer,
+    )
+    @action(detail=False, methods=["get"])
+    def summary(self, request, *args, **kwargs):
+        summary = TransactionSummary.from_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        return Response(TransactionSummarySerializer(summary).data)
+
+    @extend_schema(
+        summary="Endpoint to retrieve the user's totals over time, for charts",
+        description="Retrieve the authenticated user's Transaction amounts & counts between `dateMin` and `dateMax` (inclusive, in the server's time zone) summed per `bucket` of time and per `groupBy` value, both optional: a list of bucket dates, and one series of totals & counts per group in that same order. Buckets without any Transaction are left out; past `maxPoints` buckets, only those holding the minimum & maximum of each series per interval of time are kept. Conditional requests are supported, as for the list endpoint",
+        parameters=[TransactionSeriesParamsSerializer],
+        responses=TransactionSeriesSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    @conditional(aggregate_last_modified)
+    def aggregate(self, request, *args, **kwargs):
+        params = TransactionSeriesParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(get_transaction_series(request.user, **params.validated_data))
+
+    @extend_schema(
+        summary="Endpoint to sync the user's Transactions incrementally",
+        description="Retrieve the authenticated user's Transactions created or updated (`changes`) and the ids of those deleted (`deleted`) since `token`, at most `limit` of them in the order they happened, along with the `token` to pass next time. Without a token, every Transaction is a change. While `hasMore`, more changes are waiting past the new token. A token too old to tell deletions from (see `SYNC_TOMBSTONE_DAYS`) gets a 410: sync again from scratch",
+        parameters=[TransactionSyncParamsSerializer],
+        responses={
+            200: TransactionSyncSerializer,
+            410: OpenApiResponse(description="Token expired, sync from scratch"),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def sync(self, request, *args, **kwargs):
+        params = TransactionSyncParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        try:
+            batch = changes_since(
+                request.user.pk,
+                params.validated_data["token"],
+                params.validated_data["limit"],
+                TransactionReadSerializer.fields,
+            )
+        except TokenExpired:
+            return Response(
+                {"detail": "Token expired, sync from scratch."},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(
+            {
+                "changes": TransactionReadSerializer.many(batch.changed),
+                "deleted": batch.deleted,
+                "token": batch.token,
+                "has_more": batch.has_more,
+            }
+        )
+
+    @extend_schema(
+        summary="Endpoint to stream all filtered Transactions as NDJSON",
+        description="Stream every Transaction matching the same filters as the list endpoint, one JSON object per line (application/x-ndjson), without pagination",
+        responses={
+            (200, CamelCaseNDJSONRenderer.media_type): OpenApiResponse(
+                TransactionSerializer
+            )
+        },
+    )
+    @action(detail=False, methods=["get"], renderer_classes=[CamelCaseNDJSONRenderer])
+    def stream(self, request, *args, **kwargs):
+        queryset = TransactionReadSerializer.values(
+            self.filter_queryset(self.get_queryset())
+        ).order_by(*self.pagination_class.ordering)
+        rows = queryset.iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+        return StreamingHttpResponse(
+            request.accepted_renderer.stream(
+                map(TransactionReadSerializer.to_representation, rows)
+            ),
+            content_type=CamelCaseNDJSONRenderer.media_type,
+        )
@@ -1,16 +1,17 @@
 from typing import Any
-import json
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum
 from django.views.generic import TemplateView
-from apps.pages.models import Transaction
+from apps.pages.series import BUCKETS
+from apps.pages.summary import get_user_summary
 
 
 class DisplayChartsView(LoginRequiredMixin, TemplateView):
     """
     View to display charts/graphs.
 
-    Only authenticated/logged in user can view their own data.
+    Only authenticated/logged in user can view their own data. Chart series
+    are fetched by the page from the aggregate API endpoint.
     """
 
     template_name = "charts/index.html"
@@ -19,31 +20,8 @@ class DisplayChartsView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context["user"] = self.request.user
-        amounts, categories = [], []
-
-        queryset = Transaction.objects.select_related("created_by", "category").all()
-
-        if self.request.user.is_authenticated:
-            queryset = (
-                queryset.filter(created_by=self.request.user)
-                .values("category__name")
-                .annotate(total_amount=Sum("amount"))
-                .order_by("category__name")
-            )
-        else:
-            queryset = (
-                queryset.values("category__name")
-                .annotate(total_amount=Sum("amount"))
-                .order_by("category__name")
-            )
-
-        for result in queryset:
-            amounts.append(float(result.get("total_amount", 0)))
-            categories.append(result.get("category__name"))
-
+        context["summary"] = get_user_summary(self.request.user)
+        context["buckets"] = BUCKETS
+        context["max_points"] = settings.CHART_MAX_POINTS
         context["segment"] = "charts"
-
-        # Need to serialize so JS can extract these values
-        context["amounts"] = json.dumps(amounts)
-        context["categories"] = json.dumps(categories)
         return context
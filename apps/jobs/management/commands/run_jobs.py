@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from apps.jobs.services import (
+    claim_next_job,
+    delete_expired_jobs,
+    fail_stale_jobs,
+    run_job,
+)
+
+# Seconds between housekeeping runs of an idle worker
+HOUSEKEEPING_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script running queued background Jobs (exports, reports...).
+    """
+
+    help = "Worker that claims & runs pending background Jobs."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--concurrency",
+            "-n",
+            type=int,
+            default=settings.JOBS_WORKER_CONCURRENCY,
+            help="Number of Jobs run in parallel (worker threads).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help="Seconds to wait before polling again when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Exit once the queue is empty instead of polling forever.",
+        )
+
+    def handle(self, **options) -> str | None:
+        self.once = options["once"]
+        self.poll_interval = options["poll_interval"]
+        self.stopping = threading.Event()
+        self.housekeeping_lock = threading.Lock()
+        self.next_housekeeping = 0.0
+        concurrency = max(1, options["concurrency"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Running Jobs with concurrency={concurrency}.")
+        )
+
+        if concurrency == 1:
+            self.work()
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            workers = [executor.submit(self.work) for _ in range(concurrency)]
+            try:
+                for worker in workers:
+                    worker.result()
+            except KeyboardInterrupt:
+                self.stopping.set()
+
+    def work(self) -> None:
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                self.housekeep()
+                job = claim_next_job()
+
+                if job is None:
+                    if self.once:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+
+                job = run_job(job)
+                style = (
+                    self.style.SUCCESS
+                    if job.status == job.Status.SUCCEEDED
+                    else self.style.ERROR
+                )
+                self.stdout.write(style(f"Finished {job}"))
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def housekeep(self) -> None:
+        """
+        Fail Jobs whose worker died & delete expired ones, at most once every
+        `HOUSEKEEPING_INTERVAL` seconds across worker threads.
+        """
+
+        with self.housekeeping_lock:
+            if time.monotonic() < self.next_housekeeping:
+                return
+            self.next_housekeeping = time.monotonic() + HOUSEKEEPING_INTERVAL
+
+        failed = fail_stale_jobs(timedelta(seconds=settings.JOBS_STALE_AFTER))
+        deleted = delete_expired_jobs(
+            timezone.now() - timedelta(days=settings.JOBS_RESULT_DAYS)
+        )
+        if failed or deleted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Failed {failed} stale Job(s), deleted {deleted} expired Job(s)."
+                )
+            )
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("kind", models.CharField(max_length=64, verbose_name="Kind")),
+                (
+                    "params",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Parameters"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending"),
+                            ("Running", "Running"),
+                            ("Succeeded", "Succeeded"),
+                            ("Failed", "Failed"),
+                        ],
+                        default="Pending",
+                        max_length=16,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Progress (%)"
+                    ),
+                ),
+                (
+                    "result_file",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="Result file path"
+                    ),
+                ),
+                (
+                    "result_name",
+                    models.CharField(
+                        blank=True, max_length=128, verbose_name="Result filename"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(null=True, verbose_name="Started at"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(null=True, verbose_name="Finished at"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["status", "id"], name="job_status_id_idx")
+                ],
+            },
+        ),
+    ]
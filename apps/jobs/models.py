@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import BinaryIO
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """Model for storing a queued background Job & its outcome."""
+
+    class Status(models.TextChoices):
+        PENDING = "Pending", _("Pending")
+        RUNNING = "Running", _("Running")
+        SUCCEEDED = "Succeeded", _("Succeeded")
+        FAILED = "Failed", _("Failed")
+
+    id = models.AutoField(primary_key=True)
+    kind = models.CharField(verbose_name=_("Kind"), max_length=64)
+    params = models.JSONField(verbose_name=_("Parameters"), default=dict, blank=True)
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    progress = models.PositiveSmallIntegerField(
+        verbose_name=_("Progress (%)"), default=0
+    )
+    result_file = models.CharField(
+        verbose_name=_("Result file path"), max_length=255, blank=True
+    )
+    result_name = models.CharField(
+        verbose_name=_("Result filename"), max_length=128, blank=True
+    )
+    error = models.TextField(verbose_name=_("Error"), blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("Created by"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    created_at = models.DateTimeField(verbose_name=_("Created at"), auto_now_add=True)
+    started_at = models.DateTimeField(verbose_name=_("Started at"), null=True)
+    # Last sign of life of the worker running it, see `fail_stale_jobs()`
+    heartbeat_at = models.DateTimeField(verbose_name=_("Heartbeat at"), null=True)
+    finished_at = models.DateTimeField(verbose_name=_("Finished at"), null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="job_status_id_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} :: {self.status}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    @property
+    def result_path(self) -> Path:
+        return Path(settings.JOBS_RESULT_DIR) / f"{self.pk}"
+
+    def open_result_file(self) -> BinaryIO:
+        """
+        Open (for writing) the file under `JOBS_RESULT_DIR` holding this Job's
+        result, recording its path in `result_file`.
+        """
+
+        path = self.result_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.result_file = str(path)
+        return path.open("wb")
+
+    def delete_files(self) -> None:
+        """
+        Remove the Job's result file & upload (if any), recorded or not (a
+        worker may have died writing them).
+        """
+
+        paths = {self.result_path, Path(self.result_file or self.result_path)}
+        if upload := self.params.get("path"):
+            paths.add(Path(upload))
+        for path in paths:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,19 @@
+from collections.abc import Callable
+
+# Handlers are called with the running Job & a `report_progress(done, total)`
+# callback. They return the filename the result is downloaded as.
+JobHandler = Callable[..., str]
+
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def register(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Decorator registering the handler that runs Jobs of given `kind`.
+    """
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return decorator
@@ -0,0 +1,144 @@
+import logging
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Job
+from .registry import JOB_HANDLERS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between heartbeats of a running Job, progress moving or not
+HEARTBEAT_INTERVAL = 60
+
+
+def enqueue(kind: str, user, params: dict[str, Any] | None = None) -> Job:
+    """
+    Queue a Job of given `kind` for `user`, to be picked up by `run_jobs`.
+    """
+
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"No handler registered for Job kind {kind!r}")
+    return Job.objects.create(kind=kind, created_by=user, params=params or {})
+
+
+def claim_next_job() -> Job | None:
+    """
+    Atomically move the oldest pending Job to RUNNING & return it, so that
+    concurrent workers never pick up the same Job.
+
+    Uses `SELECT ... FOR UPDATE SKIP LOCKED` where supported (PostgreSQL,
+    MySQL 8), otherwise a conditional UPDATE on the status (SQLite).
+    """
+
+    pending = Job.objects.filter(status=Job.Status.PENDING).order_by("id")
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = pending.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = Job.Status.RUNNING
+            job.started_at = job.heartbeat_at = timezone.now()
+            job.save(update_fields=["status", "started_at", "heartbeat_at"])
+            return job
+
+    while pk := pending.values_list("pk", flat=True).first():
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=pk, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job: Job) -> Job:
+    """
+    Run a claimed Job through its registered handler, recording progress,
+    result & outcome on the Job.
+    """
+
+    last_progress = job.progress
+    last_heartbeat = time.monotonic()
+
+    def report_progress(done: int, total: int) -> None:
+        nonlocal last_progress, last_heartbeat
+        progress = min(100, done * 100 // total) if total else 100
+        # Only write to DB when the visible percentage actually moves, or
+        # the heartbeat is due
+        beat = time.monotonic()
+        if progress != last_progress or beat - last_heartbeat >= HEARTBEAT_INTERVAL:
+            Job.objects.filter(pk=job.pk).update(
+                progress=progress, heartbeat_at=timezone.now()
+            )
+            last_progress, last_heartbeat = progress, beat
+
+    try:
+        job.result_name = JOB_HANDLERS[job.kind](job, report_progress)
+    except Exception:
+        logger.exception("Job %s failed", job)
+        job.status = Job.Status.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.progress = 100
+
+    job.finished_at = timezone.now()
+    # Unless `fail_stale_jobs()` gave up on it meanwhile
+    finished = Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING).update(
+        status=job.status,
+        progress=job.progress,
+        result_file=job.result_file,
+        result_name=job.result_name,
+        error=job.error,
+        finished_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Job %s finished after going stale, result discarded", job.pk)
+        job.delete_files()
+        job.refresh_from_db()
+    return job
+
+
+def fail_stale_jobs(stale_after: timedelta) -> int:
+    """
+    Mark RUNNING Jobs without a heartbeat for `stale_after` as FAILED (their
+    worker died), removing what they wrote; return how many.
+    """
+
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING, heartbeat_at__lt=now - stale_after
+    )
+    failed = 0
+    for job in stale.only("pk", "result_file", "params"):
+        # Conditional: its worker may have finished it meanwhile
+        if stale.filter(pk=job.pk).update(
+            status=Job.Status.FAILED,
+            error="The worker running the Job stopped responding.",
+            finished_at=now,
+        ):
+            logger.warning("Job %s went stale", job.pk)
+            job.delete_files()
+            failed += 1
+    return failed
+
+
+def delete_expired_jobs(before: datetime) -> int:
+    """
+    Delete Jobs finished before `before` along with their result files;
+    return how many.
+    """
+
+    expired = list(
+        Job.objects.filter(finished_at__lt=before).only("pk", "result_file", "params")
+    )
+    for job in expired:
+        job.delete_files()
+    deleted, _ = Job.objects.filter(pk__in=[job.pk for job in expired]).delete()
+    return deleted
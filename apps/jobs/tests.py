@@ -0,0 +1,156 @@
+import io
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from apps.jobs.models import Job
+from apps.jobs.services import (
+    claim_next_job,
+    delete_expired_jobs,
+    enqueue,
+    fail_stale_jobs,
+    run_job,
+)
+from apps.pages.exports import EXPORT_JOB_KIND
+from apps.pages.models import Transaction
+
+User = get_user_model()
+
+
+@override_settings(JOBS_RESULT_DIR=tempfile.mkdtemp())
+class JobTestCase(TestCase):
+    """
+    Unit tests for the background Job queue & the export Job handler.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        baker.make(Transaction, remarks="Lunch", created_by=cls.user, _quantity=3)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_claim_is_exclusive(self):
+        job = enqueue(EXPORT_JOB_KIND, self.user, {"format": "csv"})
+        self.assertEqual(claim_next_job(), job)
+        self.assertIsNone(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.RUNNING)
+
+    def test_stale_running_jobs_fail(self):
+        stale = enqueue(EXPORT_JOB_KIND, self.user, {"format": "csv"})
+        live = enqueue(EXPORT_JOB_KIND, self.user, {"format": "csv"})
+        for job in (claim_next_job(), claim_next_job()):
+            self.assertIsNotNone(job.heartbeat_at)
+            # Partly written when its worker died
+            with job.open_result_file() as fileobj:
+                fileobj.write(b"id,")
+        Job.objects.filter(pk=stale.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=20)
+        )
+
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            self.assertEqual(fail_stale_jobs(timedelta(minutes=15)), 1)
+        self.assertEqual(fail_stale_jobs(timedelta(minutes=15)), 0)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.Status.FAILED)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertFalse(stale.result_path.exists())
+        live.refresh_from_db()
+        self.assertEqual(live.status, Job.Status.RUNNING)
+        self.assertTrue(live.result_path.exists())
+
+    def test_slow_job_stays_failed_once_stale(self):
+        job = enqueue(EXPORT_JOB_KIND, self.user, {"format": "csv", "query_params": {}})
+        job = claim_next_job()
+        Job.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=20)
+        )
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            fail_stale_jobs(timedelta(minutes=15))
+
+        with self.assertLogs("apps.jobs.services", "WARNING"):
+            job = run_job(job)
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.result_file, "")
+        self.assertFalse(job.result_path.exists())
+        response = self.client.get(reverse("jobs-download", args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_expired_jobs_are_deleted(self):
+        expired, kept = [
+            enqueue(EXPORT_JOB_KIND, self.user, {"format": "csv", "query_params": {}})
+            for _ in range(2)
+        ]
+        call_command("run_jobs", "--once", stdout=io.StringIO())
+        expired.refresh_from_db()
+        self.assertTrue(Path(expired.result_file).exists())
+
+        Job.objects.filter(pk=expired.pk).update(
+            finished_at=timezone.now() - timedelta(days=8)
+        )
+        self.assertEqual(delete_expired_jobs(timezone.now() - timedelta(days=7)), 1)
+        self.assertFalse(Job.objects.filter(pk=expired.pk).exists())
+        self.assertFalse(Path(expired.result_file).exists())
+        kept.refresh_from_db()
+        self.assertTrue(Path(kept.result_file).exists())
+
+        # The worker housekeeps before claiming
+        Job.objects.filter(pk=kept.pk).update(
+            finished_at=timezone.now() - timedelta(days=8)
+        )
+        stdout = io.StringIO()
+        call_command("run_jobs", "--once", stdout=stdout)
+        self.assertIn("deleted 1 expired Job(s)", stdout.getvalue())
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            enqueue("unknown", self.user)
+
+    def test_failed_job_records_error(self):
+        job = enqueue(EXPORT_JOB_KIND, self.user, {"format": "pdf"})
+        with self.assertLogs("apps.jobs.services", "ERROR"):
+            job = run_job(claim_next_job())
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("KeyError", job.error)
+
+    def test_export_job_end_to_end(self):
+        response = self.client.post(
+            reverse("transactions-export-job", args=["csv"]),
+            HTTP_REFERER="http://testserver/?remarks=lunch",
+        )
+        self.assertEqual(response.status_code, 200)
+        job = Job.objects.get()
+        self.assertContains(response, reverse("jobs-status", args=[job.pk]))
+        self.assertEqual(job.params["query_params"], {"remarks": ["lunch"]})
+
+        call_command("run_jobs", "--once", stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.progress, 100)
+        response = self.client.get(reverse("jobs-status", args=[job.pk]))
+        self.assertContains(response, reverse("jobs-download", args=[job.pk]))
+        self.assertNotContains(response, "hx-trigger")
+
+        response = self.client.get(reverse("jobs-download", args=[job.pk]))
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn('filename="transactions.csv"', response["Content-Disposition"])
+        self.assertEqual(content.count("Lunch"), 3)
+
+    def test_other_users_jobs_are_hidden(self):
+        job = enqueue(
+            EXPORT_JOB_KIND, baker.make(User), {"format": "csv", "query_params": {}}
+        )
+        run_job(claim_next_job())
+        response = self.client.get(reverse("jobs-download", args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from apps.jobs.views import JobDownloadView, JobStatusView
+
+
+urlpatterns = [
+    path("<int:pk>/", JobStatusView.as_view(), name="jobs-status"),
+    path("<int:pk>/download/", JobDownloadView.as_view(), name="jobs-download"),
+]
@@ -0,0 +1,40 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, HttpRequest
+from django.shortcuts import get_object_or_404
+from django.views import View
+from django.views.generic import DetailView
+
+from .models import Job
+
+
+class JobStatusView(LoginRequiredMixin, DetailView):
+    """
+    Renders a Job's status; the partial keeps polling itself through HTMX
+    until the Job is finished.
+    """
+
+    template_name = "jobs/job_status.html"
+    context_object_name = "job"
+    login_url = "auth_signin"
+
+    def get_queryset(self):
+        return Job.objects.filter(created_by=self.request.user)
+
+
+class JobDownloadView(LoginRequiredMixin, View):
+    """
+    Downloads the result file of a successfully finished Job.
+    """
+
+    login_url = "auth_signin"
+
+    def get(self, request: HttpRequest, pk: int):
+        job = get_object_or_404(
+            Job, pk=pk, created_by=request.user, status=Job.Status.SUCCEEDED
+        )
+        try:
+            fileobj = open(job.result_file, "rb")
+        except OSError:
+            raise Http404("Job result file no longer exists.")
+
+        return FileResponse(fileobj, as_attachment=True, filename=job.result_name)
@@ -1 +1,11 @@
-# Register your models here.
+from django.contrib import admin
+
+from apps.pages.models import CategoryRule
+
+
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = ("pattern", "match_type", "category", "priority", "created_by")
+    list_filter = ("match_type",)
+    search_fields = ("pattern",)
+    list_select_related = ("category", "created_by")
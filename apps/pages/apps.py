@@ -14,3 +14,6 @@ class PagesConfig(AppConfig):
 
         forms.RegistrationForm = CustomRegistrationForm
         views.RegistrationForm = CustomRegistrationForm
+
+        # Registers the background export/import Job handlers & signal receivers
+        from . import exports, imports, signals  # noqa: F401
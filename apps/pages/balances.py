@@ -0,0 +1,148 @@
+"""
+Running balance (income minus expenses so far) of the Transactions shown in
+a datatables page, whichever column the page is sorted by.
+
+A row's balance sums every row of the (filtered) table up to it in
+(date_time, id) order, not just those of the page. It's the balance at the
+start of the row's local month, read off `TransactionRollup` (a
+checkpoint), plus a window sum over that month's rows up to it, read in
+index order: each page costs the months it spans, however long the
+history.
+"""
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    DecimalField,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.http import QueryDict
+
+from apps.pages.filters import TransactionDataTablesFilter
+from apps.pages.models import Transaction, TransactionRollup
+from apps.pages.rollups import month_of
+from apps.pages.series import local_midnight
+from apps.pages.summary import INCOME, filter_params
+
+# Datatables filters rollup rows can't be scoped by.
+NON_ROLLUP_FILTERS = {"remarks"}
+
+CENTS = Decimal("0.01")
+
+
+def signed(field: str) -> Case:
+    """`field` counted in for income & out for expenses."""
+    return Case(
+        When(INCOME, then=F(field)),
+        default=-F(field),
+        output_field=DecimalField(max_digits=21, decimal_places=2),
+    )
+
+
+def rollup_queryset(user, data: QueryDict | None = None) -> QuerySet | None:
+    """
+    The user's rollup rows, scoped by the datatables' filters given in
+    `data` like their Transactions; None if some filter can't apply to them.
+    """
+
+    if NON_ROLLUP_FILTERS.intersection(filter_params(data)):
+        return None
+    # Filtered fields are rollup key fields too, of the same names
+    queryset = TransactionRollup.objects.filter(created_by=user)
+    return TransactionDataTablesFilter(data, queryset=queryset).qs
+
+
+def month_checkpoints(
+    queryset: QuerySet[Transaction],
+    months: list[date],
+    rollups: QuerySet | None = None,
+) -> dict[date, Decimal]:
+    """
+    Balance of the Transactions before each of the (local) `months`, all in
+    one query: off `rollups` if given, else the Transactions themselves.
+    """
+
+    if rollups is not None:
+        amount = signed("total_amount")
+        before = [Q(month__lt=month) for month in months]
+        queryset = rollups
+    else:
+        amount = signed("amount")
+        before = [Q(date_time__lt=local_midnight(month)) for month in months]
+    row = queryset.order_by().aggregate(
+        **{
+            f"month_{i}": Sum(amount, filter=condition, default=Value(Decimal("0")))
+            for i, condition in enumerate(before)
+        }
+    )
+    return {month: row[f"month_{i}"] for i, month in enumerate(months)}
+
+
+def running_balances(
+    queryset: QuerySet[Transaction],
+    records: Iterable[Transaction],
+    rollups: QuerySet | None = None,
+) -> dict[int, Decimal]:
+    """
+    Running balance of `queryset`'s Transactions at each of `records`
+    (some of them, e.g. a page), keyed by pk.
+
+    `rollups` are the rollup rows scoped like `queryset` (see
+    `rollup_queryset()`), if it can be read off them.
+    """
+
+    records = list(records)
+    # Latest record of each month: window sums stop there
+    months = {}
+    for record in records:
+        month = month_of(record.date_time)
+        months[month] = max(months.get(month, record.date_time), record.date_time)
+    if not months:
+        return {}
+
+    starts = sorted(months)
+    checkpoints = month_checkpoints(queryset, starts, rollups)
+    # Months' rows in index order, summed up by one window over all of them
+    bounds = [local_midnight(start) for start in starts]
+    rows = (
+        queryset.filter(
+            Q(
+                *(
+                    Q(date_time__gte=bound, date_time__lte=months[start])
+                    for start, bound in zip(starts, bounds)
+                ),
+                _connector=Q.OR,
+            )
+        )
+        .annotate(
+            balance=Window(
+                Sum(signed("amount")),
+                order_by=[F("date_time").asc(), F("id").asc()],
+            )
+        )
+        .order_by("date_time", "id")
+        .values_list("pk", "date_time", "balance")
+    )
+
+    pks = {record.pk for record in records}
+    balances = {}
+    index, offset, previous = -1, Decimal("0"), Decimal("0")
+    for pk, date_time, balance in rows:
+        while index + 1 < len(bounds) and date_time >= bounds[index + 1]:
+            # Next month: the window's sum so far belongs to earlier ones
+            index += 1
+            offset = previous
+        if pk in pks:
+            balance_at = checkpoints[starts[index]] + balance - offset
+            balances[pk] = balance_at.quantize(CENTS)
+        previous = balance
+    return balances
@@ -0,0 +1,90 @@
+"""
+Per-user versioned cache for aggregates derived from Transactions.
+
+Every cache key embeds the user's current data version, plus a global one
+covering data shared between users (e.g. Category names). Versions are read
+off the `ChangeMarker` rows every write touches within its DB transaction
+(see `apps.pages.markers`), so that all processes see them move whatever
+the cache backend: stale entries simply become unreachable & fall out of
+the cache on their own.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from apps.pages import markers
+
+HITS_KEY = "cache-stats:hits"
+MISSES_KEY = "cache-stats:misses"
+
+_MISSING = object()
+
+
+def _incr(key: str, initial: Callable[[], int]) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing key: first bump, or evicted in the meantime
+        if not cache.add(key, initial(), timeout=None):
+            cache.incr(key)
+
+
+def _version(modified_at: datetime | None) -> str:
+    return modified_at.isoformat() if modified_at is not None else "0"
+
+
+def get_versions(user_id: int) -> tuple[str, str]:
+    """Return the (user, global) data versions, in a single query."""
+    return tuple(
+        _version(modified_at)
+        for modified_at in markers.versions(
+            [markers.user_scope(user_id), markers.CATEGORIES_SCOPE]
+        )
+    )
+
+
+def cached_for_user(
+    user_id: int,
+    name: str,
+    compute: Callable[[], Any],
+    params: dict | None = None,
+    timeout: int | None = DEFAULT_TIMEOUT,
+) -> Any:
+    """
+    Return the cached result of `compute()` for the user's current data
+    version, computing & caching it on a miss.
+
+    `name` identifies the aggregate & `params` (JSON serializable) whatever
+    else its result depends on, e.g. filters.
+    """
+
+    user_version, global_version = get_versions(user_id)
+    digest = hashlib.md5(
+        json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    key = f"aggregate:{name}:{user_id}:{user_version}:{global_version}:{digest}"
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _incr(HITS_KEY, lambda: 1)
+        return value
+
+    _incr(MISSES_KEY, lambda: 1)
+    value = compute()
+    cache.set(key, value, timeout=timeout)
+    return value
+
+
+def get_stats() -> dict[str, int]:
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": stats.get(HITS_KEY, 0), "misses": stats.get(MISSES_KEY, 0)}
+
+
+def reset_stats() -> None:
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,312 @@
+"""
+Auto-categorization of Transactions from their remarks, by `CategoryRule`.
+
+All of a user's rules are compiled into a single `RuleMatcher`, around an
+Aho-Corasick automaton finding every keyword of a text in one pass over it,
+however many keywords there are. Regexes go through the automaton too, by
+a literal any of their matches must contain: only those whose literal shows
+up get run, so the cost per text stays flat as rules pile up. Compiled
+matchers are kept per process until the user's rules (or Categories)
+change, as their `ChangeMarker` rows tell.
+"""
+
+import heapq
+import re
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.pages.markers import CATEGORIES_SCOPE, rules_scope, versions
+from apps.pages.models import CategoryRule, Transaction
+
+# Characters starting a regex group, set or quantifier, or escaping a class
+# (e.g. "\\d") rather than a literal character.
+REGEX_SPECIAL = set(".^$*+?{}[]()|")
+QUANTIFIERS = set("*?{")
+
+# Verbose mode, where whitespace isn't literal.
+VERBOSE_FLAG_RE = re.compile(r"\(\?[a-zA-Z]*x")
+
+# Compiled matchers kept in each process, least recently used evicted first.
+MATCHERS_CACHE_SIZE = 256
+
+# Transactions read (& updated) at a time by `recategorize()`.
+RECATEGORIZE_CHUNK_SIZE = 2000
+
+_matchers: OrderedDict[int, tuple[tuple, "RuleMatcher"]] = OrderedDict()
+
+
+def normalize(text: str | None) -> str:
+    # "İ" casefolds to "i" & a combining dot, yet matches "i" in regexes
+    return (text or "").casefold().replace("i\u0307", "i")
+
+
+def validate_pattern(match_type: str, pattern: str) -> None:
+    if match_type == CategoryRule.MatchType.REGEX:
+        try:
+            re.compile(pattern)
+        except re.error as ex:
+            raise ValidationError({"pattern": f"Invalid regular expression: {ex}"})
+    elif not normalize(pattern).strip():
+        raise ValidationError({"pattern": "Keywords may not be blank."})
+
+
+def required_literal(pattern: str) -> str:
+    """
+    Longest (ASCII, casefolded) literal every match of a regex contains, or
+    "" if none could be found.
+
+    Conservative: groups, sets & escapes other than of punctuation are
+    skipped, quantified characters dropped, and top-level alternations or
+    verbose mode give up altogether.
+    """
+
+    if VERBOSE_FLAG_RE.search(pattern):
+        return ""
+    runs, run = [], ""
+    depth, in_set, index = 0, False, 0
+    while index < len(pattern):
+        char = pattern[index]
+        index += 1
+        if char == "\\":
+            escaped = pattern[index : index + 1]
+            index += 1
+            if depth or in_set:
+                continue
+            if escaped.isascii() and not escaped.isalnum() and escaped.isprintable():
+                run += escaped
+                continue
+            runs.append(run)
+            run = ""
+        elif in_set:
+            # A leading "]" (or "^]") is literal
+            if char == "]" and pattern[index - 2] not in "[^":
+                in_set = False
+        elif char == "[":
+            in_set = True
+            runs.append(run)
+            run = ""
+        elif char == "(":
+            depth += 1
+            runs.append(run)
+            run = ""
+        elif char == ")":
+            depth -= 1
+        elif depth:
+            continue
+        elif char == "|":
+            return ""
+        elif char in REGEX_SPECIAL or not char.isascii():
+            if char in QUANTIFIERS:
+                # The previous character is optional
+                run = run[:-1]
+            if char == "{":
+                # "{m,n}" bounds are no literal: skip to the closing brace
+                closing = pattern.find("}", index)
+                if closing != -1:
+                    index = closing + 1
+            runs.append(run)
+            run = ""
+        else:
+            run += char
+    runs.append(run)
+    return max(runs, key=len).casefold()
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over keywords, each tagged with a value: finds
+    the values of every keyword occurring in a text in O(len(text)).
+    """
+
+    def __init__(self, keywords: Iterable[tuple[str, int]]):
+        # Trie: goto transitions, failure links & values ending at each node
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[list[int]] = [[]]
+
+        for keyword, value in keywords:
+            node = 0
+            for char in keyword:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.outputs[node].append(value)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                # Keywords ending at the failure node end here too
+                self.outputs[child] = (
+                    self.outputs[child] + self.outputs[self.fail[child]]
+                )
+
+    def find(self, text: str) -> Iterable[int]:
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            yield from outputs[node]
+
+
+class RuleMatcher:
+    """
+    All of a user's rules, compiled: `match()` returns the Category id of
+    the winning rule among those matching given remarks, if any.
+
+    Rules are numbered in order (highest priority, then oldest first), the
+    lowest number matching wins. Keywords & the literals required by regexes
+    are all looked up in one pass of the automaton, then only the regexes
+    whose literal was found (or that have none) & that could still beat the
+    best keyword are run, in order, until one matches.
+    """
+
+    def __init__(self, rules: Iterable[CategoryRule]):
+        # Rule number -> category id
+        self.categories: list[int] = []
+        # Rule number -> compiled regex, for regex rules
+        self.regexes: dict[int, re.Pattern] = {}
+        # Numbers of the regex rules without a required literal, in order
+        self.unfiltered: list[int] = []
+        literals = []
+        for number, rule in enumerate(rules):
+            self.categories.append(rule.category_id)
+            if rule.match_type == CategoryRule.MatchType.REGEX:
+                try:
+                    self.regexes[number] = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error:
+                    # Saved without validation, never matches
+                    continue
+                if literal := required_literal(rule.pattern):
+                    literals.append((literal, number))
+                else:
+                    self.unfiltered.append(number)
+            elif keyword := normalize(rule.pattern):
+                literals.append((keyword, number))
+
+        self.automaton = AhoCorasick(literals) if literals else None
+
+    def __bool__(self) -> bool:
+        return bool(self.categories)
+
+    def match(self, remarks: str | None) -> int | None:
+        if not remarks:
+            return None
+        best = len(self.categories)
+        candidates = set()
+        if self.automaton is not None:
+            for number in self.automaton.find(normalize(remarks)):
+                if number in self.regexes:
+                    candidates.add(number)
+                elif number < best:
+                    best = number
+
+        for number in heapq.merge(sorted(candidates), self.unfiltered):
+            if number >= best:
+                break
+            if self.regexes[number].search(remarks):
+                best = number
+                break
+        return self.categories[best] if best < len(self.categories) else None
+
+
+def get_matcher(user_id: int) -> RuleMatcher:
+    """
+    The user's compiled `RuleMatcher`, recompiled only once their rules or
+    the Categories changed.
+    """
+
+    # Off the DB: rules may change in any process
+    version = versions([rules_scope(user_id), CATEGORIES_SCOPE])
+    cached = _matchers.get(user_id)
+    if cached is not None and cached[0] == version:
+        _matchers.move_to_end(user_id)
+        return cached[1]
+
+    matcher = RuleMatcher(
+        CategoryRule.objects.filter(created_by_id=user_id).order_by("-priority", "id")
+    )
+    _matchers[user_id] = (version, matcher)
+    _matchers.move_to_end(user_id)
+    while len(_matchers) > MATCHERS_CACHE_SIZE:
+        _matchers.popitem(last=False)
+    return matcher
+
+
+def categorize(objs: Iterable[Transaction]) -> list[Transaction]:
+    """
+    Assign a Category to every uncategorized (unsaved) Transaction of `objs`
+    matched by its user's rules; return those which got one.
+    """
+
+    matchers: dict[int, RuleMatcher] = {}
+    categorized = []
+    for obj in objs:
+        if obj.category_id is not None:
+            continue
+        if obj.created_by_id not in matchers:
+            matchers[obj.created_by_id] = get_matcher(obj.created_by_id)
+        if (category_id := matchers[obj.created_by_id].match(obj.remarks)) is not None:
+            obj.category_id = category_id
+            categorized.append(obj)
+    return categorized
+
+
+def recategorize(
+    user_ids: Iterable[int] | None = None,
+    chunk_size: int = RECATEGORIZE_CHUNK_SIZE,
+    dry_run: bool = False,
+) -> int:
+    """
+    Assign a Category to the stored uncategorized Transactions of the given
+    users (default: all) matched by their rules; return how many got one.
+
+    Rows are read in primary key order, `chunk_size` at a time (keyset
+    pagination, no OFFSET), & written with one `update()` per Category of
+    each chunk.
+    """
+
+    rules = CategoryRule.objects.all()
+    if user_ids is not None:
+        rules = rules.filter(created_by_id__in=list(user_ids))
+    categorized = 0
+
+    for user_id in rules.order_by().values_list("created_by_id", flat=True).distinct():
+        matcher = get_matcher(user_id)
+        uncategorized = Transaction.objects.filter(
+            created_by_id=user_id, category__isnull=True
+        ).order_by("pk")
+        last_pk = 0
+        while chunk := list(
+            uncategorized.filter(pk__gt=last_pk).values_list("pk", "remarks")[
+                :chunk_size
+            ]
+        ):
+            last_pk = chunk[-1][0]
+            pks_by_category: dict[int, list[int]] = {}
+            for pk, remarks in chunk:
+                if (category_id := matcher.match(remarks)) is not None:
+                    pks_by_category.setdefault(category_id, []).append(pk)
+
+            categorized += sum(map(len, pks_by_category.values()))
+            if dry_run:
+                continue
+            with transaction.atomic():
+                for category_id, pks in pks_by_category.items():
+                    uncategorized.filter(pk__in=pks).update(category_id=category_id)
+    return categorized
@@ -0,0 +1,82 @@
+"""
+Downsampling of time series for charts, keeping their visual peaks.
+
+A chart can't draw more points than it has pixels across, so the x-axis
+(time) is cut into as many equal intervals as the chart can show, and
+only the points holding the minimum & maximum of each interval are kept
+(min/max per pixel bucket): every peak & trough survives, whatever the
+length of the series.
+
+Series sharing one x-axis keep the union of their points, read off every
+series alike, so they still share it after downsampling.
+"""
+
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+
+def minmax_indices(
+    x: np.ndarray, ys: Sequence[np.ndarray], max_points: int
+) -> np.ndarray:
+    """
+    Sorted indices of the points to keep, at most `max_points` of them (or
+    2 per series if more), out of the points at sorted positions `x` & the
+    values `ys` of each series there.
+    """
+
+    size = len(x)
+    if size <= max_points or not len(ys):
+        return np.arange(size)
+
+    intervals = max(max_points // (2 * len(ys)), 1)
+    x = x.astype(np.float64)
+    span = x[-1] - x[0]
+    if span > 0:
+        interval_of = np.minimum(
+            ((x - x[0]) * (intervals / span)).astype(np.int64), intervals - 1
+        )
+    else:
+        interval_of = np.zeros(size, dtype=np.int64)
+
+    # x being sorted, intervals are contiguous runs of points
+    starts = np.flatnonzero(np.diff(interval_of, prepend=-1))
+    lengths = np.diff(starts, append=size)
+
+    keep = []
+    for y in ys:
+        for reduce in (np.minimum, np.maximum):
+            extremes = np.repeat(reduce.reduceat(y, starts), lengths)
+            # First point of each interval reaching its extreme
+            hits = np.flatnonzero(y == extremes)
+            keep.append(hits[np.searchsorted(hits, starts)])
+    return np.unique(np.concatenate(keep))
+
+
+def downsample_series(data: dict, max_points: int) -> dict:
+    """
+    `transaction_series()` data, with at most `max_points` buckets (see
+    `minmax_indices()`) of its totals.
+    """
+
+    buckets = data["buckets"]
+    if len(buckets) <= max_points or data["bucket"] is None:
+        return data
+
+    totals = [np.asarray(item["totals"], dtype=np.float64) for item in data["series"]]
+    # Day numbers: far cheaper to build than a datetime64 array of dates
+    x = np.fromiter(map(date.toordinal, buckets), dtype=np.int64, count=len(buckets))
+    indices = minmax_indices(x, totals, max_points)
+    return {
+        **data,
+        "buckets": [buckets[index] for index in indices.tolist()],
+        "series": [
+            {
+                "key": item["key"],
+                "totals": total[indices].tolist(),
+                "counts": np.asarray(item["counts"])[indices].tolist(),
+            }
+            for item, total in zip(data["series"], totals)
+        ],
+    }
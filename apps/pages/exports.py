@@ -0,0 +1,383 @@
+import csv
+import gzip
+import io
+import tempfile
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, NamedTuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db.models import QuerySet
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from apps.jobs.models import Job
+from apps.jobs.registry import register
+from apps.pages.models import Transaction
+from apps.pages.search import search
+
+# Order matters: both tuples must line up with each other & the exported files.
+EXPORT_FIELDS = (
+    "date_time",
+    "amount",
+    "payment_type",
+    "category__name",
+    "transaction_type",
+    "remarks",
+    "created_by__username",
+)
+EXPORT_COLUMNS = (
+    "Datetime",
+    "Amount(RM)",
+    "Payment Type",
+    "Category",
+    "Transaction Type",
+    "Remarks",
+    "Created By",
+)
+EXPORT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Job kind under which exports are queued to run in the background.
+EXPORT_JOB_KIND = "transactions-export"
+
+# Rows fetched per DB round-trip (server-side cursor on PostgreSQL).
+EXPORT_CHUNK_SIZE = 2000
+
+# Excel's hard limit of rows per worksheet (header row included).
+XLSX_MAX_ROWS = 1_048_576
+
+# Size of blocks read back from temporary files while streaming them.
+FILE_BLOCK_SIZE = 64 * 1024
+
+# zlib compression level used by the "csv.gz" & "zip" exports by default.
+DEFAULT_COMPRESSLEVEL = 6
+# Compression levels accepted as `?level=` query param values.
+COMPRESS_LEVELS = {str(level) for level in range(10)}
+
+# Rows buffered into each Parquet row group.
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+
+# Typed columns for the Parquet & Arrow IPC exports; low-cardinality
+# text columns are dictionary encoded.
+ARROW_SCHEMA = pa.schema(
+    [
+        pa.field(EXPORT_COLUMNS[0], pa.timestamp("us", tz="UTC")),
+        pa.field(EXPORT_COLUMNS[1], pa.decimal128(19, 2)),
+        pa.field(EXPORT_COLUMNS[2], pa.dictionary(pa.int32(), pa.string())),
+        pa.field(EXPORT_COLUMNS[3], pa.dictionary(pa.int32(), pa.string())),
+        pa.field(EXPORT_COLUMNS[4], pa.dictionary(pa.int32(), pa.string())),
+        pa.field(EXPORT_COLUMNS[5], pa.string()),
+        pa.field(EXPORT_COLUMNS[6], pa.string()),
+    ]
+)
+
+
+def filter_export_queryset(user, query_params: dict[str, list[str]]) -> QuerySet:
+    """
+    Return `user`'s Transactions filtered by the datatables' query params,
+    as extracted by `TransactionsExportView.extract_query_params()`.
+    """
+
+    qs = Transaction.objects.filter(created_by=user).order_by("-date_time")
+
+    if "remarks" in query_params and query_params["remarks"][0] != "":
+        qs = search(qs, query_params["remarks"][0])
+
+    if "payment_type" in query_params and query_params["payment_type"][0] != "":
+        qs = qs.filter(payment_type=query_params["payment_type"][0])
+
+    if "transaction_type" in query_params and query_params["transaction_type"][0] != "":
+        qs = qs.filter(transaction_type=query_params["transaction_type"][0])
+
+    if "category" in query_params and query_params["category"]:
+        qs = qs.filter(category__pk__in=query_params["category"])
+
+    return qs
+
+
+def iter_row_chunks(
+    queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list[tuple]]:
+    """
+    Yield the exported columns of given Transaction queryset as lists of
+    at most `chunk_size` tuples, without ever loading the whole result set.
+    """
+
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    Non-seekable, write-only file object for writers (Parquet, gzip, zip...)
+    whose output is handed over piece by piece via `drain()`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._blocks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._blocks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._blocks)
+        self._blocks.clear()
+        return data
+
+
+def format_datetime(value: datetime | None) -> str | None:
+    return value.strftime(EXPORT_DATETIME_FORMAT) if value else value
+
+
+def stream_csv(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """
+    Encode row chunks into CSV, yielding one block of bytes per chunk.
+
+    Output matches what `DataFrame.to_csv(index=False)` used to produce.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield drain()
+
+    for chunk in chunks:
+        writer.writerows((format_datetime(row[0]), *row[1:]) for row in chunk)
+        yield drain()
+
+
+def _xlsx_header(worksheet) -> list[WriteOnlyCell]:
+    """Header cells styled the same way pandas' `to_excel` does it."""
+    thin = Side(style="thin")
+    cells = []
+    for column in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(worksheet, value=column)
+        cell.font = Font(bold=True)
+        cell.border = Border(top=thin, right=thin, bottom=thin, left=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        cells.append(cell)
+    return cells
+
+
+def write_xlsx(
+    chunks: Iterable[list[tuple]],
+    fileobj: BinaryIO,
+    max_rows: int = XLSX_MAX_ROWS,
+) -> None:
+    """
+    Write row chunks into `fileobj` as an XLSX workbook.
+
+    Uses openpyxl's write-only mode, which spools each worksheet to disk
+    instead of keeping every cell object in memory. Rows overflowing a
+    worksheet's `max_rows` carry on in a new one ("Sheet1", "Sheet2", ...).
+    """
+
+    workbook = Workbook(write_only=True)
+    worksheet = None
+    sheet_rows = max_rows
+
+    for chunk in chunks:
+        for row in chunk:
+            if sheet_rows >= max_rows:
+                worksheet = workbook.create_sheet(
+                    f"Sheet{len(workbook.worksheets) + 1}"
+                )
+                worksheet.append(_xlsx_header(worksheet))
+                sheet_rows = 1
+            worksheet.append((format_datetime(row[0]), *row[1:]))
+            sheet_rows += 1
+
+    if worksheet is None:
+        worksheet = workbook.create_sheet("Sheet1")
+        worksheet.append(_xlsx_header(worksheet))
+
+    workbook.save(fileobj)
+
+
+def stream_xlsx(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """
+    Build the XLSX workbook in a temporary file, then yield it in blocks.
+
+    The workbook can only be zipped up once every row is written, but the
+    rows never have to be held in memory all at once.
+    """
+
+    with tempfile.TemporaryFile() as fileobj:
+        write_xlsx(chunks, fileobj)
+        fileobj.seek(0)
+        while block := fileobj.read(FILE_BLOCK_SIZE):
+            yield block
+
+
+def _record_batch(chunk: list[tuple]) -> pa.RecordBatch:
+    columns = zip(*chunk)
+    return pa.record_batch(
+        [
+            pa.array(values, type=field.type.value_type).dictionary_encode()
+            if pa.types.is_dictionary(field.type)
+            else pa.array(values, type=field.type)
+            for field, values in zip(ARROW_SCHEMA, columns)
+        ],
+        schema=ARROW_SCHEMA,
+    )
+
+
+def stream_parquet(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """
+    Encode row chunks into a Parquet file, yielding each row group as soon
+    as it has been written.
+    """
+
+    sink = StreamBuffer()
+    writer = pq.ParquetWriter(sink, ARROW_SCHEMA, compression="zstd")
+    batches, buffered_rows = [], 0
+
+    for chunk in chunks:
+        batches.append(_record_batch(chunk))
+        buffered_rows += len(chunk)
+        if buffered_rows >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pa.Table.from_batches(batches))
+            batches, buffered_rows = [], 0
+            yield sink.drain()
+
+    if batches:
+        writer.write_table(pa.Table.from_batches(batches))
+    writer.close()
+    yield sink.drain()
+
+
+def stream_arrow(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """
+    Encode row chunks using the Arrow IPC streaming format, one record batch
+    per chunk.
+    """
+
+    sink = StreamBuffer()
+    with pa.ipc.new_stream(sink, ARROW_SCHEMA) as writer:
+        yield sink.drain()
+        for chunk in chunks:
+            writer.write_batch(_record_batch(chunk))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_csv_gz(
+    chunks: Iterable[list[tuple]], compresslevel: int = DEFAULT_COMPRESSLEVEL
+) -> Iterator[bytes]:
+    """
+    Gzip the CSV stream on the fly, yielding compressed blocks as soon as
+    zlib emits them.
+    """
+
+    sink = StreamBuffer()
+    with gzip.GzipFile(
+        filename="transactions.csv",
+        mode="wb",
+        fileobj=sink,
+        compresslevel=compresslevel,
+    ) as archive:
+        for block in stream_csv(chunks):
+            archive.write(block)
+            if data := sink.drain():
+                yield data
+    yield sink.drain()
+
+
+def stream_zip(
+    chunks: Iterable[list[tuple]], compresslevel: int = DEFAULT_COMPRESSLEVEL
+) -> Iterator[bytes]:
+    """
+    Deflate the CSV stream into a single-member zip archive on the fly.
+
+    The member's sizes & CRC are written after its data (data descriptor),
+    so nothing needs to be seeked back to or buffered up front.
+    """
+
+    sink = StreamBuffer()
+    with zipfile.ZipFile(
+        sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+    ) as archive:
+        with archive.open("transactions.csv", mode="w", force_zip64=True) as member:
+            for block in stream_csv(chunks):
+                member.write(block)
+                if data := sink.drain():
+                    yield data
+    yield sink.drain()
+
+
+class ExportFormat(NamedTuple):
+    content_type: str
+    filename: str
+    stream: Callable[..., Iterator[bytes]]
+    # Whether `stream` accepts a zlib `compresslevel`.
+    compressed: bool = False
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", "transactions.csv", stream_csv),
+    "csv.gz": ExportFormat(
+        "application/gzip", "transactions.csv.gz", stream_csv_gz, compressed=True
+    ),
+    "zip": ExportFormat(
+        "application/zip", "transactions.zip", stream_zip, compressed=True
+    ),
+    "xlsx": ExportFormat(
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "transactions.xlsx",
+        stream_xlsx,
+    ),
+    "parquet": ExportFormat(
+        "application/vnd.apache.parquet", "transactions.parquet", stream_parquet
+    ),
+    "arrow": ExportFormat(
+        "application/vnd.apache.arrow.stream", "transactions.arrows", stream_arrow
+    ),
+}
+
+
+@register(EXPORT_JOB_KIND)
+def run_export_job(job: Job, report_progress: Callable[[int, int], None]) -> str:
+    """
+    Background counterpart of `TransactionsExportView.get()`: writes the
+    export into the Job's result file & returns its download filename.
+    """
+
+    params = dict(job.params)
+    export_format = EXPORT_FORMATS[params.pop("format")]
+    qs = filter_export_queryset(job.created_by, params.pop("query_params", {}))
+    total = qs.count()
+
+    def tracked_chunks() -> Iterator[list[tuple]]:
+        done = 0
+        for chunk in iter_row_chunks(qs):
+            yield chunk
+            done += len(chunk)
+            report_progress(done, total)
+
+    with job.open_result_file() as fileobj:
+        for block in export_format.stream(tracked_chunks(), **params):
+            fileobj.write(block)
+
+    return export_format.filename
@@ -7,6 +7,7 @@ from django_filters import (
 )
 from django import forms
 from apps.pages.models import Category, Transaction
+from apps.pages.search import search
 
 
 class TransactionDataTablesFilter(FilterSet):
@@ -15,7 +16,7 @@ class TransactionDataTablesFilter(FilterSet):
     """
 
     remarks = CharFilter(
-        lookup_expr="icontains",
+        method="filter_remarks",
         label="Remarks",
         widget=widgets.forms.TextInput(attrs={"class": "form-control"}),
     )
@@ -34,6 +35,10 @@ class TransactionDataTablesFilter(FilterSet):
         label="Categories",
     )
 
+    def filter_remarks(self, queryset, name: str, value: str):
+        # Every word as a word prefix, off the full-text index
+        return search(queryset, value)
+
     class Meta:
         model = Transaction
         fields = [
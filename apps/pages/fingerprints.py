@@ -0,0 +1,81 @@
+"""
+Content fingerprints of Transactions, for duplicate detection.
+
+A fingerprint hashes what identifies a statement line: its user, timestamp
+(to the second, as exported), amount, type & remarks (case & whitespace
+insensitive). Rows sharing one are likely duplicates, e.g. of a bank
+statement imported twice, & are found with a lookup on
+`txn_user_fingerprint_idx` instead of comparing rows pairwise.
+"""
+
+import hashlib
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.utils import timezone
+
+# Transaction fields a fingerprint depends on.
+FINGERPRINT_FIELDS = {
+    "created_by",
+    "created_by_id",
+    "date_time",
+    "amount",
+    "transaction_type",
+    "remarks",
+}
+
+# Columns read by `row_fingerprint()`.
+FINGERPRINT_VALUES = (
+    "created_by_id",
+    "date_time",
+    "amount",
+    "transaction_type",
+    "remarks",
+)
+
+CENTS = Decimal("0.01")
+
+
+def normalize_remarks(remarks: str | None) -> str:
+    return " ".join((remarks or "").split()).casefold()
+
+
+def fingerprint(
+    created_by_id: int,
+    date_time: datetime,
+    amount: Decimal,
+    transaction_type: str,
+    remarks: str | None,
+) -> str:
+    if timezone.is_naive(date_time):
+        date_time = timezone.make_aware(date_time)
+    content = "\x1f".join(
+        (
+            str(created_by_id),
+            date_time.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            f"{Decimal(str(amount)).quantize(CENTS):f}",
+            transaction_type,
+            normalize_remarks(remarks),
+        )
+    )
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def instance_fingerprint(obj) -> str:
+    """Fingerprint of a Transaction instance, whose values may be unparsed."""
+    date_time = obj._meta.get_field("date_time").to_python(obj.date_time)
+    return fingerprint(
+        obj.created_by_id, date_time, obj.amount, obj.transaction_type, obj.remarks
+    )
+
+
+def row_fingerprint(row: dict) -> str:
+    """Fingerprint of a `values(*FINGERPRINT_VALUES)` row."""
+    return fingerprint(
+        row["created_by_id"],
+        row["date_time"],
+        row["amount"],
+        row["transaction_type"],
+        row["remarks"],
+    )
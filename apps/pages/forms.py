@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from admin_black.forms import RegistrationForm as AdminBlackRegistrationForm
 from django import forms
+from apps.pages.imports import import_format_of
 from apps.pages.models import Category, Transaction
 
 User = get_user_model()
@@ -75,3 +76,22 @@ class TransactionForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["category"].queryset = Category.objects.all()
+
+
+class TransactionImportForm(forms.Form):
+    """
+    Form to upload a CSV/XLSX statement of Transactions to import.
+    """
+
+    file = forms.FileField(
+        label="Statement",
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv,.xlsx"}
+        ),
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if import_format_of(file.name) is None:
+            raise forms.ValidationError("Only CSV & XLSX files can be imported.")
+        return file
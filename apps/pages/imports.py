@@ -0,0 +1,326 @@
+import csv
+import io
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import Max
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from apps.jobs.models import Job
+from apps.jobs.registry import register
+from apps.pages.exports import EXPORT_COLUMNS, EXPORT_DATETIME_FORMAT, FILE_BLOCK_SIZE
+from apps.pages import categorization, fingerprints
+from apps.pages.models import Category, Transaction
+
+# Job kind under which uploaded statements are imported in the background.
+IMPORT_JOB_KIND = "transactions-import"
+
+# Transactions inserted per `bulk_create()` call.
+IMPORT_BATCH_SIZE = 2000
+
+# Columns of the error report written by import Jobs.
+IMPORT_ERROR_COLUMNS = ("Row", "Error")
+
+# A parsed row: its location in the file (e.g. "12" or "Sheet2!12") & values.
+Row = tuple[str, tuple]
+
+
+def check_header(header: Iterable | None) -> None:
+    """Raise ValueError unless `header` is the exporter's column layout."""
+    columns = tuple(header or ())[: len(EXPORT_COLUMNS)]
+    if columns != EXPORT_COLUMNS:
+        raise ValueError(
+            f"Expected columns {', '.join(EXPORT_COLUMNS)}, "
+            f"got {', '.join(map(str, columns)) or 'none'}."
+        )
+
+
+def read_csv(fileobj: BinaryIO) -> Iterator[Row]:
+    """Yield the rows of a CSV file, one line at a time."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        check_header(next(reader, None))
+        for values in reader:
+            yield str(reader.line_num), tuple(values)
+    finally:
+        # Leave `fileobj` open for the caller
+        text.detach()
+
+
+def read_xlsx(fileobj: BinaryIO) -> Iterator[Row]:
+    """
+    Yield the rows of every worksheet of an XLSX workbook (the exporter
+    carries on in "Sheet2"... past Excel's row limit).
+
+    Uses openpyxl's read-only mode, which parses worksheets lazily instead
+    of loading every cell object in memory.
+    """
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            check_header(next(rows, None))
+            for number, values in enumerate(rows, start=2):
+                yield f"{worksheet.title}!{number}", values
+    finally:
+        workbook.close()
+
+
+def count_csv_rows(fileobj: BinaryIO) -> int:
+    """Line count (header excluded) of a CSV file, read in blocks."""
+    lines = 0
+    while block := fileobj.read(FILE_BLOCK_SIZE):
+        lines += block.count(b"\n")
+    fileobj.seek(0)
+    return max(lines - 1, 0)
+
+
+def count_xlsx_rows(fileobj: BinaryIO) -> int:
+    """Row count (headers excluded) of a workbook, off its sheets' dimensions."""
+    workbook = load_workbook(fileobj, read_only=True)
+    try:
+        return sum(max((ws.max_row or 1) - 1, 0) for ws in workbook.worksheets)
+    finally:
+        workbook.close()
+        fileobj.seek(0)
+
+
+class ImportFormat(NamedTuple):
+    read: Callable[[BinaryIO], Iterator[Row]]
+    # Estimated number of rows, for progress reports.
+    count: Callable[[BinaryIO], int]
+
+
+IMPORT_FORMATS = {
+    "csv": ImportFormat(read_csv, count_csv_rows),
+    "xlsx": ImportFormat(read_xlsx, count_xlsx_rows),
+}
+
+
+def import_format_of(filename: str) -> str | None:
+    """Import format (a key of `IMPORT_FORMATS`) of `filename`, if supported."""
+    suffix = Path(filename).suffix.lower().lstrip(".")
+    return suffix if suffix in IMPORT_FORMATS else None
+
+
+class TransactionImporter:
+    """
+    Turns rows laid out like the exported files into Transactions, inserted
+    by batched `bulk_create()`.
+
+    Category names are resolved through an in-memory map of every Category,
+    usernames ("Created By") through a map filled as they show up. Only the
+    current batch is ever held in memory, so files of any size import with
+    flat memory usage. Invalid rows are skipped & handed to `on_error`.
+
+    Rows without a category get one from their user's `CategoryRule`s, if
+    any matches, see `apps.pages.categorization`.
+
+    Rows whose fingerprint matches a Transaction that existed before the
+    import are skipped as duplicates (one indexed lookup per batch), unless
+    `skip_duplicates` is False. Identical rows of the file itself are all
+    imported, as statements can genuinely repeat a line.
+    """
+
+    def __init__(
+        self,
+        user=None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        skip_duplicates: bool = True,
+    ):
+        # Owner of every imported row; `None` to use the "Created By" column
+        self.user = user
+        self.batch_size = batch_size
+        self.skip_duplicates = skip_duplicates
+        # Rows created by this import come after it
+        self.existing = Transaction.objects.filter(
+            pk__lte=Transaction.objects.aggregate(last=Max("pk"))["last"] or 0
+        )
+        self.categories = dict(Category.objects.values_list("name", "pk"))
+        self.user_ids: dict[str, int | None] = {}
+        self.fields = {
+            name: Transaction._meta.get_field(name)
+            for name in ("amount", "payment_type", "transaction_type", "remarks")
+        }
+        self.processed = 0
+        self.created = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    def clean(self, column: str, name: str, value):
+        try:
+            return self.fields[name].clean(value, None)
+        except ValidationError as ex:
+            raise ValueError(f"{column}: {' '.join(ex.messages)}")
+
+    def parse_datetime(self, value) -> datetime:
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.strptime(str(value).strip(), EXPORT_DATETIME_FORMAT)
+            except ValueError:
+                raise ValueError(
+                    f"{EXPORT_COLUMNS[0]}: Expected {EXPORT_DATETIME_FORMAT}, "
+                    f"got {value!r}."
+                )
+        # Exported in UTC
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        return value
+
+    def get_user_id(self, username) -> int:
+        if self.user is not None:
+            return self.user.pk
+        username = str(username or "").strip()
+        if username not in self.user_ids:
+            self.user_ids[username] = (
+                get_user_model()
+                .objects.filter(username=username)
+                .values_list("pk", flat=True)
+                .first()
+            )
+        if self.user_ids[username] is None:
+            raise ValueError(f"{EXPORT_COLUMNS[6]}: Unknown user {username!r}.")
+        return self.user_ids[username]
+
+    def parse(self, values: tuple) -> Transaction:
+        """Transaction of a row, or ValueError describing what's wrong with it."""
+        if len(values) < len(EXPORT_COLUMNS):
+            raise ValueError(
+                f"Expected {len(EXPORT_COLUMNS)} columns, got {len(values)}."
+            )
+        date_time, amount, payment_type, category, transaction_type, remarks, user = (
+            values[: len(EXPORT_COLUMNS)]
+        )
+
+        if amount in (None, ""):
+            raise ValueError(f"{EXPORT_COLUMNS[1]}: This field is required.")
+        if isinstance(amount, float):
+            # XLSX numbers: their shortest repr, not their binary expansion
+            amount = repr(amount)
+        category = str(category or "").strip()
+        if category and category not in self.categories:
+            raise ValueError(f"{EXPORT_COLUMNS[3]}: Unknown category {category!r}.")
+
+        obj = Transaction(
+            date_time=self.parse_datetime(date_time),
+            amount=self.clean(EXPORT_COLUMNS[1], "amount", amount),
+            payment_type=self.clean(EXPORT_COLUMNS[2], "payment_type", payment_type),
+            category_id=self.categories.get(category),
+            transaction_type=self.clean(
+                EXPORT_COLUMNS[4], "transaction_type", transaction_type
+            ),
+            remarks=self.clean(EXPORT_COLUMNS[5], "remarks", remarks or ""),
+            created_by_id=self.get_user_id(user),
+        )
+        obj.fingerprint = fingerprints.instance_fingerprint(obj)
+        return obj
+
+    def flush(self, batch: list[Transaction]) -> None:
+        objs = batch
+        if self.skip_duplicates and objs:
+            duplicates = self.existing.existing_fingerprints(objs)
+            objs = [obj for obj in objs if obj.fingerprint not in duplicates]
+            self.duplicates += len(batch) - len(objs)
+        if objs:
+            categorization.categorize(objs)
+            self.created += len(
+                Transaction.objects.bulk_create(objs, batch_size=self.batch_size)
+            )
+        batch.clear()
+
+    def run(
+        self,
+        rows: Iterable[Row],
+        on_error: Callable[[str, str], None] | None = None,
+        on_batch: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Import `rows`, calling `on_error(row, message)` for each skipped row
+        & `on_batch()` after each inserted batch.
+        """
+
+        batch = []
+        for label, values in rows:
+            if not any(value not in (None, "") for value in values):
+                continue
+            self.processed += 1
+            try:
+                batch.append(self.parse(values))
+            except ValueError as ex:
+                self.errors += 1
+                if on_error is not None:
+                    on_error(label, str(ex))
+
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                if on_batch is not None:
+                    on_batch()
+
+        self.flush(batch)
+        if on_batch is not None:
+            on_batch()
+
+
+def save_upload(upload: UploadedFile, import_format: str) -> str:
+    """
+    Copy an uploaded statement under `JOBS_RESULT_DIR`, for the import Job
+    to pick it up, & return its path.
+    """
+
+    path = (
+        Path(settings.JOBS_RESULT_DIR)
+        / "uploads"
+        / f"{uuid.uuid4().hex}.{import_format}"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as fileobj:
+        for chunk in upload.chunks():
+            fileobj.write(chunk)
+    return str(path)
+
+
+@register(IMPORT_JOB_KIND)
+def run_import_job(job: Job, report_progress: Callable[[int, int], None]) -> str:
+    """
+    Background import of a statement uploaded by `TransactionsImportView`,
+    for the Job's user. The result file lists the skipped rows & why.
+    """
+
+    path = Path(job.params["path"])
+    import_format = IMPORT_FORMATS[job.params["format"]]
+    importer = TransactionImporter(user=job.created_by)
+
+    try:
+        with path.open("rb") as statement, job.open_result_file() as result:
+            total = import_format.count(statement)
+            report = io.TextIOWrapper(result, encoding="utf-8", newline="")
+            writer = csv.writer(report, lineterminator="\n")
+            writer.writerow(IMPORT_ERROR_COLUMNS)
+            importer.run(
+                import_format.read(statement),
+                on_error=lambda row, message: writer.writerow((row, message)),
+                on_batch=lambda: report_progress(importer.processed, total),
+            )
+            report.flush()
+            report.detach()
+    finally:
+        path.unlink(missing_ok=True)
+
+    job.params.update(
+        created=importer.created,
+        duplicates=importer.duplicates,
+        errors=importer.errors,
+    )
+    Job.objects.filter(pk=job.pk).update(params=job.params)
+    return "import-errors.csv"
@@ -0,0 +1,39 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.pages.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to report hits & misses of the aggregates cache.
+    """
+
+    help = "Show hit/miss counters of the per-user aggregates cache."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            default=False,
+            help="Reset the counters after reporting them.",
+        )
+
+    def handle(self, **options) -> str | None:
+        if isinstance(caches["default"], LocMemCache):
+            # Each process counts its own lookups, this one made none
+            raise CommandError(
+                "Hits & misses are counted per process by the locmem cache "
+                "backend: set CACHE_BACKEND to file or redis to report them."
+            )
+        stats = get_stats()
+        lookups = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / lookups if lookups else 0
+        self.stdout.write(
+            f"Hits: {stats['hits']}\nMisses: {stats['misses']}\nHit ratio: {ratio:.1%}"
+        )
+
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters got reset."))
@@ -0,0 +1,146 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from apps.charts.views import DisplayChartsView
+from apps.pages.models import Transaction
+from apps.pages.views import (
+    DashboardView,
+    TransactionListView,
+    TransactionsExportView,
+)
+
+# Plan lines hinting at a full table scan or an on-the-fly sort, for
+# SQLite's "EXPLAIN QUERY PLAN" & PostgreSQL's "EXPLAIN" respectively.
+PLAN_WARNINGS = {
+    "sqlite": [
+        # Window functions' co-routines get scanned, not a table
+        (re.compile(r"^SCAN (?!\(subquery-)\S+$"), "sequential scan"),
+        (re.compile(r"USE TEMP B-TREE"), "temp B-tree sort"),
+    ],
+    "postgresql": [
+        (re.compile(r"Seq Scan on"), "sequential scan"),
+        (re.compile(r"(^|->)\s*Sort\b"), "sort"),
+    ],
+}
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to EXPLAIN the Transaction queries that each view
+    actually runs, flagging sequential scans & sorts.
+    """
+
+    help = (
+        "Render the Transaction views for a user, then EXPLAIN every query they "
+        "ran against the Transaction table. Note that on tiny tables "
+        "PostgreSQL will pick a sequential scan regardless of the indexes."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--user",
+            "-u",
+            help="Username whose data is queried (defaults to the first user).",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            default=False,
+            help="Exit with an error if any plan got flagged.",
+        )
+
+    def get_views(self) -> dict:
+        return {
+            "DashboardView": (DashboardView.as_view(), {}),
+            "TransactionListView": (TransactionListView.as_view(), {}),
+            "DisplayChartsView": (DisplayChartsView.as_view(), {}),
+            "TransactionsExportView": (
+                TransactionsExportView.as_view(),
+                {"format": "csv"},
+            ),
+        }
+
+    def handle(self, **options) -> str | None:
+        User = get_user_model()
+        users = User.objects.order_by("pk")
+        user = (
+            users.filter(username=options["user"]).first()
+            if options["user"]
+            else users.first()
+        )
+        if user is None:
+            raise CommandError("No such user to run the views with.")
+
+        patterns = PLAN_WARNINGS.get(connection.vendor, [])
+        if not patterns:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No plan checks for {connection.vendor}, printing plans only."
+                )
+            )
+
+        flagged = 0
+        for name, (view, kwargs) in self.get_views().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for sql in self.capture_queries(view, kwargs, user):
+                flagged += self.explain(sql, patterns)
+
+        if flagged:
+            message = f"{flagged} query plan(s) flagged."
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No query plan got flagged."))
+
+    def capture_queries(self, view, kwargs: dict, user) -> list[str]:
+        """
+        Run the view like a real request would & return the SQL it executed
+        against the Transaction table.
+        """
+
+        request = RequestFactory().get("/")
+        request.user = user
+
+        with CaptureQueriesContext(connection) as context:
+            response = view(request, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+
+        table = Transaction._meta.db_table
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if table in query["sql"] and query["sql"].lstrip().startswith("SELECT")
+        ]
+
+    def explain(self, sql: str, patterns: list) -> int:
+        """
+        Print the query plan of given SQL & return how many of its lines got
+        flagged.
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            plan = [str(row[-1]) for row in cursor.fetchall()]
+
+        self.stdout.write(f"  {sql}")
+        flagged = 0
+        for line in plan:
+            reasons = [reason for pattern, reason in patterns if pattern.search(line)]
+            if reasons:
+                flagged += 1
+                self.stdout.write(
+                    self.style.WARNING(f"    {line}  <-- {', '.join(reasons)}")
+                )
+            else:
+                self.stdout.write(f"    {line}")
+        return flagged
@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.pages.imports import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    TransactionImporter,
+    import_format_of,
+)
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to import Transactions from a CSV/XLSX statement.
+    """
+
+    help = (
+        "Import Transactions from a CSV or XLSX file laid out like the exported "
+        "ones, skipping (& reporting) invalid rows."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="CSV or XLSX file to import.")
+        parser.add_argument(
+            "--format",
+            "-f",
+            choices=sorted(IMPORT_FORMATS),
+            help="File format, guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--user",
+            "-u",
+            help="Username owning every imported row, instead of the "
+            "'Created By' column.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f"Rows inserted per batch (default: {IMPORT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--keep-duplicates",
+            action="store_true",
+            default=False,
+            help="Also import rows matching (the fingerprint of) an existing "
+            "Transaction, instead of skipping them.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            default=False,
+            help="Import then roll everything back, only reporting what would be "
+            "imported.",
+        )
+
+    @transaction.atomic
+    def handle(self, **options) -> str | None:
+        savepoint = transaction.savepoint()
+
+        import_format = options["format"] or import_format_of(options["path"])
+        if import_format is None:
+            raise CommandError("Unsupported file format, use --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        importer = TransactionImporter(
+            user=user,
+            batch_size=options["batch_size"],
+            skip_duplicates=not options["keep_duplicates"],
+        )
+        read_rows, count_rows = IMPORT_FORMATS[import_format]
+
+        def on_error(row: str, message: str) -> None:
+            self.stdout.write(self.style.WARNING(f"Skipped row {row}: {message}"))
+
+        def on_batch() -> None:
+            self.stdout.write(
+                f"Processed {importer.processed}/~{total} row(s): "
+                f"{importer.created} imported, {importer.duplicates} duplicate(s), "
+                f"{importer.errors} invalid."
+            )
+
+        try:
+            with open(options["path"], "rb") as fileobj:
+                total = count_rows(fileobj)
+                importer.run(read_rows(fileobj), on_error=on_error, on_batch=on_batch)
+        except (OSError, ValueError) as ex:
+            raise CommandError(f"Cannot import {options['path']}: {ex}")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Would have imported {importer.created} Transaction(s) "
+                    f"({importer.duplicates} duplicate(s) skipped), "
+                    "ran command without committing to DB (dry run)."
+                )
+            )
+            transaction.savepoint_rollback(savepoint)
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully imported {importer.created} Transaction(s) "
+                    f"({importer.duplicates} duplicate(s) skipped)."
+                )
+            )
+            transaction.savepoint_commit(savepoint)
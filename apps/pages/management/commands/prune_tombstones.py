@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.pages.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to delete old tombstones of deleted Transactions.
+    """
+
+    help = (
+        "Delete tombstones older than the given days; delta sync tokens from "
+        "before them get refused afterwards."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SYNC_TOMBSTONE_DAYS,
+            help="Keep tombstones of the last given days (default: %(default)s).",
+        )
+
+    def handle(self, **options) -> str | None:
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative.")
+
+        deleted = prune_tombstones(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstone(s)."))
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.pages.markers import CATEGORIES_SCOPE, touch, user_scope
+from apps.pages.rollups import rebuild_rollups, verify_rollups
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to backfill or verify the TransactionRollup table.
+    """
+
+    help = "Recompute TransactionRollup rows from the Transaction table."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--user",
+            "-u",
+            action="append",
+            dest="usernames",
+            help="Only rebuild rollups of given username (can be repeated).",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            default=False,
+            help="Only report rollup rows that are out of sync, without writing.",
+        )
+
+    def handle(self, **options) -> str | None:
+        user_ids = None
+        if options["usernames"]:
+            user_ids = list(
+                get_user_model()
+                .objects.filter(username__in=options["usernames"])
+                .values_list("pk", flat=True)
+            )
+            if len(user_ids) != len(set(options["usernames"])):
+                raise CommandError("Some of the given usernames do not exist.")
+
+        if options["verify"]:
+            mismatches = verify_rollups(user_ids)
+            for key, expected, actual in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Mismatch on {key}: expected {expected}, found {actual}"
+                    )
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup row(s) out of sync.")
+            self.stdout.write(self.style.SUCCESS("Rollups are in sync."))
+            return
+
+        written = rebuild_rollups(user_ids)
+        # Their cached aggregates are out of date
+        if user_ids is None:
+            touch([CATEGORIES_SCOPE])
+        else:
+            touch(user_scope(user_id) for user_id in user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup row(s)."))
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.pages.categorization import RECATEGORIZE_CHUNK_SIZE, recategorize
+
+
+class Command(BaseCommand):
+    """
+    Custom Django script to backfill the Category of uncategorized
+    Transactions from their users' CategoryRules.
+    """
+
+    help = (
+        "Assign a Category to uncategorized Transactions whose remarks match "
+        "one of their user's rules."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--user",
+            "-u",
+            action="append",
+            dest="usernames",
+            help="Only recategorize Transactions of given username (can be repeated).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RECATEGORIZE_CHUNK_SIZE,
+            help=f"Rows read & updated at a time (default: {RECATEGORIZE_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            default=False,
+            help="Only report how many Transactions would get a Category.",
+        )
+
+    def handle(self, **options) -> str | None:
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        user_ids = None
+        if options["usernames"]:
+            user_ids = list(
+                get_user_model()
+                .objects.filter(username__in=options["usernames"])
+                .values_list("pk", flat=True)
+            )
+            if len(user_ids) != len(set(options["usernames"])):
+                raise CommandError("Some of the given usernames do not exist.")
+
+        categorized = recategorize(
+            user_ids, chunk_size=options["chunk_size"], dry_run=options["dry_run"]
+        )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Would have categorized {categorized} Transaction(s), "
+                    "ran command without committing to DB (dry run)."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Categorized {categorized} Transaction(s).")
+            )
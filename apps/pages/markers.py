@@ -0,0 +1,150 @@
+"""
+Last-modified markers, for conditional requests (`ETag`/`Last-Modified`)
+to be answered without building their response.
+
+One `ChangeMarker` row per user is touched from within every DB transaction
+writing their Transactions, deletes included, plus one for the Categories
+(whose names show up in every user's data). Reading when some data last
+changed is a single query over a handful of rows. The same markers version
+the aggregates cache (see `apps.pages.cache`), & a marker per user's
+CategoryRules their compiled rule matcher.
+
+A user's marker also hands out the numbers of their change sequence, see
+`next_seqs()` & `apps.pages.sync`.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, Max, Subquery
+from django.utils import timezone
+
+from apps.pages.models import ChangeMarker, Transaction
+
+CATEGORIES_SCOPE = "categories"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def rules_scope(user_id: int) -> str:
+    return f"rules:{user_id}"
+
+
+def touch(scopes: Iterable[str], using: str | None = None) -> None:
+    """Mark the scopes as changed now, in a single upsert."""
+    now = timezone.now()
+    features = connections[using or DEFAULT_DB_ALIAS].features
+    ChangeMarker.objects.using(using).bulk_create(
+        # Sorted, for concurrent writers to lock rows in the same order
+        [ChangeMarker(scope=scope, modified_at=now) for scope in sorted(set(scopes))],
+        update_conflicts=True,
+        # MySQL's upsert conflicts on any unique key, naming none
+        unique_fields=(
+            ["scope"] if features.supports_update_conflicts_with_target else None
+        ),
+        update_fields=["modified_at"],
+    )
+
+
+def next_seqs(user_ids: Iterable[int], using: str | None = None) -> dict[int, int]:
+    """
+    Touch the users' markers & return the next number of each one's change
+    sequence, in a single upsert where the DB can return its rows.
+
+    The marker rows stay locked until the DB transaction ends: writers of
+    the same user commit in the order of their numbers.
+    """
+
+    scopes = {user_scope(user_id): user_id for user_id in set(user_ids)}
+    if not scopes:
+        return {}
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    features = connection.features
+    if not (
+        features.supports_update_conflicts_with_target
+        and features.can_return_rows_from_bulk_insert
+    ):
+        return _locked_next_seqs(scopes, using)
+
+    table = connection.ops.quote_name(ChangeMarker._meta.db_table)
+    modified_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (scope, modified_at, seq, pruned_seq) VALUES "
+            + ", ".join(["(%s, %s, 1, 0)"] * len(scopes))
+            + " ON CONFLICT (scope) DO UPDATE SET "
+            f"seq = {table}.seq + 1, modified_at = excluded.modified_at "
+            "RETURNING scope, seq",
+            # Sorted, for concurrent writers to lock rows in the same order
+            [value for scope in sorted(scopes) for value in (scope, modified_at)],
+        )
+        return {scopes[scope]: seq for scope, seq in cursor.fetchall()}
+
+
+def _locked_next_seqs(scopes: dict[str, int], using: str | None) -> dict[int, int]:
+    """`next_seqs()` through the ORM alone (e.g. MySQL): lock, bump, re-read."""
+    now = timezone.now()
+    markers = ChangeMarker.objects.using(using).filter(scope__in=list(scopes))
+    with transaction.atomic(using=using):
+        ChangeMarker.objects.using(using).bulk_create(
+            [ChangeMarker(scope=scope, modified_at=now) for scope in sorted(scopes)],
+            ignore_conflicts=True,
+        )
+        # Locked in scope order, for concurrent writers not to deadlock
+        list(markers.select_for_update().order_by("scope").values_list("pk"))
+        markers.update(seq=F("seq") + 1, modified_at=now)
+        return {
+            scopes[scope]: seq for scope, seq in markers.values_list("scope", "seq")
+        }
+
+
+def versions(scopes: list[str]) -> tuple[datetime | None, ...]:
+    """
+    When each of the scopes last changed (None if never recorded), in one
+    query: versions of their data, shared by every process.
+    """
+
+    modified = dict(
+        ChangeMarker.objects.filter(scope__in=scopes).values_list(
+            "scope", "modified_at"
+        )
+    )
+    return tuple(modified.get(scope) for scope in scopes)
+
+
+def last_modified(scopes: Iterable[str] | None = None) -> datetime | None:
+    """
+    When any of the scopes (default: any at all) last changed, or None if
+    never recorded.
+    """
+
+    markers = ChangeMarker.objects.all()
+    if scopes is not None:
+        markers = markers.filter(scope__in=list(scopes))
+    return markers.aggregate(modified_at=Max("modified_at"))["modified_at"]
+
+
+def user_last_modified(user_id: int) -> datetime | None:
+    """When the user's Transactions or any Category last changed."""
+    return last_modified([user_scope(user_id), CATEGORIES_SCOPE])
+
+
+def transaction_last_modified(pk: int) -> datetime | None:
+    """
+    When the Transaction or any Category last changed, in one query; None
+    if there's no such Transaction.
+    """
+
+    categories = ChangeMarker.objects.filter(scope=CATEGORIES_SCOPE)
+    row = (
+        Transaction.objects.filter(pk=pk)
+        .annotate(categories_modified_at=Subquery(categories.values("modified_at")))
+        .values_list("updated_at", "categories_modified_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return max(value for value in row if value is not None)
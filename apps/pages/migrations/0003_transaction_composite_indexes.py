@@ -0,0 +1,45 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0002_delete_product"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="created_by",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Created by",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["created_by", "-date_time", "-id"], name="txn_user_datetime_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["created_by", "transaction_type", "amount"],
+                name="txn_user_type_amount_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["created_by", "category", "amount"],
+                name="txn_user_category_amount_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:09
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model("pages", "Transaction")
+    TransactionRollup = apps.get_model("pages", "TransactionRollup")
+
+    rows = (
+        Transaction.objects.annotate(
+            month=TruncMonth(
+                "date_time",
+                output_field=DateField(),
+                tzinfo=timezone.get_default_timezone(),
+            )
+        )
+        .values(
+            "created_by_id", "month", "transaction_type", "category_id", "payment_type"
+        )
+        .annotate(total_amount=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    TransactionRollup.objects.bulk_create(
+        (TransactionRollup(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0003_transaction_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionRollup",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("month", models.DateField(verbose_name="Month")),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[("Income", "Income"), ("Expenses", "Expenses")],
+                        max_length=16,
+                        verbose_name="Transaction Type",
+                    ),
+                ),
+                (
+                    "payment_type",
+                    models.CharField(
+                        choices=[
+                            ("Cash", "Cash"),
+                            ("Card", "Card"),
+                            ("Account", "Account"),
+                        ],
+                        max_length=16,
+                        verbose_name="Payment Type",
+                    ),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.0"),
+                        max_digits=21,
+                        verbose_name="Total amount",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="Count")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="pages.category",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["created_by", "month"], name="rollup_user_month_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="transactionrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("category__isnull", False)),
+                fields=(
+                    "created_by",
+                    "month",
+                    "transaction_type",
+                    "category",
+                    "payment_type",
+                ),
+                name="rollup_unique_key",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="transactionrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("category__isnull", True)),
+                fields=("created_by", "month", "transaction_type", "payment_type"),
+                name="rollup_unique_key_null_category",
+            ),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0004_transactionrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["-date_time", "-id"], name="txn_datetime_idx"),
+        ),
+    ]
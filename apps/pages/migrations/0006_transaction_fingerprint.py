@@ -0,0 +1,40 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+from apps.pages.fingerprints import FINGERPRINT_VALUES, row_fingerprint
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Transaction = apps.get_model("pages", "Transaction")
+
+    batch = []
+    for row in Transaction.objects.values("pk", *FINGERPRINT_VALUES).iterator():
+        batch.append(Transaction(pk=row["pk"], fingerprint=row_fingerprint(row)))
+        if len(batch) >= 1000:
+            Transaction.objects.bulk_update(batch, ["fingerprint"])
+            batch.clear()
+    Transaction.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0005_transaction_datetime_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True, editable=False, max_length=32, verbose_name="Fingerprint"
+            ),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["created_by", "fingerprint"], name="txn_user_fingerprint_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0006_transaction_fingerprint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryRule",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("pattern", models.CharField(max_length=255, verbose_name="Pattern")),
+                (
+                    "match_type",
+                    models.CharField(
+                        choices=[
+                            ("Keyword", "Keyword"),
+                            ("Regex", "Regular expression"),
+                        ],
+                        default="Keyword",
+                        max_length=16,
+                        verbose_name="Match Type",
+                    ),
+                ),
+                ("priority", models.IntegerField(default=0, verbose_name="Priority")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="pages.category",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0007_categoryrule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionSearchIndex",
+            fields=[
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="pages.transaction",
+                    ),
+                ),
+                ("remarks", models.TextField()),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "pages_transaction_fts",
+                "managed": False,
+            },
+        ),
+    ]
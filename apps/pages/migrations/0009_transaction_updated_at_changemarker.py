@@ -0,0 +1,53 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:20
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_markers(apps, schema_editor):
+    # Existing data counts as modified as of now
+    ChangeMarker = apps.get_model("pages", "ChangeMarker")
+    Transaction = apps.get_model("pages", "Transaction")
+
+    now = timezone.now()
+    user_ids = Transaction.objects.order_by().values_list("created_by_id", flat=True)
+    ChangeMarker.objects.bulk_create(
+        [ChangeMarker(scope="categories", modified_at=now)]
+        + [
+            ChangeMarker(scope=f"user:{user_id}", modified_at=now)
+            for user_id in user_ids.distinct()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0008_transactionsearchindex"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeMarker",
+            fields=[
+                (
+                    "scope",
+                    models.CharField(
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Scope",
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(db_index=True, verbose_name="Modified at"),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+        ),
+        migrations.RunPython(create_markers, migrations.RunPython.noop),
+    ]
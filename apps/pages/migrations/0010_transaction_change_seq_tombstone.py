@@ -0,0 +1,71 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pages", "0009_transaction_updated_at_changemarker"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionTombstone",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("transaction_id", models.IntegerField(verbose_name="Transaction")),
+                ("change_seq", models.BigIntegerField(verbose_name="Change sequence")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Deleted at"),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="changemarker",
+            name="pruned_seq",
+            field=models.BigIntegerField(default=0, verbose_name="Pruned sequence"),
+        ),
+        migrations.AddField(
+            model_name="changemarker",
+            name="seq",
+            field=models.BigIntegerField(default=0, verbose_name="Sequence"),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="change_seq",
+            field=models.BigIntegerField(
+                default=0, editable=False, verbose_name="Change sequence"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["created_by", "change_seq", "id"], name="txn_user_seq_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="transactiontombstone",
+            name="created_by",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Created by",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactiontombstone",
+            index=models.Index(
+                fields=["created_by", "change_seq", "transaction_id"],
+                name="tombstone_user_seq_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactiontombstone",
+            index=models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ),
+    ]
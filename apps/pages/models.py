@@ -1,10 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
 from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
 from .utils import localtime_now
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 
+from . import fingerprints
+
 
 class User(AbstractUser):
     """
@@ -32,6 +36,202 @@ class Category(models.Model):
         return self.name
 
 
+# Sent with the `user_ids` whose Transactions got created, updated or deleted,
+# from within the DB transaction that wrote them.
+transactions_changed = Signal()
+
+
+def _record_changes(deltas) -> None:
+    """
+    Apply rollup deltas & notify `transactions_changed` receivers of the
+    users the deltas belong to.
+    """
+
+    from . import rollups
+
+    rollups.apply_deltas(deltas)
+    if deltas:
+        transactions_changed.send(
+            sender=Transaction, user_ids={key[0] for key in deltas}
+        )
+
+
+class TransactionQuerySet(models.QuerySet):
+    """
+    QuerySet keeping `TransactionRollup` in sync & sending
+    `transactions_changed` on bulk writes, which bypass `Transaction.save()`
+    & `Transaction.delete()`.
+
+    `bulk_update()` is covered too, as it runs through `update()`. Content
+    fingerprints, `updated_at` & `change_seq` are kept up to date along the
+    way, deletes leave tombstones (see `apps.pages.sync`).
+    """
+
+    # Rows refreshed per query by `update()`
+    fingerprint_batch_size = 1000
+
+    def bulk_create(
+        self,
+        objs,
+        batch_size=None,
+        ignore_conflicts=False,
+        update_conflicts=False,
+        update_fields=None,
+        unique_fields=None,
+    ):
+        from . import markers, rollups
+
+        objs = list(objs)
+        for obj in objs:
+            obj.fingerprint = fingerprints.instance_fingerprint(obj)
+        if update_conflicts and update_fields:
+            update_fields = [*update_fields, "change_seq"]
+        with transaction.atomic(using=self.db):
+            seqs = markers.next_seqs({obj.created_by_id for obj in objs}, self.db)
+            for obj in objs:
+                obj.change_seq = seqs[obj.created_by_id]
+            created = super().bulk_create(
+                objs,
+                batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts,
+                update_conflicts=update_conflicts,
+                update_fields=update_fields,
+                unique_fields=unique_fields,
+            )
+            if ignore_conflicts or update_conflicts:
+                # No way to tell which rows got written
+                user_ids = {obj.created_by_id for obj in objs}
+                rollups.rebuild_rollups(user_ids)
+                transactions_changed.send(sender=self.model, user_ids=user_ids)
+            else:
+                deltas = rollups.new_deltas()
+                for obj in created:
+                    rollups.add_values(deltas, rollups.instance_values(obj))
+                _record_changes(deltas)
+        return created
+
+    def update(self, **kwargs):
+        if set(kwargs) == {"fingerprint"}:
+            # `refresh_fingerprints()`, no visible change
+            return super().update(**kwargs)
+        # `auto_now` only applies to `save()`
+        kwargs.setdefault("updated_at", timezone.now())
+        if not fingerprints.FINGERPRINT_FIELDS.intersection(kwargs):
+            return self._update_tracked(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            rows = self._update_tracked(**kwargs)
+            # In batches, within the DB's limit of query parameters
+            batch_size = self.fingerprint_batch_size
+            for i in range(0, len(pks), batch_size):
+                self.model.objects.filter(
+                    pk__in=pks[i : i + batch_size]
+                ).refresh_fingerprints(batch_size)
+        return rows
+
+    update.alters_data = True
+
+    def _update_tracked(self, **kwargs):
+        from . import markers, rollups, sync
+
+        # Known before `change_seq` joins them
+        per_row = any(hasattr(value, "resolve_expression") for value in kwargs.values())
+        with transaction.atomic(using=self.db):
+            user_ids = set(
+                self.order_by().values_list("created_by_id", flat=True).distinct()
+            )
+            if not user_ids:
+                return 0
+            owner = kwargs.get("created_by_id", kwargs.get("created_by"))
+            if isinstance(owner, models.Model):
+                owner = owner.pk
+            if owner is not None:
+                # Moved to another user: gone from the previous ones' data
+                sync.record_deletions(
+                    self.exclude(created_by_id=owner).values_list(
+                        "pk", "created_by_id"
+                    ),
+                    self.db,
+                )
+                kwargs["change_seq"] = markers.next_seqs({owner}, self.db)[owner]
+            else:
+                kwargs["change_seq"] = self._change_seq(
+                    markers.next_seqs(user_ids, self.db)
+                )
+
+            if not rollups.ROLLUP_FIELDS.intersection(kwargs):
+                rows = super().update(**kwargs)
+                transactions_changed.send(sender=self.model, user_ids=user_ids)
+            elif per_row:
+                # New values depend on each row, re-read them afterwards
+                pks = list(self.values_list("pk", flat=True))
+                before = rollups.aggregate_pks(pks)
+                rows = super().update(**kwargs)
+                after = rollups.aggregate_pks(pks)
+                _record_changes(rollups.merge(rollups.negate(before), after))
+            else:
+                before = rollups.aggregate(self)
+                rows = super().update(**kwargs)
+                after = rollups.remap(before, kwargs)
+                _record_changes(rollups.merge(rollups.negate(before), after))
+        return rows
+
+    @staticmethod
+    def _change_seq(seqs: dict[int, int]):
+        """Each row's next change sequence number, out of its user's."""
+        if len(seqs) == 1:
+            return next(iter(seqs.values()))
+        return models.Case(
+            *(
+                models.When(created_by_id=user_id, then=models.Value(seq))
+                for user_id, seq in seqs.items()
+            ),
+            output_field=models.BigIntegerField(),
+        )
+
+    def refresh_fingerprints(self, batch_size: int = 1000) -> int:
+        """Recompute the fingerprint of every row, return how many changed."""
+        changed = []
+        for row in self.values("pk", "fingerprint", *fingerprints.FINGERPRINT_VALUES):
+            value = fingerprints.row_fingerprint(row)
+            if value != row["fingerprint"]:
+                changed.append(self.model(pk=row["pk"], fingerprint=value))
+        return self.bulk_update(changed, ["fingerprint"], batch_size=batch_size)
+
+    refresh_fingerprints.alters_data = True
+
+    def existing_fingerprints(self, objs) -> set[str]:
+        """
+        Fingerprints of `objs` (already computed) shared by rows of this
+        queryset, in one lookup on `txn_user_fingerprint_idx`.
+        """
+
+        objs = list(objs)
+        if not objs:
+            return set()
+        return set(
+            self.filter(
+                created_by_id__in={obj.created_by_id for obj in objs},
+                fingerprint__in={obj.fingerprint for obj in objs},
+            ).values_list("fingerprint", flat=True)
+        )
+
+    def delete(self):
+        from . import rollups, sync
+
+        with transaction.atomic(using=self.db):
+            rows = list(self.order_by().values_list("pk", "created_by_id"))
+            deltas = rollups.negate(rollups.aggregate(self))
+            result = super().delete()
+            sync.record_deletions(rows, self.db)
+            _record_changes(deltas)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Transaction(models.Model):
     """Model for storing Transaction information."""
 
@@ -78,7 +278,308 @@ class Transaction(models.Model):
         verbose_name=_("Created by"),
         related_name="+",
         on_delete=models.CASCADE,
+        # Leading column of the composite indexes below, which cover it
+        db_index=False,
+    )
+    # See `apps.pages.fingerprints`, kept up to date on every write
+    fingerprint = models.CharField(
+        verbose_name=_("Fingerprint"),
+        max_length=32,
+        blank=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(verbose_name=_("Updated at"), auto_now=True)
+    # Number of the last write in the user's change sequence, see
+    # `apps.pages.sync`
+    change_seq = models.BigIntegerField(
+        verbose_name=_("Change sequence"), default=0, editable=False
     )
 
+    class Meta:
+        # Every hot query is scoped to one user, then either ordered by
+        # date_time or grouped by transaction_type/category over amount.
+        indexes = [
+            models.Index(
+                fields=["created_by", "-date_time", "-id"],
+                name="txn_user_datetime_idx",
+            ),
+            models.Index(
+                fields=["created_by", "transaction_type", "amount"],
+                name="txn_user_type_amount_idx",
+            ),
+            models.Index(
+                fields=["created_by", "category", "amount"],
+                name="txn_user_category_amount_idx",
+            ),
+            # Keyset pagination of the (not user scoped) API list endpoint
+            models.Index(fields=["-date_time", "-id"], name="txn_datetime_idx"),
+            # Duplicate detection; not unique, as identical lines can be genuine
+            models.Index(
+                fields=["created_by", "fingerprint"], name="txn_user_fingerprint_idx"
+            ),
+            # Delta sync, changes since a position in the user's sequence
+            models.Index(
+                fields=["created_by", "change_seq", "id"], name="txn_user_seq_idx"
+            ),
+        ]
+
+    objects = TransactionQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f"{self.date_time} :: {self.transaction_type} :: {self.amount}"
+
+    def save(self, *args, **kwargs):
+        """
+        Save the Transaction & move its amount between rollup rows, within
+        the same DB transaction.
+        """
+
+        from . import rollups, sync
+
+        self.fingerprint = fingerprints.instance_fingerprint(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields:
+            # `auto_now` fields only get saved when listed, `change_seq` alike
+            update_fields = kwargs["update_fields"] = {
+                *update_fields,
+                "updated_at",
+                "change_seq",
+            }
+        if update_fields is not None and fingerprints.FINGERPRINT_FIELDS.intersection(
+            update_fields
+        ):
+            update_fields = kwargs["update_fields"] = {*update_fields, "fingerprint"}
+        if update_fields is not None and not rollups.ROLLUP_FIELDS.intersection(
+            update_fields
+        ):
+            with transaction.atomic():
+                self._next_change_seq()
+                super().save(*args, **kwargs)
+                transactions_changed.send(
+                    sender=Transaction, user_ids={self.created_by_id}
+                )
+            return
+
+        with transaction.atomic():
+            deltas = rollups.new_deltas()
+            if not self._state.adding:
+                deltas = rollups.negate(
+                    rollups.aggregate(Transaction.objects.filter(pk=self.pk))
+                )
+                # Moved to another user: gone from the previous one's data
+                sync.record_deletions(
+                    (self.pk, user_id)
+                    for user_id in {key[0] for key in deltas} - {self.created_by_id}
+                )
+            self._next_change_seq()
+            super().save(*args, **kwargs)
+            _record_changes(rollups.add_values(deltas, rollups.instance_values(self)))
+
+    def _next_change_seq(self) -> None:
+        from . import markers
+
+        self.change_seq = markers.next_seqs({self.created_by_id})[self.created_by_id]
+
+    def delete(self, *args, **kwargs):
+        from . import rollups, sync
+
+        with transaction.atomic():
+            deltas = rollups.negate(
+                rollups.aggregate(Transaction.objects.filter(pk=self.pk))
+            )
+            pk = self.pk
+            result = super().delete(*args, **kwargs)
+            sync.record_deletions(
+                (pk, user_id) for user_id in {key[0] for key in deltas}
+            )
+            _record_changes(deltas)
+        return result
+
+
+class TransactionRollup(models.Model):
+    """
+    Model for storing per-user monthly sums & counts of Transactions, one row
+    per (month, transaction type, category, payment type).
+
+    Kept up to date by `Transaction` & `TransactionQuerySet` writes, see
+    `apps.pages.rollups`.
+    """
+
+    id = models.AutoField(primary_key=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("Created by"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    month = models.DateField(verbose_name=_("Month"))
+    transaction_type = models.CharField(
+        verbose_name=_("Transaction Type"),
+        max_length=16,
+        choices=Transaction.TransactionType.choices,
+    )
+    category = models.ForeignKey(
+        Category,
+        verbose_name=_("Category"),
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    payment_type = models.CharField(
+        verbose_name=_("Payment Type"),
+        max_length=16,
+        choices=Transaction.PaymentType.choices,
+    )
+    total_amount = models.DecimalField(
+        verbose_name=_("Total amount"),
+        max_digits=21,
+        decimal_places=2,
+        default=Decimal("0.0"),
+    )
+    count = models.IntegerField(verbose_name=_("Count"), default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "month"], name="rollup_user_month_idx")
+        ]
+        # NULLs never collide in unique indexes, hence a separate partial one
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "created_by",
+                    "month",
+                    "transaction_type",
+                    "category",
+                    "payment_type",
+                ],
+                condition=models.Q(category__isnull=False),
+                name="rollup_unique_key",
+            ),
+            models.UniqueConstraint(
+                fields=["created_by", "month", "transaction_type", "payment_type"],
+                condition=models.Q(category__isnull=True),
+                name="rollup_unique_key_null_category",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m} :: {self.transaction_type} :: {self.total_amount}"
+
+
+class ChangeMarker(models.Model):
+    """
+    Model for storing when a scope of data last changed: a user's
+    Transactions (`user:<id>`) or the Categories shared by all users, see
+    `apps.pages.markers`.
+    """
+
+    scope = models.CharField(verbose_name=_("Scope"), max_length=64, primary_key=True)
+    # Indexed for the latest change of all scopes
+    modified_at = models.DateTimeField(verbose_name=_("Modified at"), db_index=True)
+    # Last number of the user's change sequence handed out, see `next_seqs()`
+    seq = models.BigIntegerField(verbose_name=_("Sequence"), default=0)
+    # Tombstones up to this number got pruned, see `apps.pages.sync`
+    pruned_seq = models.BigIntegerField(verbose_name=_("Pruned sequence"), default=0)
+
+    def __str__(self) -> str:
+        return f"{self.scope} :: {self.modified_at}"
+
+
+class TransactionTombstone(models.Model):
+    """
+    Model for storing the id of a deleted Transaction, for delta sync clients
+    to delete it too, see `apps.pages.sync`.
+    """
+
+    id = models.AutoField(primary_key=True)
+    transaction_id = models.IntegerField(verbose_name=_("Transaction"))
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("Created by"),
+        related_name="+",
+        on_delete=models.CASCADE,
+        # Leading column of the index below, which covers it
+        db_index=False,
+    )
+    change_seq = models.BigIntegerField(verbose_name=_("Change sequence"))
+    deleted_at = models.DateTimeField(verbose_name=_("Deleted at"), auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_by", "change_seq", "transaction_id"],
+                name="tombstone_user_seq_idx",
+            ),
+            # Pruning
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.transaction_id} :: {self.change_seq}"
+
+
+class CategoryRule(models.Model):
+    """
+    Model for storing a user's rule assigning a Category to Transactions
+    whose remarks match it, see `apps.pages.categorization`.
+    """
+
+    class MatchType(models.TextChoices):
+        KEYWORD = "Keyword", _("Keyword")
+        REGEX = "Regex", _("Regular expression")
+
+    id = models.AutoField(primary_key=True)
+    category = models.ForeignKey(
+        Category,
+        verbose_name=_("Category"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    pattern = models.CharField(verbose_name=_("Pattern"), max_length=255)
+    match_type = models.CharField(
+        verbose_name=_("Match Type"),
+        max_length=16,
+        choices=MatchType.choices,
+        default=MatchType.KEYWORD,
+    )
+    # Among matching rules, the highest priority (then the oldest) one wins
+    priority = models.IntegerField(verbose_name=_("Priority"), default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("Created by"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+
+    def __str__(self) -> str:
+        return f"{self.pattern} :: {self.category_id}"
+
+    def clean(self) -> None:
+        from .categorization import validate_pattern
+
+        validate_pattern(self.match_type, self.pattern)
+
+
+class TransactionSearchIndex(models.Model):
+    """
+    SQLite FTS5 index of Transaction remarks, only ever joined in searches.
+
+    Unmanaged: the table & the triggers keeping it in sync are installed
+    after migrations, see `apps.pages.search`.
+    """
+
+    transaction = models.OneToOneField(
+        Transaction,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_index",
+        on_delete=models.DO_NOTHING,
+    )
+    remarks = models.TextField()
+    # FTS5's hidden relevance column (BM25, lower is better) of MATCH queries
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "pages_transaction_fts"
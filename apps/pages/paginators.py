@@ -0,0 +1,212 @@
+import base64
+import json
+import math
+from collections.abc import Callable
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, PageNotAnInteger, Paginator
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from django_tables2.rows import BoundRows
+
+# Query param carrying the (opaque) position of a keyset page.
+CURSOR_FIELD = "cursor"
+
+
+class KeysetPage(Page):
+    """
+    Page of a `KeysetPaginator`, knowing only the cursors of its neighbours.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, 1, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self) -> str:
+        return f"<Keyset page of {len(self.object_list)} rows>"
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator(Paginator):
+    """
+    Paginator for django-tables2 `Table`s seeking "next"/"previous" pages on
+    the table's active sort column plus id, instead of using LIMIT/OFFSET.
+
+    Deep pages cost the same as the first one and no COUNT(*) is issued:
+    `count` is whatever (cached or approximate) total the caller provides,
+    if any. Usage with `RequestConfig`::
+
+        RequestConfig(
+            request,
+            paginate={
+                "paginator_class": KeysetPaginator,
+                "per_page": 10,
+                "cursor": request.GET.get(CURSOR_FIELD),
+                "count": cached_total,
+            },
+        ).configure(table)
+    """
+
+    keyset = True
+
+    def __init__(
+        self,
+        object_list: BoundRows,
+        per_page: int,
+        cursor: str | None = None,
+        count: int | Callable[[], int] | None = None,
+        **kwargs,
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cursor = cursor
+        self._count = count
+
+    @cached_property
+    def count(self) -> int | None:
+        """Total given by the caller, never counted off the queryset."""
+        return self._count() if callable(self._count) else self._count
+
+    @cached_property
+    def num_pages(self) -> int:
+        if not self.count:
+            return 1
+        return math.ceil(self.count / self.per_page)
+
+    @cached_property
+    def queryset(self) -> QuerySet:
+        # BoundRows -> TableQuerysetData -> queryset, ordered by the table
+        return self.object_list.data.data
+
+    @cached_property
+    def sort_field(self) -> tuple[str, bool, bool]:
+        """
+        (column, descending, nullable) of the queryset's leading ordering,
+        falling back to the table's default one.
+        """
+
+        model = self.queryset.model
+        ordering = [
+            value
+            for value in self.queryset.query.order_by or model._meta.ordering
+            if isinstance(value, str)
+        ]
+        name = ordering[0] if ordering else "-pk"
+        descending = name.startswith("-")
+        try:
+            field = model._meta.get_field(name.lstrip("-"))
+        except FieldDoesNotExist:
+            field = model._meta.pk
+        if not field.concrete:
+            field = model._meta.pk
+        return field.attname, descending, field.null
+
+    def _ordered(self, reverse: bool) -> QuerySet:
+        name, descending, _ = self.sort_field
+        if reverse:
+            descending = not descending
+        # NULLs first ascending & last descending, on every DB backend
+        column = (
+            F(name).desc(nulls_last=True)
+            if descending
+            else F(name).asc(nulls_first=True)
+        )
+        return self.queryset.order_by(column, "-pk" if descending else "pk")
+
+    def _seek(self, value, pk, reverse: bool) -> Q:
+        """Rows after (value, pk) in the (possibly reversed) page ordering."""
+        name, descending, nullable = self.sort_field
+        if reverse:
+            descending = not descending
+        lookup = "lt" if descending else "gt"
+        after_pk = Q(**{f"pk__{lookup}": pk})
+
+        if value is None:
+            after = Q(**{f"{name}__isnull": True}) & after_pk
+            return after if descending else after | Q(**{f"{name}__isnull": False})
+
+        after = Q(**{f"{name}__{lookup}": value}) | (Q(**{name: value}) & after_pk)
+        if nullable and descending:
+            after |= Q(**{f"{name}__isnull": True})
+        return after
+
+    def _encode(self, record, reverse: bool) -> str:
+        name = self.sort_field[0]
+        value = getattr(record, name)
+        payload = {
+            "o": name,
+            "d": self.sort_field[1],
+            "p": [str(value) if value is not None else None, record.pk],
+            "r": reverse,
+        }
+        return base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+
+    def _decode(self, cursor: str) -> tuple | None:
+        """
+        (value, pk, reverse) position of `cursor`, or None when it was issued
+        for another sort order (e.g. the user clicked a column header since).
+        """
+
+        name, descending, _ = self.sort_field
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if (payload["o"], payload["d"]) != (name, descending):
+                return None
+            model = self.queryset.model
+            field = next(f for f in model._meta.concrete_fields if f.attname == name)
+            value, pk = payload["p"]
+            value = None if value is None else field.to_python(value)
+            return value, model._meta.pk.to_python(pk), bool(payload["r"])
+        except (KeyError, TypeError, ValueError, StopIteration, ValidationError):
+            raise PageNotAnInteger("Invalid cursor")
+
+    def page(self, number=None) -> KeysetPage:
+        """
+        Return the page at `self.cursor` (the first page without one): the
+        page `number` requested by `RequestConfig` is meaningless here.
+        """
+
+        try:
+            position = self._decode(self.cursor) if self.cursor else None
+        except PageNotAnInteger:
+            # RequestConfig falls back to `page(1)`: start from the top then
+            self.cursor = None
+            raise
+
+        reverse = False
+        queryset = self._ordered(reverse=False)
+        if position is not None:
+            value, pk, reverse = position
+            queryset = self._ordered(reverse).filter(self._seek(value, pk, reverse))
+
+        records = list(queryset[: self.per_page + 1])
+        has_more = len(records) > self.per_page
+        records = records[: self.per_page]
+        if reverse:
+            records.reverse()
+
+        has_next = has_more or reverse
+        has_previous = (has_more if reverse else position is not None) and records
+        return KeysetPage(
+            BoundRows(
+                records,
+                self.object_list.table,
+                pinned_data=self.object_list.pinned_data,
+            ),
+            self,
+            next_cursor=(
+                self._encode(records[-1], reverse=False)
+                if has_next and records
+                else None
+            ),
+            previous_cursor=(
+                self._encode(records[0], reverse=True) if has_previous else None
+            ),
+        )
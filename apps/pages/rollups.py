@@ -0,0 +1,336 @@
+"""
+Maintenance of `TransactionRollup`: per-user monthly sums & counts of
+Transactions, kept in sync with the delta of every write so that totals
+& charts never have to scan the Transaction table itself.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, QuerySet, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.pages.models import Transaction, TransactionRollup
+
+# Transaction fields making up a rollup row's key, besides its month.
+KEY_FIELDS = ("created_by_id", "transaction_type", "category_id", "payment_type")
+
+# Transaction fields whose change moves amounts between rollup rows.
+ROLLUP_FIELDS = {
+    "created_by",
+    "created_by_id",
+    "date_time",
+    "transaction_type",
+    "category",
+    "category_id",
+    "payment_type",
+    "amount",
+}
+
+# Above this many keys, `apply_deltas()` reads & writes rollup rows in bulk.
+BULK_APPLY_THRESHOLD = 20
+BULK_BATCH_SIZE = 500
+
+# (created_by_id, month, transaction_type, category_id, payment_type)
+RollupKey = tuple[int, date, str, int | None, str]
+Deltas = dict[RollupKey, list]
+
+
+def month_of(value: datetime) -> date:
+    """First day of the month `value` falls in, in the project's TIME_ZONE."""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return (
+        timezone.localtime(value, timezone.get_default_timezone()).date().replace(day=1)
+    )
+
+
+def rollup_key(values: dict) -> RollupKey:
+    return (
+        values["created_by_id"],
+        month_of(values["date_time"]),
+        values["transaction_type"],
+        values["category_id"],
+        values["payment_type"],
+    )
+
+
+def instance_values(obj: Transaction) -> dict:
+    return {
+        "created_by_id": obj.created_by_id,
+        "date_time": obj.date_time,
+        "transaction_type": obj.transaction_type,
+        "category_id": obj.category_id,
+        "payment_type": obj.payment_type,
+        "amount": Decimal(str(obj.amount)),
+    }
+
+
+def new_deltas() -> Deltas:
+    return defaultdict(lambda: [Decimal("0"), 0])
+
+
+def add_values(deltas: Deltas, values: dict, sign: int = 1) -> Deltas:
+    delta = deltas[rollup_key(values)]
+    delta[0] += sign * Decimal(str(values["amount"]))
+    delta[1] += sign
+    return deltas
+
+
+def aggregate(queryset: QuerySet) -> Deltas:
+    """
+    Sum given Transaction queryset per rollup key, in a single grouped query.
+    """
+
+    rows = (
+        queryset.order_by()
+        .annotate(
+            month=TruncMonth(
+                "date_time",
+                output_field=DateField(),
+                tzinfo=timezone.get_default_timezone(),
+            )
+        )
+        .values("month", *KEY_FIELDS)
+        .annotate(total_amount=Sum("amount"), count=Count("id"))
+    )
+    deltas = new_deltas()
+    for row in rows:
+        key = (
+            row["created_by_id"],
+            row["month"],
+            row["transaction_type"],
+            row["category_id"],
+            row["payment_type"],
+        )
+        deltas[key] = [row["total_amount"] or Decimal("0"), row["count"]]
+    return deltas
+
+
+def aggregate_pks(pks: list[int], batch_size: int = 1000) -> Deltas:
+    """`aggregate()` the Transactions of given pks, in batches of `batch_size`."""
+    return merge(
+        *(
+            aggregate(Transaction.objects.filter(pk__in=pks[i : i + batch_size]))
+            for i in range(0, len(pks), batch_size)
+        )
+    )
+
+
+def negate(deltas: Deltas) -> Deltas:
+    negated = new_deltas()
+    for key, (amount, count) in deltas.items():
+        negated[key] = [-amount, -count]
+    return negated
+
+
+def merge(*all_deltas: Deltas) -> Deltas:
+    merged = new_deltas()
+    for deltas in all_deltas:
+        for key, (amount, count) in deltas.items():
+            merged[key][0] += amount
+            merged[key][1] += count
+    return merged
+
+
+def remap(deltas: Deltas, changes: dict) -> Deltas:
+    """
+    Rollup deltas of the rows summed up in `deltas` once the constant values
+    of `changes` (as passed to `QuerySet.update()`) have been applied.
+    """
+
+    changes = {
+        f"{name}_id" if name in ("created_by", "category") else name: (
+            getattr(value, "pk", value)
+        )
+        for name, value in changes.items()
+    }
+    remapped = new_deltas()
+    for key, (amount, count) in deltas.items():
+        user_id, month, transaction_type, category_id, payment_type = key
+        new_key = (
+            changes.get("created_by_id", user_id),
+            month_of(changes["date_time"]) if "date_time" in changes else month,
+            changes.get("transaction_type", transaction_type),
+            changes.get("category_id", category_id),
+            changes.get("payment_type", payment_type),
+        )
+        if "amount" in changes:
+            amount = Decimal(str(changes["amount"])) * count
+        remapped[new_key][0] += amount
+        remapped[new_key][1] += count
+    return remapped
+
+
+def apply_deltas(deltas: Deltas) -> None:
+    """
+    Add the (amount, count) deltas onto their rollup rows, creating missing
+    rows. Must run inside the transaction that wrote the Transactions.
+    """
+
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if len(deltas) > BULK_APPLY_THRESHOLD:
+        _apply_deltas_in_bulk(deltas)
+        return
+
+    for key, (amount, count) in deltas.items():
+        user_id, month, transaction_type, category_id, payment_type = key
+        lookup = {
+            "created_by_id": user_id,
+            "month": month,
+            "transaction_type": transaction_type,
+            "category_id": category_id,
+            "payment_type": payment_type,
+        }
+        rollups = TransactionRollup.objects.filter(**lookup)
+        increment = {
+            "total_amount": F("total_amount") + amount,
+            "count": F("count") + count,
+        }
+
+        if rollups.update(**increment):
+            continue
+        try:
+            with transaction.atomic():
+                TransactionRollup.objects.create(
+                    **lookup, total_amount=amount, count=count
+                )
+        except IntegrityError:
+            # Created concurrently in the meantime
+            rollups.update(**increment)
+
+
+def _apply_deltas_in_bulk(deltas: Deltas) -> None:
+    """
+    `apply_deltas()` for many keys (e.g. bulk imports): rollup rows of the
+    keys' users & months are read (& locked) at once, then incremented by
+    `bulk_update()` & missing ones inserted by `bulk_create()`.
+    """
+
+    rollups = TransactionRollup.objects.select_for_update().filter(
+        created_by_id__in={key[0] for key in deltas},
+        month__in={key[1] for key in deltas},
+    )
+    existing = {
+        (
+            rollup.created_by_id,
+            rollup.month,
+            rollup.transaction_type,
+            rollup.category_id,
+            rollup.payment_type,
+        ): rollup
+        for rollup in rollups
+    }
+
+    changed, missing = [], {}
+    for key, (amount, count) in deltas.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            missing[key] = (amount, count)
+            continue
+        rollup.total_amount += amount
+        rollup.count += count
+        changed.append(rollup)
+
+    TransactionRollup.objects.bulk_update(
+        changed, ["total_amount", "count"], batch_size=BULK_BATCH_SIZE
+    )
+    try:
+        with transaction.atomic():
+            TransactionRollup.objects.bulk_create(
+                (
+                    TransactionRollup(
+                        created_by_id=user_id,
+                        month=month,
+                        transaction_type=transaction_type,
+                        category_id=category_id,
+                        payment_type=payment_type,
+                        total_amount=amount,
+                        count=count,
+                    )
+                    for (
+                        user_id,
+                        month,
+                        transaction_type,
+                        category_id,
+                        payment_type,
+                    ), (amount, count) in missing.items()
+                ),
+                batch_size=BULK_BATCH_SIZE,
+            )
+    except IntegrityError:
+        # Some got created concurrently in the meantime: one by one then
+        for key, delta in missing.items():
+            apply_deltas({key: delta})
+
+
+def rebuild_rollups(user_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute rollup rows from scratch for given users (or everyone) &
+    return how many rows were written.
+    """
+
+    transactions = Transaction.objects.all()
+    rollups = TransactionRollup.objects.all()
+    if user_ids is not None:
+        transactions = transactions.filter(created_by_id__in=user_ids)
+        rollups = rollups.filter(created_by_id__in=user_ids)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = TransactionRollup.objects.bulk_create(
+            (
+                TransactionRollup(
+                    created_by_id=user_id,
+                    month=month,
+                    transaction_type=transaction_type,
+                    category_id=category_id,
+                    payment_type=payment_type,
+                    total_amount=amount,
+                    count=count,
+                )
+                for (
+                    user_id,
+                    month,
+                    transaction_type,
+                    category_id,
+                    payment_type,
+                ), (amount, count) in aggregate(transactions).items()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def verify_rollups(user_ids: Iterable[int] | None = None) -> list[tuple]:
+    """
+    Compare rollup rows against the Transaction table & return the
+    mismatching (key, expected, actual) triples.
+    """
+
+    transactions = Transaction.objects.all()
+    rollups = TransactionRollup.objects.filter(count__gt=0)
+    if user_ids is not None:
+        transactions = transactions.filter(created_by_id__in=user_ids)
+        rollups = rollups.filter(created_by_id__in=user_ids)
+
+    expected = {key: tuple(value) for key, value in aggregate(transactions).items()}
+    actual = {
+        (
+            row.created_by_id,
+            row.month,
+            row.transaction_type,
+            row.category_id,
+            row.payment_type,
+        ): (row.total_amount, row.count)
+        for row in rollups
+    }
+    return [
+        (key, expected.get(key), actual.get(key))
+        for key in sorted(expected.keys() | actual.keys(), key=str)
+        if expected.get(key) != actual.get(key)
+    ]
@@ -0,0 +1,238 @@
+"""
+Full-text search over Transaction remarks.
+
+Every word of a query has to start a word of the remarks, case
+insensitively: "gro super" finds "Groceries @ SuperMart" but not "agro".
+Each database gets the index its engine supports:
+
+- SQLite: an FTS5 table indexing the remarks (external content, kept in
+  sync by triggers on `pages_transaction`), joined through the unmanaged
+  `TransactionSearchIndex` model & ranked by BM25;
+- PostgreSQL: a GIN index over the remarks' `tsvector`, ranked by
+  `ts_rank`;
+- anything else (or `SEARCH_BACKEND=like`): a `LIKE` per word, unranked.
+
+Indexes are (re)installed after every `migrate`, see
+`install_search_index()`: SQLite drops a table's triggers whenever Django
+rebuilds it to alter a column.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, FloatField, Lookup, QuerySet, Value
+from django.db.models.functions import Cast
+
+from apps.pages.models import Transaction, TransactionSearchIndex
+
+# Annotation holding the relevance of ranked results, the higher the better.
+SEARCH_RANK = "search_rank"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def search_terms(query: str | None) -> list[str]:
+    return WORD_RE.findall(query or "")
+
+
+class SearchBackend:
+    """
+    Filters (& ranks) Transactions by the words of a query.
+    """
+
+    def install(self, using: str) -> None:
+        """Create the search index if missing, indexing existing rows."""
+
+    def search(self, queryset: QuerySet, terms: list[str], ranked: bool) -> QuerySet:
+        """Rows matching every term, annotated with `SEARCH_RANK` if `ranked`."""
+        raise NotImplementedError
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+    Fallback without any index: a `LIKE '%word%'` (full scan) per word.
+    """
+
+    def search(self, queryset: QuerySet, terms: list[str], ranked: bool) -> QuerySet:
+        for term in terms:
+            queryset = queryset.filter(remarks__icontains=term)
+        if ranked:
+            queryset = queryset.annotate(**{SEARCH_RANK: Value(0.0, FloatField())})
+        return queryset
+
+
+class Match(Lookup):
+    """FTS5 full-text query on a column of the index."""
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+TransactionSearchIndex._meta.get_field("remarks").register_lookup(Match)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 index of the remarks: the index table only stores the index,
+    reading remarks back off the Transactions table by rowid.
+
+    Ranked searches join the index, for its `rank` column: the MATCH drives
+    the query. Others look rowids up in the list of matches instead: a join
+    lets SQLite walk the user's rows in (e.g. date) order, running the MATCH
+    once per row.
+    """
+
+    table = Transaction._meta.db_table
+    fts_table = TransactionSearchIndex._meta.db_table
+    triggers = {
+        f"{table}_fts_insert": """
+            AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table}(rowid, remarks) VALUES (new.id, new.remarks);
+            END
+        """,
+        f"{table}_fts_delete": """
+            AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, remarks)
+                VALUES ('delete', old.id, old.remarks);
+            END
+        """,
+        f"{table}_fts_update": """
+            AFTER UPDATE OF remarks ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, remarks)
+                VALUES ('delete', old.id, old.remarks);
+                INSERT INTO {fts_table}(rowid, remarks) VALUES (new.id, new.remarks);
+            END
+        """,
+    }
+
+    def install(self, using: str) -> None:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN "
+                f"({', '.join(['%s'] * len(self.triggers))})",
+                list(self.triggers),
+            )
+            if len(cursor.fetchall()) == len(self.triggers):
+                return
+
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                f"remarks, content='{self.table}', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            for name, body in self.triggers.items():
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} "
+                    + body.format(table=self.table, fts_table=self.fts_table)
+                )
+            # Writes made while triggers were missing went unindexed
+            cursor.execute(
+                f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')"
+            )
+
+    @staticmethod
+    def match_query(terms: list[str]) -> str:
+        # Implicitly AND-ed prefix queries, quoted as strings
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset: QuerySet, terms: list[str], ranked: bool) -> QuerySet:
+        query = self.match_query(terms)
+        if ranked:
+            return queryset.filter(search_index__remarks__match=query).annotate(
+                **{SEARCH_RANK: -F("search_index__rank")}
+            )
+        return queryset.filter(
+            pk__in=TransactionSearchIndex.objects.filter(remarks__match=query).values(
+                "pk"
+            )
+        )
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    GIN index over `to_tsvector('simple', remarks)`, the "simple" config
+    leaving words unstemmed for prefix matching.
+    """
+
+    index_name = "txn_remarks_search_idx"
+    config = "simple"
+
+    def vector(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return SearchVector("remarks", config=self.config)
+
+    def tsquery(self, terms: list[str]):
+        from django.contrib.postgres.search import SearchQuery
+
+        return SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=self.config,
+        )
+
+    def install(self, using: str) -> None:
+        from django.contrib.postgres.indexes import GinIndex
+
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Transaction._meta.db_table
+            )
+        if self.index_name not in constraints:
+            with connection.schema_editor() as schema_editor:
+                schema_editor.add_index(
+                    Transaction, GinIndex(self.vector(), name=self.index_name)
+                )
+
+    def search(self, queryset: QuerySet, terms: list[str], ranked: bool) -> QuerySet:
+        from django.contrib.postgres.search import SearchRank
+
+        # Same expression as the index's, for it to be used
+        tsquery = self.tsquery(terms)
+        queryset = queryset.alias(search_vector=self.vector()).filter(
+            search_vector=tsquery
+        )
+        if ranked:
+            # Double precision, to compare equal to its value in keyset cursors
+            queryset = queryset.annotate(
+                **{SEARCH_RANK: Cast(SearchRank(self.vector(), tsquery), FloatField())}
+            )
+        return queryset
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend(),
+    "postgresql": PostgreSQLSearchBackend(),
+}
+
+
+def get_search_backend(using: str = "default") -> SearchBackend:
+    if settings.SEARCH_BACKEND == "like":
+        return LikeSearchBackend()
+    return SEARCH_BACKENDS.get(connections[using].vendor, LikeSearchBackend())
+
+
+def install_search_index(using: str = "default") -> None:
+    if Transaction._meta.db_table in connections[using].introspection.table_names():
+        get_search_backend(using).install(using)
+
+
+def search(queryset: QuerySet, query: str | None, ranked: bool = False) -> QuerySet:
+    """
+    Transactions of `queryset` whose remarks match `query`, annotated with
+    their `SEARCH_RANK` if `ranked`.
+    """
+
+    terms = search_terms(query)
+    if not terms:
+        # Nothing indexable, e.g. punctuation only
+        query = (query or "").strip()
+        return queryset.filter(remarks__icontains=query) if query else queryset
+
+    return get_search_backend(queryset.db).search(queryset, terms, ranked)
@@ -0,0 +1,162 @@
+"""
+Time-bucketed totals of a user's Transactions, for charts.
+
+Amounts are summed per bucket (day, week, month or year, truncated in the
+project's TIME_ZONE by the database) and per value of a grouping field,
+then laid out as one compact series per group: a single list of bucket
+dates, & each group's totals and counts in that same order.
+
+Monthly & yearly buckets over whole months are read off `TransactionRollup`
+instead of the Transaction table. Long series are downsampled to a bounded
+number of buckets, see `apps.pages.downsampling`.
+"""
+
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from typing import Any
+
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from apps.pages.cache import cached_for_user
+from apps.pages.downsampling import downsample_series
+from apps.pages.models import Transaction, TransactionRollup
+
+# Grouping -> field of both Transaction & TransactionRollup it groups by.
+GROUP_BY_FIELDS = {
+    "category": "category__name",
+    "payment_type": "payment_type",
+    "transaction_type": "transaction_type",
+}
+
+BUCKETS = ("day", "week", "month", "year")
+
+# Buckets a monthly rollup row falls in entirely.
+ROLLUP_BUCKETS = (None, "month", "year")
+
+
+def can_use_rollups(
+    bucket: str | None, date_min: date | None, date_max: date | None
+) -> bool:
+    """Whether the range covers whole months, in buckets of whole months."""
+    return (
+        bucket in ROLLUP_BUCKETS
+        and (date_min is None or date_min.day == 1)
+        and (date_max is None or (date_max + timedelta(days=1)).day == 1)
+    )
+
+
+def local_midnight(day: date) -> datetime:
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_default_timezone()
+    )
+
+
+def series_rows(
+    user,
+    group_by: str | None,
+    bucket: str | None,
+    date_min: date | None,
+    date_max: date | None,
+) -> list[dict]:
+    """
+    (`bucket`, `key`, `total`, `number`) rows, one per bucket & group, summed
+    by the database.
+    """
+
+    if can_use_rollups(bucket, date_min, date_max):
+        queryset = TransactionRollup.objects.filter(created_by=user, count__gt=0)
+        if date_min is not None:
+            queryset = queryset.filter(month__gte=date_min)
+        if date_max is not None:
+            queryset = queryset.filter(month__lte=date_max)
+        total, count = Sum("total_amount"), Sum("count")
+        # Months are local already
+        truncate = partial(Trunc, "month", output_field=DateField())
+    else:
+        queryset = Transaction.objects.filter(created_by=user)
+        # Whole local days, as a range on the indexed column
+        if date_min is not None:
+            queryset = queryset.filter(date_time__gte=local_midnight(date_min))
+        if date_max is not None:
+            queryset = queryset.filter(
+                date_time__lt=local_midnight(date_max + timedelta(days=1))
+            )
+        total, count = Sum("amount"), Count("id")
+        truncate = partial(
+            Trunc,
+            "date_time",
+            output_field=DateField(),
+            tzinfo=timezone.get_default_timezone(),
+        )
+
+    queryset = queryset.order_by()
+    fields = {}
+    if bucket is not None:
+        fields["bucket"] = truncate(bucket)
+    if group_by is not None:
+        fields["key"] = F(GROUP_BY_FIELDS[group_by])
+    if not fields:
+        row = queryset.aggregate(total=total, number=count)
+        return [row] if row["number"] else []
+    return list(queryset.values(**fields).annotate(total=total, number=count))
+
+
+def transaction_series(
+    user,
+    group_by: str | None = None,
+    bucket: str | None = None,
+    date_min: date | None = None,
+    date_max: date | None = None,
+    max_points: int | None = None,
+) -> dict[str, Any]:
+    """
+    The user's Transactions between `date_min` & `date_max` (local dates,
+    inclusive) summed per `bucket` & per `group_by`, either one optional:
+
+        {"bucket": "month", "group_by": "category",
+         "buckets": [date(2025, 1, 1), date(2025, 2, 1)],
+         "series": [{"key": "Food", "totals": [12.5, 0.0], "counts": [2, 0]}]}
+
+    Buckets without any Transaction are left out, groups without any in a
+    bucket get a 0 there. Without a `bucket`, `buckets` is `[None]`. Given
+    `max_points`, only the buckets holding the peaks & troughs of each
+    series are kept past that many.
+    """
+
+    rows = series_rows(user, group_by, bucket, date_min, date_max)
+    buckets = sorted({row["bucket"] for row in rows}) if bucket else [None]
+    # Uncategorized last
+    keys = sorted({row.get("key") for row in rows}, key=lambda key: (key is None, key))
+
+    positions = {day: position for position, day in enumerate(buckets)}
+    series = {
+        key: {"key": key, "totals": [0.0] * len(buckets), "counts": [0] * len(buckets)}
+        for key in keys
+    }
+    for row in rows:
+        position = positions[row.get("bucket")]
+        values = series[row.get("key")]
+        values["totals"][position] = float(row["total"] or 0)
+        values["counts"][position] = row["number"]
+
+    data = {
+        "bucket": bucket,
+        "group_by": group_by,
+        "buckets": buckets,
+        "series": list(series.values()),
+    }
+    if max_points is not None:
+        data = downsample_series(data, max_points)
+    return data
+
+
+def get_transaction_series(user, **params) -> dict[str, Any]:
+    """`transaction_series()`, cached until the user's data changes."""
+    return cached_for_user(
+        user.pk,
+        "transaction-series",
+        lambda: transaction_series(user, **params),
+        params=params,
+    )
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.pages.markers import CATEGORIES_SCOPE, rules_scope, touch
+from apps.pages.models import (
+    Category,
+    CategoryRule,
+    Transaction,
+)
+from apps.pages.search import install_search_index
+
+
+@receiver(pre_delete, sender=Category)
+def uncategorize_transactions(sender, instance: Category, **kwargs) -> None:
+    """
+    Set the Category's Transactions to NULL before it gets deleted, through
+    `TransactionQuerySet.update()` rather than the deletion's own raw update:
+    rollups, change sequences & markers of their users follow.
+    """
+
+    Transaction.objects.filter(category=instance).update(category=None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def touch_categories_marker(sender, instance: Category, **kwargs) -> None:
+    # Category names & rollups are shared by every user's data, cached
+    # aggregates included
+    touch([CATEGORIES_SCOPE])
+
+
+@receiver(post_save, sender=CategoryRule)
+@receiver(post_delete, sender=CategoryRule)
+def touch_category_rules_marker(sender, instance: CategoryRule, **kwargs) -> None:
+    # Compiled rule matchers are kept until then, see `get_matcher()`
+    touch([rules_scope(instance.created_by_id)])
+
+
+@receiver(post_migrate)
+def install_remarks_search_index(sender, using: str, **kwargs) -> None:
+    # Outside of migrations, as SQLite drops triggers of rebuilt tables
+    if sender.name == "apps.pages":
+        install_search_index(using)
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Count, Max, Min, Q, QuerySet, Subquery, Sum
+from django.http import QueryDict
+
+from apps.pages.cache import cached_for_user
+from apps.pages.filters import TransactionDataTablesFilter
+from apps.pages.models import Transaction, TransactionRollup
+
+INCOME = Q(transaction_type=Transaction.TransactionType.INCOME)
+EXPENSES = Q(transaction_type=Transaction.TransactionType.EXPENSES)
+
+
+@dataclass(frozen=True)
+class TransactionSummary:
+    """
+    Totals of a set of Transactions, each computed in a single query through
+    conditional aggregation.
+    """
+
+    income: Decimal
+    expenses: Decimal
+    count: int
+    first_date_time: datetime | None
+    last_date_time: datetime | None
+
+    @property
+    def balance(self) -> Decimal:
+        return self.income - self.expenses
+
+    @classmethod
+    def _from_row(cls, row: dict) -> "TransactionSummary":
+        return cls(
+            income=row["income"] or Decimal("0"),
+            expenses=row["expenses"] or Decimal("0"),
+            count=row["count"] or 0,
+            first_date_time=row["first_date_time"],
+            last_date_time=row["last_date_time"],
+        )
+
+    @classmethod
+    def from_queryset(cls, queryset: QuerySet[Transaction]) -> "TransactionSummary":
+        """Summarize any (e.g. filtered) Transaction queryset."""
+        return cls._from_row(
+            queryset.order_by().aggregate(
+                income=Sum("amount", filter=INCOME),
+                expenses=Sum("amount", filter=EXPENSES),
+                count=Count("id"),
+                first_date_time=Min("date_time"),
+                last_date_time=Max("date_time"),
+            )
+        )
+
+    @classmethod
+    def from_rollups(cls, user) -> "TransactionSummary":
+        """
+        Summarize all of the user's Transactions from their monthly rollups,
+        with the first & last dates read off `txn_user_datetime_idx` by
+        scalar subqueries of the same query.
+        """
+
+        transactions = Transaction.objects.filter(created_by=user)
+        first = transactions.order_by("date_time").values("date_time")[:1]
+        last = transactions.order_by("-date_time").values("date_time")[:1]
+        return cls._from_row(
+            TransactionRollup.objects.filter(created_by=user).aggregate(
+                income=Sum("total_amount", filter=INCOME),
+                expenses=Sum("total_amount", filter=EXPENSES),
+                count=Sum("count"),
+                first_date_time=Min(Subquery(first)),
+                last_date_time=Max(Subquery(last)),
+            )
+        )
+
+    @classmethod
+    def for_user(cls, user, data: QueryDict | None = None) -> "TransactionSummary":
+        """
+        Summarize the user's Transactions, scoped by the datatables' filters
+        given in `data` (e.g. `request.GET`) if any.
+        """
+
+        if not filter_params(data):
+            return cls.from_rollups(user)
+        queryset = Transaction.objects.filter(created_by=user)
+        return cls.from_queryset(
+            TransactionDataTablesFilter(data, queryset=queryset).qs
+        )
+
+
+def filter_params(data: QueryDict | None) -> dict[str, list[str]]:
+    """The datatables' filters actually set in `data`."""
+    if data is None:
+        return {}
+    return {
+        name: data.getlist(name)
+        for name in TransactionDataTablesFilter.base_filters
+        if any(data.getlist(name))
+    }
+
+
+def get_user_summary(user, data: QueryDict | None = None) -> TransactionSummary:
+    """`TransactionSummary.for_user()`, cached until the user's data changes."""
+    return cached_for_user(
+        user.pk,
+        "transaction-summary",
+        lambda: TransactionSummary.for_user(user, data),
+        params=filter_params(data),
+    )
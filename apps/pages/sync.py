@@ -0,0 +1,190 @@
+"""
+Delta sync of a user's Transactions: what got created, updated or deleted
+since a token.
+
+Every write stamps the rows it creates or changes with the next number of
+their user's change sequence (`Transaction.change_seq`, handed out by
+`apps.pages.markers.next_seqs()`), and every delete leaves a
+`TransactionTombstone` stamped alike. A token is an opaque position
+(change sequence number, id) in that order: changes past it are read off
+the `(created_by, change_seq, id)` indexes of both tables, a bounded batch
+at a time, so that syncing costs what changed rather than the size of the
+ledger.
+
+Tombstones are pruned after `SYNC_TOMBSTONE_DAYS` (`prune_tombstones`
+command): tokens whose holder may have missed some of them are refused,
+clients then resync from scratch.
+"""
+
+import base64
+import heapq
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Max, Q
+
+from apps.pages.markers import next_seqs, user_scope
+from apps.pages.models import ChangeMarker, Transaction, TransactionTombstone
+
+
+class Token(NamedTuple):
+    """Where a client got to."""
+
+    # Position of the last change got, in (change_seq, id) order
+    seq: int
+    id: int
+    # Deletions numbered up to this one can't concern rows the client got
+    floor: int
+
+
+START = Token(0, 0, 0)
+
+
+class TokenExpired(Exception):
+    """Tombstones the token's holder still needs got pruned."""
+
+
+@dataclass(frozen=True)
+class SyncBatch:
+    """Changes past a token, in sequence order."""
+
+    # `values()` rows of the created or updated Transactions
+    changed: list[dict]
+    # Ids of the deleted Transactions
+    deleted: list[int]
+    next_token: Token
+    has_more: bool
+
+    @property
+    def token(self) -> str:
+        return encode_token(self.next_token)
+
+
+def encode_token(token: Token) -> str:
+    payload = json.dumps(list(token), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+
+
+def decode_token(token: str | None) -> Token:
+    """Token of its encoded form (`START` if none), or ValueError if invalid."""
+    if not token:
+        return START
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        token = Token(*values)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid token.")
+    if any(type(value) is not int or value < 0 for value in token):
+        raise ValueError("Invalid token.")
+    return token
+
+
+def record_deletions(rows: Iterable[tuple[int, int]], using: str | None = None):
+    """
+    Leave a tombstone for each (Transaction id, user id) deleted, stamped
+    with its user's next change sequence number.
+    """
+
+    rows = list(rows)
+    if not rows:
+        return
+    seqs = next_seqs({user_id for _, user_id in rows}, using=using)
+    TransactionTombstone.objects.using(using).bulk_create(
+        [
+            TransactionTombstone(
+                transaction_id=pk, created_by_id=user_id, change_seq=seqs[user_id]
+            )
+            for pk, user_id in rows
+        ]
+    )
+
+
+def after(token: Token, id_field: str = "id") -> Q:
+    # The leading non-strict bound keeps it an index range scan
+    return Q(change_seq__gte=token.seq) & (
+        Q(change_seq__gt=token.seq)
+        | Q(change_seq=token.seq, **{f"{id_field}__gt": token.id})
+    )
+
+
+def changes_since(
+    user_id: int, token: Token, limit: int, fields: Iterable[str]
+) -> SyncBatch:
+    """
+    Up to `limit` changes of the user's Transactions past `token`, changed
+    rows read as `values(*fields)`.
+
+    Raises `TokenExpired` if tombstones the token's holder needs may have
+    been pruned already.
+    """
+
+    seq, pruned_seq = (
+        ChangeMarker.objects.filter(scope=user_scope(user_id))
+        .values_list("seq", "pruned_seq")
+        .first()
+    ) or (0, 0)
+    if token == START:
+        # Whatever got deleted so far, the client won't get
+        floor = seq
+    elif pruned_seq > token.floor:
+        raise TokenExpired
+    else:
+        floor = token.floor
+
+    changed = (
+        Transaction.objects.filter(after(token), created_by_id=user_id)
+        .order_by("change_seq", "id")
+        .values(*fields, "change_seq")[: limit + 1]
+    )
+    deleted = (
+        TransactionTombstone.objects.filter(
+            after(token, "transaction_id"), created_by_id=user_id
+        )
+        .order_by("change_seq", "transaction_id")
+        .values_list("change_seq", "transaction_id")[: limit + 1]
+    )
+
+    # Both streams merged in sequence order, the first `limit` changes kept
+    merged = heapq.merge(
+        (((row["change_seq"], row["id"]), row) for row in changed),
+        ((key, None) for key in deleted),
+        key=lambda item: item[0],
+    )
+    batch = [item for item, _ in zip(merged, range(limit + 1))]
+    has_more = len(batch) > limit
+    batch = batch[:limit]
+    position = batch[-1][0] if batch else (token.seq, token.id)
+    if not has_more:
+        # Up to date: every change numbered up to `seq` got sent, as each
+        # number's changes commit at once & in order
+        floor = max(floor, seq, position[0])
+    return SyncBatch(
+        changed=[row for _, row in batch if row is not None],
+        deleted=[pk for (_, pk), row in batch if row is None],
+        next_token=Token(*position, floor),
+        has_more=has_more,
+    )
+
+
+def prune_tombstones(before: datetime) -> int:
+    """
+    Delete tombstones of deletions older than `before`, remembering the
+    last change sequence number pruned per user; return how many got
+    deleted.
+    """
+
+    with transaction.atomic():
+        old = TransactionTombstone.objects.filter(deleted_at__lt=before)
+        for row in (
+            old.order_by().values("created_by_id").annotate(max_seq=Max("change_seq"))
+        ):
+            ChangeMarker.objects.filter(
+                scope=user_scope(row["created_by_id"]),
+                pruned_seq__lt=row["max_seq"],
+            ).update(pruned_seq=row["max_seq"])
+        deleted, _ = old.delete()
+    return deleted
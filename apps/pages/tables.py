@@ -1,14 +1,25 @@
 import django_tables2 as tables
 from decimal import Decimal
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
+from apps.pages.balances import running_balances
 from apps.pages.models import Transaction
 
 
 class TransactionDataTables(tables.Table):
     """
     Datatables class for Transaction model.
+
+    `rollups` are the rollup rows scoped like the table's data (see
+    `rollup_queryset()`), for running balances to start off them.
     """
 
+    running_balance = tables.Column(
+        verbose_name=_("Balance"),
+        empty_values=(),
+        orderable=False,
+    )
     actions = tables.TemplateColumn(
         verbose_name=_("Actions"),
         template_name="pages/transaction_action.html",
@@ -19,6 +30,8 @@ class TransactionDataTables(tables.Table):
     class Meta:
         model = Transaction
         order_by = "-date_time"
+        # Adds keyset "previous/next" links for `KeysetPaginator`
+        template_name = "pages/transaction_table.html"
         attrs = {
             "id": "transactions_table_id",
             "class": "table table-striped table-hover",
@@ -31,12 +44,26 @@ class TransactionDataTables(tables.Table):
             "transaction_type",
             "remarks",
             "created_by",
+            "running_balance",
             "actions",
         ]
 
+    def __init__(self, *args, rollups: QuerySet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rollups = rollups
+
+    @cached_property
+    def running_balances(self) -> dict[int, Decimal]:
+        # Of the rows shown only, whichever the sort order
+        records = self.page.object_list.data if hasattr(self, "page") else self.data
+        return running_balances(self.data.data, records, self.rollups)
+
     def render_amount(self, value: Decimal, record: Transaction):
         return f"RM {value}"
 
+    def render_running_balance(self, record: Transaction):
+        return f"RM {self.running_balances[record.pk]}"
+
     def render_actions(
         self, column, record: Transaction, table, value, bound_column, **kwargs
     ):
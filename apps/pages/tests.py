@@ -1 +1,1480 @@
-# Create your tests here.
+import gzip
+import io
+import os
+import re
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F, QuerySet
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from apps.pages.exports import (
+    ARROW_SCHEMA,
+    EXPORT_COLUMNS,
+    EXPORT_FIELDS,
+    iter_row_chunks,
+    stream_csv,
+    write_xlsx,
+)
+from apps.jobs.models import Job
+from apps.pages.cache import get_stats
+from apps.pages.categorization import (
+    AhoCorasick,
+    RuleMatcher,
+    categorize,
+    get_matcher,
+    required_literal,
+    validate_pattern,
+)
+from apps.pages.downsampling import downsample_series, minmax_indices
+from apps.pages.fingerprints import fingerprint
+from apps.pages.markers import next_seqs, touch
+from apps.pages.models import (
+    Category,
+    CategoryRule,
+    ChangeMarker,
+    Transaction,
+    TransactionQuerySet,
+    TransactionRollup,
+    TransactionTombstone,
+)
+from apps.pages.rollups import verify_rollups
+from apps.pages.search import SEARCH_RANK, install_search_index, search
+from apps.pages.summary import TransactionSummary
+
+User = get_user_model()
+
+
+class TransactionsExportViewTestCase(TestCase):
+    """
+    Unit tests for exporting Transactions from datatables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other_user = User.objects.create_user(
+            username="other", password="password123"
+        )
+        cls.category = baker.make(Category, name="Food")
+        baker.make(
+            Transaction,
+            category=cls.category,
+            amount=Decimal("150.50"),
+            payment_type=Transaction.PaymentType.CASH,
+            transaction_type=Transaction.TransactionType.EXPENSES,
+            remarks='Lunch, "set B"\nwith drinks',
+            created_by=cls.user,
+        )
+        baker.make(
+            Transaction,
+            category=None,
+            amount=Decimal("3000"),
+            payment_type=Transaction.PaymentType.ACCOUNT,
+            transaction_type=Transaction.TransactionType.INCOME,
+            remarks="Salary",
+            created_by=cls.user,
+        )
+        baker.make(Transaction, remarks="Not mine", created_by=cls.other_user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, format: str, referer: str = "", **params) -> bytes:
+        response = self.client.get(
+            reverse("transactions-export", args=[format]),
+            params,
+            HTTP_REFERER=referer,
+        )
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    def pandas_csv(self, **filters) -> bytes:
+        """CSV as produced by the former DataFrame based exporter."""
+        qs = (
+            Transaction.objects.filter(created_by=self.user, **filters)
+            .values_list(*EXPORT_FIELDS)
+            .order_by("-date_time")
+        )
+        df = pd.DataFrame(qs, columns=EXPORT_COLUMNS)
+        if not df["Datetime"].isna().all():
+            df["Datetime"] = df["Datetime"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return df.to_csv(index=False).encode("utf-8")
+
+    def test_csv_is_streamed(self):
+        response = self.client.get(reverse("transactions-export", args=["csv"]))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+    def test_csv_matches_dataframe_output(self):
+        self.assertEqual(self.export("csv"), self.pandas_csv())
+
+    def test_csv_applies_referer_filters(self):
+        content = self.export("csv", referer="http://testserver/?remarks=sal")
+        self.assertEqual(content, self.pandas_csv(remarks__icontains="sal"))
+        self.assertNotIn(b"Lunch", content)
+
+    def test_csv_without_rows_has_header_only(self):
+        Transaction.objects.filter(created_by=self.user).delete()
+        self.assertEqual(self.export("csv"), self.pandas_csv())
+
+    def test_xlsx_matches_dataframe_rows(self):
+        workbook = load_workbook(io.BytesIO(self.export("xlsx")), read_only=True)
+        self.assertEqual(workbook.sheetnames, ["Sheet1"])
+
+        rows = list(workbook["Sheet1"].values)
+        expected = pd.read_csv(io.BytesIO(self.pandas_csv()), keep_default_na=False)
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        self.assertEqual(len(rows) - 1, len(expected))
+        self.assertEqual([row[0] for row in rows[1:]], list(expected["Datetime"]))
+        self.assertEqual([row[5] for row in rows[1:]], list(expected["Remarks"]))
+        self.assertEqual(
+            [row[3] for row in rows[1:]],
+            [category or None for category in expected["Category"]],
+        )
+
+    def test_xlsx_splits_rows_across_sheets(self):
+        baker.make(Transaction, created_by=self.user, _quantity=3)
+        qs = Transaction.objects.filter(created_by=self.user)
+        fileobj = io.BytesIO()
+        write_xlsx(iter_row_chunks(qs, chunk_size=2), fileobj, max_rows=3)
+
+        workbook = load_workbook(fileobj, read_only=True)
+        self.assertEqual(workbook.sheetnames, ["Sheet1", "Sheet2", "Sheet3"])
+        sheet_rows = [list(workbook[name].values) for name in workbook.sheetnames]
+        self.assertEqual([len(rows) for rows in sheet_rows], [3, 3, 2])
+        self.assertTrue(all(rows[0] == EXPORT_COLUMNS for rows in sheet_rows))
+
+    def test_parquet_has_typed_columns(self):
+        table = pq.read_table(io.BytesIO(self.export("parquet")))
+        self.assertEqual(table.schema, ARROW_SCHEMA)
+
+        df = table.to_pandas()
+        expected = pd.read_csv(io.BytesIO(self.pandas_csv()), keep_default_na=False)
+        self.assertEqual(
+            list(df["Datetime"].dt.strftime("%Y-%m-%d %H:%M:%S")),
+            list(expected["Datetime"]),
+        )
+        self.assertEqual(
+            sorted(df["Amount(RM)"]), [Decimal("150.50"), Decimal("3000.00")]
+        )
+        self.assertIsInstance(df["Payment Type"].dtype, pd.CategoricalDtype)
+
+    def test_parquet_without_rows_keeps_schema(self):
+        Transaction.objects.filter(created_by=self.user).delete()
+        table = pq.read_table(io.BytesIO(self.export("parquet")))
+        self.assertEqual(table.schema, ARROW_SCHEMA)
+        self.assertEqual(table.num_rows, 0)
+
+    def test_arrow_stream(self):
+        table = pa.ipc.open_stream(self.export("arrow")).read_all()
+        self.assertEqual(table.schema, ARROW_SCHEMA)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(sorted(table["Remarks"].to_pylist())[1], "Salary")
+
+    def test_unsupported_format_redirects(self):
+        response = self.client.get(
+            reverse("transactions-export", args=["pdf"]),
+            HTTP_REFERER="http://testserver/",
+        )
+        self.assertRedirects(response, "http://testserver/")
+
+    def test_csv_gz_decompresses_to_csv(self):
+        for level in ("0", "1", "9"):
+            with self.subTest(level=level):
+                content = self.export("csv.gz", level=level)
+                self.assertEqual(gzip.decompress(content), self.pandas_csv())
+
+    def test_zip_contains_csv(self):
+        with zipfile.ZipFile(io.BytesIO(self.export("zip"))) as archive:
+            self.assertEqual(archive.namelist(), ["transactions.csv"])
+            self.assertEqual(archive.read("transactions.csv"), self.pandas_csv())
+
+    def test_invalid_compression_level_redirects(self):
+        for level in ("10", "-1", "²", "٣", " 1"):
+            with self.subTest(level=level):
+                response = self.client.get(
+                    reverse("transactions-export", args=["zip"]),
+                    {"level": level},
+                    HTTP_REFERER="http://testserver/",
+                )
+                self.assertRedirects(response, "http://testserver/")
+
+
+class ExplainQueriesCommandTestCase(TestCase):
+    """
+    Unit tests for the `explain_queries` command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        baker.make(Transaction, created_by=cls.user, _quantity=5)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_views_use_composite_indexes(self):
+        stdout = io.StringIO()
+        call_command("explain_queries", user="tester", stdout=stdout)
+        output = stdout.getvalue()
+
+        for view in ("DashboardView", "TransactionListView", "DisplayChartsView"):
+            self.assertIn(view, output)
+        self.assertIn("txn_user_datetime_idx", output)
+        self.assertNotIn("sequential scan", output)
+
+
+class TransactionRollupTestCase(TestCase):
+    """
+    Unit tests for keeping TransactionRollup in sync with Transaction writes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.food, cls.health = baker.make(Category, _quantity=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def make(self, **kwargs) -> Transaction:
+        return Transaction.objects.create(
+            created_by=self.user,
+            amount=kwargs.pop("amount", Decimal("10.00")),
+            date_time=kwargs.pop(
+                "date_time", timezone.make_aware(datetime(2025, 9, 15, 12))
+            ),
+            **kwargs,
+        )
+
+    def assertInSync(self):
+        self.assertEqual(verify_rollups(), [])
+
+    def test_save_and_delete(self):
+        first = self.make(category=self.food)
+        self.make(category=self.food, amount=Decimal("5.50"))
+        rollup = TransactionRollup.objects.get()
+        self.assertEqual((rollup.total_amount, rollup.count), (Decimal("15.50"), 2))
+        self.assertEqual(rollup.month, date(2025, 9, 1))
+
+        first.category = self.health
+        first.date_time = timezone.make_aware(datetime(2025, 10, 1, 0, 30))
+        first.save()
+        self.assertEqual(TransactionRollup.objects.filter(count__gt=0).count(), 2)
+        self.assertInSync()
+
+        first.delete()
+        self.assertInSync()
+
+    def test_month_follows_time_zone(self):
+        # 2025-09-30 17:00 UTC is already October in Asia/Kuala_Lumpur
+        self.make(date_time=datetime(2025, 9, 30, 17, tzinfo=dt_timezone.utc))
+        self.assertEqual(TransactionRollup.objects.get().month, date(2025, 10, 1))
+        self.assertInSync()
+
+    def test_bulk_paths(self):
+        Transaction.objects.bulk_create(
+            Transaction(
+                created_by=self.user,
+                category=self.food,
+                amount=Decimal(i),
+                date_time=timezone.make_aware(datetime(2025, i, 1, 12)),
+            )
+            for i in range(1, 7)
+        )
+        self.assertInSync()
+
+        Transaction.objects.filter(amount__lte=3).update(category=self.health)
+        self.assertInSync()
+        Transaction.objects.filter(category=self.health).update(amount=F("amount") * 2)
+        self.assertInSync()
+
+        objs = list(Transaction.objects.filter(amount__gte=5))
+        for obj in objs:
+            obj.payment_type = Transaction.PaymentType.CASH
+        Transaction.objects.bulk_update(objs, ["payment_type"])
+        self.assertInSync()
+
+        Transaction.objects.filter(amount__gte=6).delete()
+        self.assertInSync()
+
+    def test_bulk_paths_over_many_keys(self):
+        # Past BULK_APPLY_THRESHOLD keys, rollups are read & written in bulk
+        def make_all():
+            Transaction.objects.bulk_create(
+                Transaction(
+                    created_by=self.user,
+                    category=(self.food, self.health, None)[i % 3],
+                    amount=Decimal(i),
+                    date_time=timezone.make_aware(
+                        datetime(2024 + i // 12 % 2, i % 12 + 1, 1)
+                    ),
+                )
+                for i in range(60)
+            )
+
+        make_all()
+        self.assertEqual(TransactionRollup.objects.count(), 24)
+        make_all()
+        self.assertEqual(TransactionRollup.objects.count(), 24)
+        self.assertInSync()
+
+        Transaction.objects.filter(amount__lt=30).update(category=self.food)
+        self.assertInSync()
+        Transaction.objects.all().delete()
+        self.assertFalse(TransactionRollup.objects.filter(count__gt=0).exists())
+
+    def test_category_delete(self):
+        self.make(category=self.food)
+        self.make(category=None)
+        self.food.delete()
+        rollup = TransactionRollup.objects.get()
+        self.assertEqual((rollup.category, rollup.count), (None, 2))
+        self.assertInSync()
+
+    def test_rebuild_rollups_command(self):
+        self.make(category=self.food)
+        TransactionRollup.objects.update(count=5)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", verify=True, stdout=io.StringIO())
+
+        call_command("rebuild_rollups", user=["tester"], stdout=io.StringIO())
+        self.assertInSync()
+
+    def test_dashboard_and_charts_read_rollups(self):
+        self.make(category=self.food, transaction_type="Income", amount=100)
+        self.make(category=self.food, transaction_type="Expenses", amount=40)
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("index"))
+        # Totals & the table's running balance checkpoint; its window aside
+        totals_sql = [
+            query["sql"]
+            for query in context.captured_queries
+            if "SUM" in query["sql"] and "OVER" not in query["sql"]
+        ]
+        self.assertEqual(len(totals_sql), 2)
+        for sql in totals_sql:
+            self.assertIn("pages_transactionrollup", sql)
+        self.assertEqual(response.context["remaining_balance"], "60.00")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("transactions-aggregate"), {"groupBy": "category"}
+            )
+        self.assertIn("pages_transactionrollup", context.captured_queries[-1]["sql"])
+        self.assertEqual(response.json()["series"][0]["totals"], [140.0])
+
+
+class TransactionFingerprintTestCase(TestCase):
+    """
+    Unit tests for keeping Transaction fingerprints up to date.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+
+    def assertFresh(self):
+        self.assertEqual(Transaction.objects.all().refresh_fingerprints(), 0)
+
+    def test_normalization(self):
+        date_time = datetime(2025, 9, 1, 4, 30, tzinfo=dt_timezone.utc)
+        value = fingerprint(self.user.pk, date_time, Decimal("10.1"), "Income", "A  b")
+        self.assertEqual(len(value), 32)
+        self.assertEqual(
+            value,
+            fingerprint(
+                self.user.pk,
+                # Same instant, other time zone & sub-second precision
+                timezone.make_aware(datetime(2025, 9, 1, 12, 30, 0, 999)),
+                "10.10",
+                "Income",
+                " a\nB ",
+            ),
+        )
+        self.assertNotEqual(
+            value,
+            fingerprint(self.user.pk, date_time, Decimal("10.1"), "Expenses", "a b"),
+        )
+
+    def test_writes_keep_fingerprints_fresh(self):
+        obj = baker.make(Transaction, remarks="Lunch", created_by=self.user)
+        self.assertEqual(len(obj.fingerprint), 32)
+        before = obj.fingerprint
+
+        obj.remarks = "Dinner"
+        obj.save(update_fields=["remarks"])
+        obj.refresh_from_db()
+        self.assertNotEqual(obj.fingerprint, before)
+        self.assertFresh()
+
+        baker.make(Transaction, created_by=self.user, _quantity=3, _bulk_create=True)
+        Transaction.objects.update(remarks="Same")
+        self.assertFresh()
+        Transaction.objects.update(amount=F("amount") + 1)
+        self.assertFresh()
+        objs = list(Transaction.objects.all())
+        for obj in objs:
+            obj.transaction_type = Transaction.TransactionType.EXPENSES
+        Transaction.objects.bulk_update(objs, ["transaction_type"])
+        self.assertFresh()
+        self.assertEqual(verify_rollups(), [])
+
+    def test_update_refreshes_fingerprints_in_batches(self):
+        baker.make(Transaction, created_by=self.user, _quantity=5, _bulk_create=True)
+        with (
+            mock.patch.object(TransactionQuerySet, "fingerprint_batch_size", 2),
+            CaptureQueriesContext(connection) as context,
+        ):
+            Transaction.objects.filter(created_by=self.user).update(remarks="Same")
+        self.assertFresh()
+        # Each batch's rows read in a query of their own
+        reads = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(
+                'SELECT "pages_transaction"."id", "pages_transaction"."fingerprint"'
+            )
+        ]
+        self.assertEqual(len(reads), 3)
+
+
+class AggregatesCacheTestCase(TestCase):
+    """
+    Unit tests for the per-user versioned cache of dashboard & charts data.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.category = baker.make(Category, name="Food")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def make(self, amount) -> Transaction:
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                created_by=self.user,
+                category=self.category,
+                amount=Decimal(amount),
+                transaction_type=Transaction.TransactionType.INCOME,
+            )
+
+    def rollup_queries(self, url_name: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse(url_name))
+        return sum(
+            "pages_transactionrollup" in query["sql"]
+            for query in context.captured_queries
+        )
+
+    def test_repeated_requests_hit_cache(self):
+        self.make("10")
+        # The table's running balances start off an uncached rollup query
+        for url_name, uncached in (("index", 1), ("transactions-aggregate", 0)):
+            with self.subTest(url_name=url_name):
+                self.assertEqual(self.rollup_queries(url_name), 1 + uncached)
+                self.assertEqual(self.rollup_queries(url_name), uncached)
+        # Charts reuse the summary cached by the dashboard
+        self.assertEqual(self.rollup_queries("charts"), 0)
+        self.assertEqual(get_stats(), {"hits": 3, "misses": 2})
+
+    def test_writes_make_entries_unreachable(self):
+        transaction = self.make("10")
+        self.assertEqual(
+            self.client.get(reverse("index")).context["total_income"], "10.00"
+        )
+
+        writes = [
+            lambda: self.make("5"),
+            lambda: Transaction.objects.filter(pk=transaction.pk).update(amount=20),
+            lambda: Transaction.objects.filter(pk=transaction.pk).update(remarks="x"),
+            lambda: Transaction.objects.filter(pk=transaction.pk).delete(),
+            lambda: self.category.save(),
+        ]
+        for write in writes:
+            self.client.get(reverse("index"))
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            # Summary & running balance checkpoint
+            self.assertEqual(self.rollup_queries("index"), 2)
+
+        self.assertEqual(
+            self.client.get(reverse("index")).context["total_income"], "5.00"
+        )
+
+    def test_versions_are_shared_by_processes(self):
+        self.make("10")
+        self.client.get(reverse("index"))
+        # Another process (web or `run_jobs` worker) writing: nothing of
+        # this one's cache gets bumped, only the DB
+        with mock.patch.object(cache, "incr"), mock.patch.object(cache, "add"):
+            Transaction.objects.filter(created_by=self.user).update(amount=20)
+        self.assertEqual(
+            self.client.get(reverse("index")).context["total_income"], "20.00"
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": tempfile.mkdtemp(),
+            }
+        }
+    )
+    def test_cache_stats_command(self):
+        cache.clear()
+        self.make("10")
+        self.client.get(reverse("charts"))
+        self.client.get(reverse("transactions-aggregate"))
+        stdout = io.StringIO()
+        call_command("cache_stats", reset=True, stdout=stdout)
+        self.assertIn("Misses: 2", stdout.getvalue())
+        self.assertEqual(get_stats(), {"hits": 0, "misses": 0})
+
+    def test_cache_stats_command_refuses_locmem(self):
+        with self.assertRaises(CommandError):
+            call_command("cache_stats", stdout=io.StringIO())
+
+
+class TransactionSummaryTestCase(TestCase):
+    """
+    Unit tests for the single query TransactionSummary service.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other_user = User.objects.create_user(
+            username="other", password="password123"
+        )
+        cls.food = baker.make(Category, name="Food")
+        for day, amount, transaction_type, payment_type in (
+            (1, "3000", "Income", "Account"),
+            (5, "150.50", "Expenses", "Cash"),
+            (9, "49.50", "Expenses", "Card"),
+        ):
+            Transaction.objects.create(
+                created_by=cls.user,
+                category=cls.food,
+                date_time=timezone.make_aware(datetime(2025, 9, day, 12)),
+                amount=Decimal(amount),
+                transaction_type=transaction_type,
+                payment_type=payment_type,
+            )
+        Transaction.objects.create(
+            created_by=cls.other_user, amount=Decimal("1"), transaction_type="Income"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_from_queryset(self):
+        with self.assertNumQueries(1):
+            summary = TransactionSummary.from_queryset(
+                Transaction.objects.filter(created_by=self.user)
+            )
+        self.assertEqual(summary.income, Decimal("3000"))
+        self.assertEqual(summary.expenses, Decimal("200"))
+        self.assertEqual(summary.balance, Decimal("2800"))
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.first_date_time.day, 1)
+        self.assertEqual(summary.last_date_time.day, 9)
+
+    def test_from_rollups_matches_transactions(self):
+        with self.assertNumQueries(1):
+            summary = TransactionSummary.from_rollups(self.user)
+        self.assertEqual(
+            summary,
+            TransactionSummary.from_queryset(
+                Transaction.objects.filter(created_by=self.user)
+            ),
+        )
+
+    def test_empty(self):
+        user = User.objects.create_user(username="new", password="password123")
+        summary = TransactionSummary.from_rollups(user)
+        self.assertEqual(
+            summary, TransactionSummary(Decimal("0"), Decimal("0"), 0, None, None)
+        )
+
+    def test_for_user_applies_datatables_filter(self):
+        with self.assertNumQueries(1):
+            summary = TransactionSummary.for_user(
+                self.user, QueryDict("payment_type=Cash&remarks=")
+            )
+        self.assertEqual((summary.expenses, summary.count), (Decimal("150.50"), 1))
+
+    def test_dashboard_totals_follow_filter(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("index"), {"transaction_type": "Expenses"})
+        self.assertEqual(response.context["total_income"], "0.00")
+        self.assertEqual(response.context["total_expenses"], "200.00")
+
+        response = self.client.get(reverse("charts"))
+        self.assertEqual(response.context["summary"].count, 3)
+
+
+class TransactionTableKeysetPaginationTestCase(TestCase):
+    """
+    Unit tests for keyset paging of the Transactions datatables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        categories = [*baker.make(Category, _quantity=2), None]
+        # Plenty of ties (and NULL categories) for the id tie-breaker to sort out
+        for i in range(23):
+            Transaction.objects.create(
+                created_by=cls.user,
+                category=categories[i % 3],
+                amount=Decimal(i % 4),
+                date_time=timezone.make_aware(datetime(2025, 9, 1 + i // 2, 12)),
+                payment_type="Cash" if i % 2 else "Card",
+                remarks=f"Lunch {i % 5}",
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def expected_ids(self, sort: str, **filters) -> list[int]:
+        name = sort.lstrip("-")
+        column = (
+            F(name).desc(nulls_last=True)
+            if sort.startswith("-")
+            else F(name).asc(nulls_first=True)
+        )
+        return list(
+            Transaction.objects.filter(created_by=self.user, **filters)
+            .order_by(column, "-pk" if sort.startswith("-") else "pk")
+            .values_list("pk", flat=True)
+        )
+
+    def walk(self, params: dict, cursor_name: str = "next_cursor") -> list[list[int]]:
+        pages = []
+        while True:
+            table = self.client.get(reverse("dynamic_dt"), params).context["table"]
+            pages.append([row.record.pk for row in table.page.object_list])
+            cursor = getattr(table.page, cursor_name)
+            if cursor is None:
+                return pages
+            params = {**params, "cursor": cursor}
+
+    def test_pages_follow_sort_column(self):
+        for sort in ("-date_time", "amount", "-amount", "category", "-category"):
+            with self.subTest(sort=sort):
+                pages = self.walk({"sort": sort})
+                expected = self.expected_ids(sort)
+                self.assertEqual(sum(pages, []), expected)
+                self.assertEqual([len(page) for page in pages], [10, 10, 3])
+
+                table = self.client.get(
+                    reverse("dynamic_dt"),
+                    {"sort": sort, "cursor": self.walk_cursor(sort)},
+                ).context["table"]
+                last_page = [row.record.pk for row in table.page.object_list]
+                self.assertEqual(last_page, expected[20:])
+
+    def walk_cursor(self, sort: str) -> str:
+        """Cursor of the last page, sorted by `sort`."""
+        params = {"sort": sort}
+        for _ in range(2):
+            table = self.client.get(reverse("dynamic_dt"), params).context["table"]
+            params["cursor"] = table.page.next_cursor
+        return params["cursor"]
+
+    def test_previous_pages(self):
+        params = {"sort": "amount", "cursor": self.walk_cursor("amount")}
+        pages = self.walk(params, cursor_name="previous_cursor")
+        expected = self.expected_ids("amount")
+        self.assertEqual(pages, [expected[20:], expected[10:20], expected[:10]])
+
+    def test_no_count_nor_offset(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("dynamic_dt"),
+                {"sort": "-amount", "cursor": self.walk_cursor("-amount")},
+            )
+        table_sql = [
+            query["sql"]
+            for query in context.captured_queries
+            if "pages_transaction" in query["sql"]
+        ]
+        self.assertFalse(any("COUNT(" in sql for sql in table_sql))
+        self.assertFalse(any("OFFSET" in sql for sql in table_sql))
+        self.assertEqual(response.context["table"].paginator.count, 23)
+
+    def test_filters_and_stale_cursors(self):
+        pages = self.walk({"payment_type": "Cash", "sort": "amount"})
+        self.assertEqual(
+            sum(pages, []), self.expected_ids("amount", payment_type="Cash")
+        )
+
+        # Cursors of another sort order (or garbage) restart from the top
+        for cursor in (self.walk_cursor("amount"), "garbage"):
+            with self.subTest(cursor=cursor):
+                table = self.client.get(
+                    reverse("dynamic_dt"), {"sort": "-date_time", "cursor": cursor}
+                ).context["table"]
+                self.assertEqual(
+                    [row.record.pk for row in table.page.object_list],
+                    self.expected_ids("-date_time")[:10],
+                )
+                self.assertIsNone(table.page.previous_cursor)
+
+
+class TransactionRunningBalanceTestCase(TestCase):
+    """
+    Unit tests for the running balance column of the Transactions datatables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        other_user = User.objects.create_user(username="other", password="pw")
+        cls.food = baker.make(Category, name="Food")
+        # Over month boundaries (in local time), with date & time ties
+        for i in range(30):
+            Transaction.objects.create(
+                created_by=cls.user,
+                category=cls.food if i % 3 else None,
+                amount=Decimal(10 + i),
+                date_time=timezone.make_aware(datetime(2025, 1 + i // 6, 28, 23))
+                + timedelta(hours=i % 4),
+                transaction_type="Expenses" if i % 4 == 1 else "Income",
+                payment_type="Cash" if i % 2 else "Card",
+                remarks=f"Lunch {i % 5}",
+            )
+        baker.make(Transaction, created_by=other_user, amount=Decimal(1000))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def expected_balances(self, **filters) -> dict[int, Decimal]:
+        balances, balance = {}, Decimal("0")
+        for transaction in Transaction.objects.filter(
+            created_by=self.user, **filters
+        ).order_by("date_time", "id"):
+            sign = 1 if transaction.transaction_type == "Income" else -1
+            balance += sign * transaction.amount
+            balances[transaction.pk] = balance
+        return balances
+
+    def walk(self, params: dict) -> dict[int, Decimal]:
+        balances = {}
+        while True:
+            table = self.client.get(reverse("dynamic_dt"), params).context["table"]
+            shown = {row.record.pk for row in table.page.object_list}
+            self.assertEqual(set(table.running_balances), shown)
+            balances.update(table.running_balances)
+            if table.page.next_cursor is None:
+                return balances
+            params = {**params, "cursor": table.page.next_cursor}
+
+    def test_balances_of_all_prior_rows(self):
+        for sort in ("-date_time", "date_time", "amount", "-category"):
+            with self.subTest(sort=sort):
+                self.assertEqual(self.walk({"sort": sort}), self.expected_balances())
+
+    def test_filtered_balances(self):
+        # Off the rollups, then off the Transactions
+        self.assertEqual(
+            self.walk({"payment_type": "Cash", "category": self.food.pk}),
+            self.expected_balances(payment_type="Cash", category=self.food),
+        )
+        self.assertEqual(
+            self.walk({"remarks": "lunch", "sort": "amount"}),
+            self.expected_balances(),
+        )
+
+    def test_rendered(self):
+        response = self.client.get(reverse("dynamic_dt"))
+        latest = list(self.expected_balances().values())[-1]
+        self.assertContains(response, f"RM {latest}")
+
+    def test_query_count_does_not_grow_with_history(self):
+        def balance_queries() -> int:
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(reverse("dynamic_dt"))
+            return sum(
+                "OVER" in query["sql"] or "month_0" in query["sql"]
+                for query in context.captured_queries
+            )
+
+        self.assertEqual(balance_queries(), 2)
+        Transaction.objects.bulk_create(
+            Transaction(
+                created_by=self.user,
+                date_time=timezone.make_aware(datetime(2020, 1, 1)) + timedelta(i),
+            )
+            for i in range(50)
+        )
+        self.assertEqual(balance_queries(), 2)
+
+
+@override_settings(JOBS_RESULT_DIR=tempfile.mkdtemp())
+class ImportTransactionsTestCase(TestCase):
+    """
+    Unit tests for importing Transactions from exported CSV/XLSX files.
+    """
+
+    fields = ("date_time", "amount", "payment_type", "category", "transaction_type")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.importer = User.objects.create_user(username="importer", password="pw")
+        cls.category = baker.make(Category, name="Food")
+        for day in range(1, 6):
+            baker.make(
+                Transaction,
+                category=cls.category if day % 2 else None,
+                amount=Decimal(f"{day}0.10"),
+                date_time=datetime(2025, 9, day, 12, 30, tzinfo=dt_timezone.utc),
+                remarks=f'Line {day}, "quoted"\nbreak',
+                created_by=cls.user,
+            )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def rows_of(self, user) -> list[tuple]:
+        return sorted(
+            Transaction.objects.filter(created_by=user).values_list(
+                *self.fields, "remarks"
+            )
+        )
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as fileobj:
+            fileobj.write(content)
+        return path
+
+    def export_csv(self) -> bytes:
+        qs = Transaction.objects.filter(created_by=self.user)
+        return b"".join(stream_csv(iter_row_chunks(qs)))
+
+    def run_command(self, *args) -> str:
+        stdout = io.StringIO()
+        call_command("import_transactions", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_csv_round_trip(self):
+        path = self.write("statement.csv", self.export_csv())
+        output = self.run_command(path, "--user", "importer", "--batch-size", "2")
+
+        self.assertIn("Processed 2/~", output)
+        self.assertIn("Successfully imported 5 Transaction(s)", output)
+        self.assertEqual(self.rows_of(self.importer), self.rows_of(self.user))
+        self.assertEqual(verify_rollups(), [])
+
+    def test_xlsx_round_trip_across_sheets(self):
+        fileobj = io.BytesIO()
+        qs = Transaction.objects.filter(created_by=self.user)
+        write_xlsx(iter_row_chunks(qs), fileobj, max_rows=3)
+        path = self.write("statement.xlsx", fileobj.getvalue())
+        Transaction.objects.all().delete()
+
+        # Rows go back to their "Created By" user
+        self.run_command(path)
+        self.assertEqual(Transaction.objects.filter(created_by=self.user).count(), 5)
+        self.assertEqual(
+            sorted(Transaction.objects.values_list("amount", flat=True)),
+            [Decimal(f"{day}0.10") for day in range(1, 6)],
+        )
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        content = self.export_csv().decode("utf-8")
+        content += (
+            "2025-09-31 00:00:00,1.00,Cash,,Income,,tester\n"
+            "2025-09-01 00:00:00,x,Cash,,Income,,tester\n"
+            "2025-09-01 00:00:00,1.00,Cheque,Unknown,Income,,nobody\n"
+            "\n"
+        )
+        output = self.run_command(
+            self.write("statement.csv", content.encode()), "--user", "importer"
+        )
+
+        self.assertEqual(output.count("Skipped row"), 3)
+        self.assertIn("Datetime: Expected", output)
+        self.assertIn("Amount(RM):", output)
+        self.assertIn("Unknown category 'Unknown'", output)
+        self.assertIn("Successfully imported 5 Transaction(s)", output)
+        self.assertEqual(Transaction.objects.count(), 10)
+
+    def test_dry_run_rolls_back(self):
+        path = self.write("statement.csv", self.export_csv())
+        output = self.run_command(path, "--user", "importer", "--dry-run")
+
+        self.assertIn("Would have imported 5 Transaction(s)", output)
+        self.assertEqual(Transaction.objects.count(), 5)
+        self.assertEqual(verify_rollups(), [])
+
+    def test_overlapping_statement_skips_duplicates(self):
+        content = self.export_csv().decode("utf-8")
+        # Same as an exported line, modulo case & whitespace; then a new line
+        content += (
+            "2025-09-01 12:30:00,10.1,Account,Food,Income,"
+            '"  line 1,  ""QUOTED""\nbreak",tester\n'
+            "2025-09-06 12:30:00,60.10,Account,,Income,New,tester\n"
+        )
+        path = self.write("statement.csv", content.encode())
+
+        output = self.run_command(path, "--batch-size", "3")
+        self.assertIn("Successfully imported 1 Transaction(s) (6 duplicate(s)", output)
+        self.assertEqual(Transaction.objects.count(), 6)
+
+        output = self.run_command(path, "--keep-duplicates")
+        self.assertIn("Successfully imported 7 Transaction(s)", output)
+
+    def test_unexpected_columns(self):
+        path = self.write("statement.csv", b"Date,Amount\n2025-09-01,1\n")
+        with self.assertRaisesMessage(CommandError, "Expected columns"):
+            self.run_command(path)
+        with self.assertRaisesMessage(CommandError, "Unsupported file format"):
+            self.run_command(self.write("statement.txt", b""))
+
+    def test_upload_end_to_end(self):
+        self.client.force_login(self.importer)
+        content = self.export_csv() + b"not a date,1,Cash,,Income,,\n"
+        response = self.client.post(
+            reverse("transactions-import"),
+            {"file": SimpleUploadedFile("statement.csv", content)},
+        )
+        self.assertEqual(response.status_code, 200)
+        job = Job.objects.get()
+        self.assertContains(response, reverse("jobs-status", args=[job.pk]))
+
+        call_command("run_jobs", "--once", stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual((job.params["created"], job.params["errors"]), (5, 1))
+        self.assertFalse(os.path.exists(job.params["path"]))
+        self.assertEqual(self.rows_of(self.importer), self.rows_of(self.user))
+
+        response = self.client.get(reverse("jobs-download", args=[job.pk]))
+        report = b"".join(response.streaming_content).decode()
+        self.assertEqual(report.splitlines()[0], "Row,Error")
+        self.assertIn("Datetime: Expected", report)
+
+    def test_upload_rejects_other_formats(self):
+        self.client.force_login(self.importer)
+        response = self.client.post(
+            reverse("transactions-import"),
+            {"file": SimpleUploadedFile("statement.pdf", b"%PDF")},
+            HTTP_REFERER="http://testserver/transactions/",
+        )
+        self.assertEqual(response["HX-Redirect"], "http://testserver/transactions/")
+        self.assertFalse(Job.objects.exists())
+
+
+class CategoryRuleTestCase(TestCase):
+    """
+    Unit tests for auto-categorizing Transactions by CategoryRules.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        cls.other = User.objects.create_user(username="other", password="password123")
+        cls.food = baker.make(Category, name="Food")
+        cls.transport = baker.make(Category, name="Transport")
+        cls.bills = baker.make(Category, name="Bills")
+
+    def setUp(self):
+        # Compiled matchers are cached under the cache's versions
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def make_rule(self, pattern: str, category: Category, **kwargs) -> CategoryRule:
+        kwargs.setdefault("created_by", self.user)
+        return CategoryRule.objects.create(pattern=pattern, category=category, **kwargs)
+
+    def test_aho_corasick_finds_overlapping_keywords(self):
+        automaton = AhoCorasick([("he", 0), ("she", 1), ("his", 2), ("hers", 3)])
+        self.assertEqual(sorted(automaton.find("ushers")), [0, 1, 3])
+        self.assertEqual(list(automaton.find("xyz")), [])
+
+    def test_highest_priority_then_oldest_rule_wins(self):
+        Regex = CategoryRule.MatchType.REGEX
+        rules = [
+            CategoryRule(id=1, pattern="grab", category=self.transport),
+            CategoryRule(id=2, pattern="grab food", category=self.food, priority=1),
+            CategoryRule(
+                id=3, pattern=r"\bbill\b", category=self.bills, match_type=Regex
+            ),
+            CategoryRule(id=4, pattern="bill", category=self.food),
+            CategoryRule(
+                id=5, pattern=r"^tng", category=self.transport, match_type=Regex
+            ),
+        ]
+        rules.sort(key=lambda rule: (-rule.priority, rule.id))
+        matcher = RuleMatcher(rules)
+
+        self.assertEqual(matcher.match("GRAB Food order"), self.food.pk)
+        self.assertEqual(matcher.match("Grab ride"), self.transport.pk)
+        self.assertEqual(matcher.match("Electricity Bill"), self.bills.pk)
+        self.assertEqual(matcher.match("Billing"), self.food.pk)
+        self.assertEqual(matcher.match("TNG reload"), self.transport.pk)
+        self.assertIsNone(matcher.match("Reload TNG"))
+        self.assertIsNone(matcher.match(""))
+
+    def test_required_literal(self):
+        cases = {
+            r"\bBill\b": "bill",
+            r"grab\s+(food|mart)": "grab",
+            r"colou?r": "colo",
+            r"ab+c": "ab",
+            r"[]x]\.com": ".com",
+            r"food|mart": "",
+            r"(?x) a b": "",
+            r"invoice \d{4}": "invoice ",
+            r"x{10}": "",
+            r"ab{2,3}c": "a",
+        }
+        for pattern, literal in cases.items():
+            self.assertEqual(required_literal(pattern), literal, pattern)
+
+        # Regexes without one are always run
+        Regex = CategoryRule.MatchType.REGEX
+        matcher = RuleMatcher(
+            [
+                CategoryRule(
+                    id=1, pattern="food|mart", category=self.food, match_type=Regex
+                ),
+                CategoryRule(
+                    id=2, pattern="colou?r", category=self.bills, match_type=Regex
+                ),
+            ]
+        )
+        self.assertEqual(matcher.match("Supermart"), self.food.pk)
+        self.assertEqual(matcher.match("COLOR print"), self.bills.pk)
+
+        # Quantifier bounds are no literal: matches agree with `re.search`
+        for pattern, remarks in [
+            (r"invoice \d{4}", "Invoice 1111"),
+            (r"invoice \d{4}", "Invoice 4"),
+            (r"x{10}", "xxxxxxxxxx"),
+            (r"x{10}", "10"),
+            (r"ab{2,3}c", "abbc"),
+            (r"ab{2,3}c", "ab2,3c"),
+        ]:
+            matcher = RuleMatcher(
+                [
+                    CategoryRule(
+                        id=1, pattern=pattern, category=self.food, match_type=Regex
+                    )
+                ]
+            )
+            found = re.search(pattern, remarks, re.IGNORECASE)
+            self.assertEqual(
+                matcher.match(remarks), self.food.pk if found else None, pattern
+            )
+
+    def test_validate_pattern(self):
+        Regex = CategoryRule.MatchType.REGEX
+        validate_pattern(Regex, r"^grab\s+(food|mart)")
+        with self.assertRaises(ValidationError):
+            validate_pattern(Regex, "(unclosed")
+        with self.assertRaises(ValidationError):
+            validate_pattern(CategoryRule.MatchType.KEYWORD, "  ")
+
+        # Invalid rules saved anyway are ignored
+        matcher = RuleMatcher(
+            [CategoryRule(id=1, pattern="(x", category=self.food, match_type=Regex)]
+        )
+        self.assertIsNone(matcher.match("(x"))
+
+    def test_matcher_is_cached_until_rules_change(self):
+        self.make_rule("grab", self.transport)
+        matcher = get_matcher(self.user.pk)
+        # Only the versions
+        with self.assertNumQueries(1):
+            self.assertIs(get_matcher(self.user.pk), matcher)
+
+        # Changed by another process (web or `run_jobs` worker): nothing of
+        # this one's cache gets bumped, only the DB
+        with mock.patch.object(cache, "incr"), mock.patch.object(cache, "add"):
+            rule = self.make_rule("grab", self.food, priority=1)
+        self.assertEqual(get_matcher(self.user.pk).match("grab"), self.food.pk)
+        rule.delete()
+        self.assertEqual(get_matcher(self.user.pk).match("grab"), self.transport.pk)
+        # Other users' rules are their own
+        self.assertIsNone(get_matcher(self.other.pk).match("grab"))
+
+    def test_cost_does_not_grow_with_rules(self):
+        objs = [
+            Transaction(remarks=f"Order {i} at shop {i % 50}", created_by=self.user)
+            for i in range(100)
+        ]
+        self.make_rule("shop 7", self.food)
+        get_matcher(self.user.pk)
+        # Only the versions, once per user
+        with self.assertNumQueries(1):
+            few = len(categorize(objs))
+
+        for obj in objs:
+            obj.category_id = None
+        CategoryRule.objects.bulk_create(
+            CategoryRule(
+                pattern=f"merchant {i}", category=self.bills, created_by=self.user
+            )
+            for i in range(1000)
+        )
+        self.make_rule(r"shop 4\d$", self.food, match_type=CategoryRule.MatchType.REGEX)
+        get_matcher(self.user.pk)
+        with self.assertNumQueries(1):
+            many = len(categorize(objs))
+        self.assertEqual((few, many), (2, 22))
+
+    def test_recategorize_command(self):
+        self.make_rule("grab", self.transport)
+        self.make_rule("lunch", self.food)
+        for remarks in ("Grab ride", "Lunch", "Lunch again", "Misc", "Grab"):
+            baker.make(
+                Transaction, remarks=remarks, category=None, created_by=self.user
+            )
+        baker.make(
+            Transaction, remarks="Lunch", category=self.bills, created_by=self.user
+        )
+        baker.make(Transaction, remarks="Lunch", category=None, created_by=self.other)
+
+        stdout = io.StringIO()
+        call_command("recategorize", "--dry-run", stdout=stdout)
+        self.assertIn("Would have categorized 4 Transaction(s)", stdout.getvalue())
+        self.assertEqual(Transaction.objects.filter(category=None).count(), 6)
+
+        call_command("recategorize", "--user", "other", stdout=stdout)
+        self.assertEqual(Transaction.objects.filter(category=None).count(), 6)
+
+        call_command("recategorize", "--chunk-size", "2", stdout=stdout)
+        self.assertIn("Categorized 4 Transaction(s)", stdout.getvalue())
+        self.assertEqual(
+            list(
+                Transaction.objects.filter(created_by=self.user)
+                .order_by("remarks", "category__name")
+                .values_list("remarks", "category__name")
+            ),
+            [
+                ("Grab", "Transport"),
+                ("Grab ride", "Transport"),
+                ("Lunch", "Bills"),
+                ("Lunch", "Food"),
+                ("Lunch again", "Food"),
+                ("Misc", None),
+            ],
+        )
+        self.assertEqual(verify_rollups(), [])
+
+    def test_import_categorizes_uncategorized_rows(self):
+        self.make_rule("grab", self.transport)
+        content = (
+            ",".join(EXPORT_COLUMNS) + "\n"
+            "2025-09-01 00:00:00,1.00,Cash,,Expenses,Grab ride,tester\n"
+            "2025-09-02 00:00:00,2.00,Cash,Food,Expenses,Grab food,tester\n"
+            "2025-09-03 00:00:00,3.00,Cash,,Expenses,Misc,tester\n"
+        )
+        path = os.path.join(tempfile.mkdtemp(), "statement.csv")
+        with open(path, "w") as fileobj:
+            fileobj.write(content)
+        call_command("import_transactions", path, stdout=io.StringIO())
+
+        self.assertEqual(
+            list(
+                Transaction.objects.order_by("date_time").values_list(
+                    "category__name", flat=True
+                )
+            ),
+            ["Transport", "Food", None],
+        )
+        self.assertEqual(verify_rollups(), [])
+
+
+class TransactionSearchTestCase(TestCase):
+    """
+    Unit tests for the full-text search over Transaction remarks.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="password123")
+        for remarks in (
+            "Groceries @ SuperMart",
+            "Café latte",
+            "Agro supplies",
+            "50% off - SALE",
+            "",
+        ):
+            baker.make(Transaction, remarks=remarks, created_by=cls.user)
+
+    def found(self, query: str, **kwargs) -> list[str]:
+        return sorted(
+            search(Transaction.objects.all(), query, **kwargs).values_list(
+                "remarks", flat=True
+            )
+        )
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(self.found("gro"), ["Groceries @ SuperMart"])
+        self.assertEqual(self.found("SUPER gro"), ["Groceries @ SuperMart"])
+        self.assertEqual(self.found("gro latte"), [])
+        self.assertEqual(self.found("cafe"), ["Café latte"])
+        # Nothing indexable: plain substring match
+        self.assertEqual(self.found(" % "), ["50% off - SALE"])
+        self.assertEqual(len(self.found("")), 5)
+
+        ranked = search(Transaction.objects.all(), "su", ranked=True)
+        self.assertEqual(
+            [row[SEARCH_RANK] > 0 for row in ranked.values(SEARCH_RANK)], [True] * 2
+        )
+
+    def test_index_follows_writes(self):
+        obj = baker.make(Transaction, remarks="Parking", created_by=self.user)
+        Transaction.objects.bulk_create(
+            [Transaction(remarks="Parking fine", amount=1, created_by=self.user)]
+        )
+        self.assertEqual(self.found("park"), ["Parking", "Parking fine"])
+
+        obj.remarks = "Toll"
+        obj.save()
+        Transaction.objects.filter(remarks="Parking fine").update(remarks="Tolls")
+        self.assertEqual(self.found("park"), [])
+        self.assertEqual(self.found("toll"), ["Toll", "Tolls"])
+
+        obj.delete()
+        self.assertEqual(self.found("toll"), ["Tolls"])
+
+    def test_install_reindexes_rows_written_without_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER pages_transaction_fts_insert")
+        baker.make(Transaction, remarks="Unindexed", created_by=self.user)
+        self.assertEqual(self.found("unindexed"), [])
+
+        install_search_index()
+        self.assertEqual(self.found("unindexed"), ["Unindexed"])
+        install_search_index()
+        self.assertEqual(self.found("unindexed"), ["Unindexed"])
+
+    @override_settings(SEARCH_BACKEND="like")
+    def test_like_backend(self):
+        self.assertEqual(self.found("SUPER gro"), ["Groceries @ SuperMart"])
+        # Substrings rather than prefixes
+        self.assertEqual(
+            self.found("gro", ranked=True), ["Agro supplies", "Groceries @ SuperMart"]
+        )
+
+    def test_datatables_filter(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("dynamic_dt"), {"remarks": "gro sup"})
+        self.assertContains(response, "Groceries @ SuperMart")
+        self.assertNotContains(response, "Agro supplies")
+
+
+class TransactionChangeSequenceTestCase(TestCase):
+    """
+    Unit tests for the change sequence numbers & tombstones of delta sync.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="pw")
+        self.other_user = User.objects.create_user(username="other", password="pw")
+
+    def seqs(self, *objs) -> list[int]:
+        return list(
+            Transaction.objects.filter(pk__in=[obj.pk for obj in objs])
+            .order_by("pk")
+            .values_list("change_seq", flat=True)
+        )
+
+    def tombstones(self) -> list[tuple]:
+        return list(
+            TransactionTombstone.objects.order_by(
+                "change_seq", "transaction_id"
+            ).values_list("transaction_id", "created_by_id", "change_seq")
+        )
+
+    def test_writes_number_changes_per_user(self):
+        first = baker.make(Transaction, created_by=self.user)
+        others = Transaction.objects.bulk_create(
+            [
+                Transaction(created_by=self.user),
+                Transaction(created_by=self.other_user),
+            ]
+        )
+        self.assertEqual(self.seqs(first, *others), [1, 2, 1])
+
+        first.save(update_fields=["remarks"])
+        Transaction.objects.filter(pk__in=[obj.pk for obj in others]).update(
+            remarks="Updated"
+        )
+        self.assertEqual(self.seqs(first, *others), [3, 4, 2])
+        # Amounts moving between rollup rows, numbered alike
+        Transaction.objects.all().update(amount=F("amount") + 1)
+        self.assertEqual(self.seqs(first, *others), [5, 5, 3])
+        self.assertEqual(ChangeMarker.objects.get(scope=f"user:{self.user.pk}").seq, 5)
+        # Fingerprint refreshes aren't visible changes
+        Transaction.objects.all().refresh_fingerprints()
+        Transaction.objects.update(fingerprint="")
+        self.assertEqual(self.seqs(first, *others), [5, 5, 3])
+
+    def test_numbering_without_upsert(self):
+        # The ORM-only path, for DBs without `INSERT ... RETURNING` upserts
+        baker.make(Transaction, created_by=self.user)
+        features = connection.features
+        with mock.patch.object(
+            features, "supports_update_conflicts_with_target", False
+        ):
+            self.assertEqual(
+                next_seqs([self.user.pk, self.other_user.pk, self.user.pk]),
+                {self.user.pk: 2, self.other_user.pk: 1},
+            )
+            self.assertEqual(next_seqs([self.other_user.pk]), {self.other_user.pk: 2})
+            self.assertEqual(next_seqs([]), {})
+        self.assertEqual(next_seqs([self.user.pk]), {self.user.pk: 3})
+
+    def test_touch_names_conflict_target_only_if_supported(self):
+        touch(["scope"])
+        self.assertTrue(ChangeMarker.objects.filter(scope="scope").exists())
+
+        features = connection.features
+        with (
+            mock.patch.object(features, "supports_update_conflicts_with_target", False),
+            mock.patch.object(QuerySet, "bulk_create") as bulk_create,
+        ):
+            touch(["scope"])
+        self.assertIsNone(bulk_create.call_args.kwargs["unique_fields"])
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+
+    def test_deletes_leave_tombstones(self):
+        first, second, third = baker.make(
+            Transaction, created_by=self.user, _quantity=3
+        )
+        moved = baker.make(Transaction, created_by=self.user)
+
+        Transaction.objects.get(pk=first.pk).delete()
+        Transaction.objects.filter(pk__in=[second.pk, third.pk]).delete()
+        moved.created_by = self.other_user
+        moved.save()
+        self.assertEqual(
+            self.tombstones(),
+            [
+                (first.pk, self.user.pk, 5),
+                (second.pk, self.user.pk, 6),
+                (third.pk, self.user.pk, 6),
+                (moved.pk, self.user.pk, 7),
+            ],
+        )
+        self.assertEqual(self.seqs(moved), [1])
+        self.assertEqual(verify_rollups(), [])
+
+    def test_prune_tombstones_command(self):
+        baker.make(Transaction, created_by=self.user, _quantity=2)
+        Transaction.objects.filter(created_by=self.user).delete()
+
+        stdout = io.StringIO()
+        call_command("prune_tombstones", days=1, stdout=stdout)
+        self.assertIn("Pruned 0 tombstone(s).", stdout.getvalue())
+
+        TransactionTombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=2)
+        )
+        call_command("prune_tombstones", days=1, stdout=stdout)
+        self.assertIn("Pruned 2 tombstone(s).", stdout.getvalue())
+        self.assertEqual(self.tombstones(), [])
+        self.assertEqual(
+            ChangeMarker.objects.get(scope=f"user:{self.user.pk}").pruned_seq, 3
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("prune_tombstones", days=-1, stdout=stdout)
+
+
+class DownsamplingTestCase(SimpleTestCase):
+    """
+    Unit tests for the min/max per pixel bucket downsampling of series.
+    """
+
+    def test_keeps_peaks_within_bound(self):
+        rng = np.random.default_rng(0)
+        x = np.arange(100_000) * 3
+        ys = [rng.normal(size=x.size), rng.normal(size=x.size)]
+        ys[0][12_345], ys[1][54_321] = 100, -100
+
+        indices = minmax_indices(x, ys, 400)
+        self.assertLessEqual(indices.size, 400)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(12_345, indices)
+        self.assertIn(54_321, indices)
+        for y in ys:
+            self.assertEqual(y[indices].min(), y.min())
+            self.assertEqual(y[indices].max(), y.max())
+
+        # Short series are left alone
+        self.assertEqual(minmax_indices(x[:10], [y[:10] for y in ys], 400).size, 10)
+
+    def test_intervals_follow_time(self):
+        # Dense then sparse: intervals are spans of time, not of points
+        x = np.concatenate([np.arange(1000), np.arange(1000, 101_000, 1000)])
+        y = np.ones(x.size)
+        y[[500, 1050]] = [5, 0]
+        indices = minmax_indices(x, [y], 20)
+        self.assertLessEqual(indices.size, 20)
+        self.assertIn(500, indices)
+        self.assertGreater((x[indices] >= 1000).sum(), 5)
+
+    def test_downsample_series(self):
+        buckets = [date(2020, 1, 1) + timedelta(days=day) for day in range(1000)]
+        data = {
+            "bucket": "day",
+            "group_by": "transaction_type",
+            "buckets": buckets,
+            "series": [
+                {
+                    "key": "Income",
+                    "totals": [float(day % 7) for day in range(1000)],
+                    "counts": [1] * 1000,
+                },
+                {"key": "Expenses", "totals": [0.0] * 1000, "counts": [0] * 1000},
+            ],
+        }
+        downsampled = downsample_series(data, 100)
+        self.assertLessEqual(len(downsampled["buckets"]), 100)
+        self.assertEqual(downsampled["buckets"][0], date(2020, 1, 1))
+        self.assertIsInstance(downsampled["buckets"][0], date)
+        for item in downsampled["series"]:
+            self.assertEqual(len(item["totals"]), len(downsampled["buckets"]))
+            self.assertEqual(len(item["counts"]), len(downsampled["buckets"]))
+        self.assertEqual(max(downsampled["series"][0]["totals"]), 6.0)
+        self.assertIs(downsample_series(data, 1000), data)
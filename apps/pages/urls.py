@@ -2,14 +2,18 @@ from django.urls import path
 
 from apps.pages.views import (
     DashboardView,
+    TransactionListView,
     TransactionFormView,
     TransactionConfirmDeleteView,
     TransactionDeleteView,
     TransactionsExportView,
+    TransactionsExportJobView,
+    TransactionsImportView,
 )
 
 urlpatterns = [
     path("", DashboardView.as_view(), name="index"),
+    path("transactions/", TransactionListView.as_view(), name="dynamic_dt"),
     path(
         "transactions/create/",
         TransactionFormView.as_view(),
@@ -35,4 +39,14 @@ urlpatterns = [
         TransactionsExportView.as_view(),
         name="transactions-export",
     ),
+    path(
+        "transactions/exports/<str:format>/jobs/",
+        TransactionsExportJobView.as_view(),
+        name="transactions-export-job",
+    ),
+    path(
+        "transactions/imports/",
+        TransactionsImportView.as_view(),
+        name="transactions-import",
+    ),
 ]
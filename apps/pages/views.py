@@ -1,21 +1,32 @@
-from decimal import Decimal
 from typing import Any
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from apps.pages.filters import TransactionDataTablesFilter
 from apps.pages.models import Transaction
-from django.db.models import Sum
+from django.db.models import QuerySet
 from django.views.generic import TemplateView
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from urllib.parse import urlparse, parse_qs
 from django.contrib import messages
-import pandas as pd
 
+from apps.jobs.services import enqueue
+from apps.pages.balances import rollup_queryset
+from apps.pages.exports import (
+    COMPRESS_LEVELS,
+    DEFAULT_COMPRESSLEVEL,
+    EXPORT_FORMATS,
+    EXPORT_JOB_KIND,
+    filter_export_queryset,
+    iter_row_chunks,
+)
+from apps.pages.imports import IMPORT_JOB_KIND, import_format_of, save_upload
+from apps.pages.paginators import CURSOR_FIELD, KeysetPaginator
+from apps.pages.summary import get_user_summary
 from apps.pages.tables import TransactionDataTables
-from .forms import TransactionForm
+from .forms import TransactionForm, TransactionImportForm
 from django_tables2 import RequestConfig
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.views import View
 
@@ -23,6 +34,30 @@ from django.views import View
 from django.views.generic import FormView, DetailView, DeleteView
 
 
+def paginate_keyset(
+    request: HttpRequest, table: TransactionDataTables, count: int | None = None
+) -> None:
+    """
+    Configure sorting & keyset pagination of the user's (filtered)
+    Transactions table, without any COUNT(*) or OFFSET query.
+
+    The total shown defaults to the (cached) summary's count.
+    """
+
+    if count is None and request.user.is_authenticated:
+        count = get_user_summary(request.user, request.GET).count
+
+    RequestConfig(
+        request,
+        paginate={
+            "paginator_class": KeysetPaginator,
+            "per_page": 10,
+            "cursor": request.GET.get(CURSOR_FIELD),
+            "count": count,
+        },
+    ).configure(table)
+
+
 class DashboardView(LoginRequiredMixin, TemplateView):
     """
     View that renders results to dashboard page.
@@ -36,34 +71,14 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
 
-        total_income = Decimal("0")
-        total_expenses = Decimal("0")
-
+        summary = None
         if self.request.user.is_authenticated:
-            queryset = (
-                Transaction.objects.select_related("created_by", "category")
-                .filter(created_by=self.request.user)
-                .values("transaction_type")
-                .annotate(total_amount=Sum("amount"))
-                .order_by("transaction_type")
-            )
-
-            income_qs = queryset.filter(
-                transaction_type=Transaction.TransactionType.INCOME
-            )
-            if income_qs.exists():
-                total_income = income_qs.first().get("total_amount", Decimal("0"))
-
-            expenses_qs = queryset.filter(
-                transaction_type=Transaction.TransactionType.EXPENSES
-            )
-            if expenses_qs.exists():
-                total_expenses = expenses_qs.first().get("total_amount", Decimal("0"))
-
-        context["total_income"] = f"{total_income:.2f}"
-        context["total_expenses"] = f"{total_expenses:.2f}"
-        remaining_balance = total_income - total_expenses
-        context["remaining_balance"] = f"{remaining_balance:.2f}"
+            # A single query, on the monthly rollups unless the table is filtered
+            summary = get_user_summary(self.request.user, self.request.GET)
+            context["summary"] = summary
+            context["total_income"] = f"{summary.income:.2f}"
+            context["total_expenses"] = f"{summary.expenses:.2f}"
+            context["remaining_balance"] = f"{summary.balance:.2f}"
 
         qs = Transaction.objects.select_related("created_by", "category").all()
         qs = (
@@ -75,11 +90,14 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # filter
         transaction_filter = TransactionDataTablesFilter(self.request.GET, queryset=qs)
 
-        # hook queryset into table
-        table = TransactionDataTables(transaction_filter.qs)
+        # hook queryset into table, running balances off the rollups
+        table = TransactionDataTables(
+            transaction_filter.qs,
+            rollups=rollup_queryset(self.request.user, self.request.GET),
+        )
 
-        # pagination + sorting
-        RequestConfig(self.request, paginate={"per_page": 10}).configure(table)
+        # keyset pagination + sorting, counting off the cached summary
+        paginate_keyset(self.request, table, count=summary.count if summary else None)
 
         context.update(
             {
@@ -113,11 +131,14 @@ class TransactionListView(LoginRequiredMixin, TemplateView):
         # filter
         transaction_filter = TransactionDataTablesFilter(self.request.GET, queryset=qs)
 
-        # hook queryset into table
-        table = TransactionDataTables(transaction_filter.qs)
+        # hook queryset into table, running balances off the rollups
+        table = TransactionDataTables(
+            transaction_filter.qs,
+            rollups=rollup_queryset(self.request.user, self.request.GET),
+        )
 
-        # pagination + sorting
-        RequestConfig(self.request, paginate={"per_page": 10}).configure(table)
+        # keyset pagination + sorting, counting off the cached summary
+        paginate_keyset(self.request, table)
 
         context.update(
             {
@@ -238,79 +259,126 @@ class TransactionsExportView(LoginRequiredMixin, View):
 
         return query_params
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Transaction]:
+        """
+        Return user's Transactions, filtered by the datatables' query params.
+        """
+
+        if not self.request.user.is_authenticated:
+            return Transaction.objects.none()
+
+        return filter_export_queryset(
+            self.request.user, self.extract_query_params(request)
+        )
+
+    def get_export_options(self, request: HttpRequest, export_format) -> dict | None:
+        """
+        Return extra keyword arguments for the format's stream, or None if the
+        requested options are invalid.
+        """
+
+        options = {}
+
+        if export_format.compressed:
+            level = request.GET.get("level", str(DEFAULT_COMPRESSLEVEL))
+            # Not `isdigit()`: true of Unicode digits like "²" too
+            if level not in COMPRESS_LEVELS:
+                messages.warning(request, f"Compression level {level} not supported")
+                return None
+            options["compresslevel"] = int(level)
+
+        return options
+
     def get(self, request: HttpRequest, format: str):
         """
-        Export based on format (either "csv" or "xlsx").
+        Export based on format (see `EXPORT_FORMATS`: "csv", "csv.gz", "zip",
+        "xlsx", "parquet" or "arrow").
+
+        Rows are read in chunks straight from the DB cursor, so memory
+        usage stays flat regardless of the number of exported rows.
+        Compressed formats take an optional `?level=0..9` query param.
 
         Only authenticated/logged in user can export their own data.
         """
 
-        query_params = self.extract_query_params(request)
-        qs = (
-            Transaction.objects.select_related(
-                "category",
-                "created_by",
-            )
-            .all()
-            .filter(created_by=self.request.user)
-            if self.request.user.is_authenticated
-            else Transaction.objects.none()
+        export_format = EXPORT_FORMATS.get(format)
+
+        if export_format is None:
+            messages.warning(request, f"Format {format} not supported")
+            return redirect(request.META.get("HTTP_REFERER", "dynamic_dt"))
+
+        options = self.get_export_options(request, export_format)
+        if options is None:
+            return redirect(request.META.get("HTTP_REFERER", "dynamic_dt"))
+
+        qs = self.get_queryset(request)
+        response = StreamingHttpResponse(
+            export_format.stream(iter_row_chunks(qs), **options),
+            content_type=export_format.content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{export_format.filename}"'
         )
-        qs = qs.values_list(
-            "date_time",
-            "amount",
-            "payment_type",
-            "category__name",
-            "transaction_type",
-            "remarks",
-            "created_by__username",
-        ).order_by("-date_time")
-
-        if "remarks" in query_params and query_params["remarks"][0] != "":
-            qs = qs.filter(remarks__icontains=query_params["remarks"][0])
-
-        if "payment_type" in query_params and query_params["payment_type"][0] != "":
-            qs = qs.filter(payment_type=query_params["payment_type"][0])
-
-        if (
-            "transaction_type" in query_params
-            and query_params["transaction_type"][0] != ""
-        ):
-            qs = qs.filter(transaction_type=query_params["transaction_type"][0])
-
-        if "category" in query_params and query_params["category"]:
-            qs = qs.filter(category__pk__in=query_params["category"])
-
-        df = pd.DataFrame(
-            qs,
-            columns=[
-                "Datetime",
-                "Amount(RM)",
-                "Payment Type",
-                "Category",
-                "Transaction Type",
-                "Remarks",
-                "Created By",
-            ],
+        return response
+
+
+class TransactionsExportJobView(TransactionsExportView):
+    """
+    Queues an export as a background Job instead of building it in-request,
+    then renders the Job's (HTMX polled) status.
+    """
+
+    def post(self, request: HttpRequest, format: str):
+        export_format = EXPORT_FORMATS.get(format)
+        options = (
+            self.get_export_options(request, export_format) if export_format else None
         )
-        if "Datetime" in df.columns and not df["Datetime"].isna().all():
-            df["Datetime"] = df["Datetime"].dt.strftime("%Y-%m-%d %H:%M:%S")
 
-        if format == "csv":
-            response = HttpResponse(content_type="text/csv")
-            response["Content-Disposition"] = 'attachment; filename="transactions.csv"'
-            df.to_csv(path_or_buf=response, index=False)
+        if options is None:
+            if export_format is None:
+                messages.warning(request, f"Format {format} not supported")
+            response = HttpResponse()
+            response["HX-Redirect"] = request.META.get("HTTP_REFERER", reverse("index"))
             return response
 
-        elif format == "xlsx":
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            response["Content-Disposition"] = 'attachment; filename="transactions.xlsx"'
-            with pd.ExcelWriter(response, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False)
+        job = enqueue(
+            EXPORT_JOB_KIND,
+            request.user,
+            {
+                "format": format,
+                "query_params": self.extract_query_params(request),
+                **options,
+            },
+        )
+        return render(request, "jobs/job_status.html", {"job": job})
+
+
+class TransactionsImportView(LoginRequiredMixin, View):
+    """
+    Queues the import of an uploaded CSV/XLSX statement (laid out like the
+    exported files) as a background Job, then renders the Job's status.
+    """
+
+    login_url = "auth_signin"
+
+    def post(self, request: HttpRequest):
+        form = TransactionImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                messages.warning(request, " ".join(errors))
+            response = HttpResponse()
+            response["HX-Redirect"] = request.META.get("HTTP_REFERER", reverse("index"))
             return response
 
-        # fallback if unsupported format
-        messages.warning(request, f"Format {format} not supported")
-        return redirect(request.META.get("HTTP_REFERER", "dynamic_dt"))
+        upload = form.cleaned_data["file"]
+        import_format = import_format_of(upload.name)
+        job = enqueue(
+            IMPORT_JOB_KIND,
+            request.user,
+            {
+                "format": import_format,
+                "filename": upload.name,
+                "path": save_upload(upload, import_format),
+            },
+        )
+        return render(request, "jobs/job_status.html", {"job": job})
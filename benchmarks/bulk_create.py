@@ -0,0 +1,75 @@
+"""
+Benchmark the Transactions API import path: per-row POST vs bulk create.
+
+Usage:
+
+    python -m benchmarks.bulk_create --rows 1000 5000
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import setup_django, test_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000])
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from apps.pages.models import Category, Transaction
+
+    def payload(rows: int, user, categories) -> list[dict]:
+        return [
+            {
+                "category": categories[i % len(categories)].pk,
+                "amount": f"{i % 5000 + 1}.25",
+                "dateTime": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:00:00Z",
+                "paymentType": Transaction.PaymentType.CARD,
+                "transactionType": Transaction.TransactionType.EXPENSES,
+                "remarks": f"Statement line {i}",
+                "createdBy": user.pk,
+            }
+            for i in range(rows)
+        ]
+
+    def per_row(client, items) -> None:
+        url = reverse("transactions-list")
+        for item in items:
+            client.post(url, data=item, format="json")
+
+    def bulk(client, items) -> None:
+        client.post(reverse("transactions-bulk-create"), data=items, format="json")
+
+    engines = {"per-row": per_row, "bulk": bulk}
+
+    with test_database():
+        client = APIClient()
+        categories = [
+            Category.objects.get_or_create(name=name)[0]
+            for name in ("Food", "Transportation", "Health", "Entertainment", "Other")
+        ]
+        print(f"{'rows':>9}  {'engine':<8}  {'seconds':>8}  {'rows/s':>10}")
+        for rows in args.rows:
+            for name, engine in engines.items():
+                user = get_user_model().objects.create_user(
+                    username=f"bench-{rows}-{name}"
+                )
+                items = payload(rows, user, categories)
+                started = time.perf_counter()
+                engine(client, items)
+                elapsed = time.perf_counter() - started
+                assert Transaction.objects.filter(created_by=user).count() == rows
+                print(
+                    f"{rows:>9,}  {name:<8}  {elapsed:>8.2f}  {rows / elapsed:>10,.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
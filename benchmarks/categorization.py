@@ -0,0 +1,95 @@
+"""
+Benchmark auto-categorization: per-rule scan vs compiled RuleMatcher.
+
+Usage:
+
+    python -m benchmarks.categorization --rules 10 1000 10000 --rows 10000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from benchmarks.utils import setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 1_000])
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from apps.pages.categorization import RuleMatcher
+    from apps.pages.models import CategoryRule
+
+    def make_rules(count: int) -> list[CategoryRule]:
+        # Mostly keywords (merchant names), one in ten a regex (invoice refs)
+        return [
+            CategoryRule(
+                id=i,
+                category_id=i % 20 + 1,
+                pattern=rf"inv-{i:05d}\b" if i % 10 == 0 else f"shop{i:05d}",
+                match_type=(
+                    CategoryRule.MatchType.REGEX
+                    if i % 10 == 0
+                    else CategoryRule.MatchType.KEYWORD
+                ),
+            )
+            for i in range(count)
+        ]
+
+    def per_rule(rules: list[CategoryRule]):
+        compiled = [
+            (
+                re.compile(rule.pattern, re.IGNORECASE)
+                if rule.match_type == CategoryRule.MatchType.REGEX
+                else rule.pattern.casefold(),
+                rule.category_id,
+            )
+            for rule in rules
+        ]
+
+        def match(remarks: str) -> int | None:
+            text = remarks.casefold()
+            for pattern, category_id in compiled:
+                if isinstance(pattern, str):
+                    if pattern in text:
+                        return category_id
+                elif pattern.search(remarks):
+                    return category_id
+            return None
+
+        return match
+
+    engines = {"per-rule": per_rule, "compiled": lambda rules: RuleMatcher(rules).match}
+
+    random.seed(0)
+    print(
+        f"{'rules':>7}  {'engine':<8}  {'build s':>8}  {'rows/s':>10}  {'matched':>8}"
+    )
+    for count in args.rules:
+        rules = make_rules(count)
+        # About half of them matching a rule, any of them
+        remarks = [
+            f"POS purchase shop{random.randrange(count * 2):05d} "
+            f"inv-{random.randrange(count * 2):05d}"
+            for _ in range(args.rows)
+        ]
+        for name, engine in engines.items():
+            started = time.perf_counter()
+            match = engine(rules)
+            built = time.perf_counter() - started
+            started = time.perf_counter()
+            matched = sum(match(text) is not None for text in remarks)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{count:>7,}  {name:<8}  {built:>8.2f}  "
+                f"{args.rows / elapsed:>10,.0f}  {matched:>8,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark compressed CSV exports: throughput & output size per zlib level.
+
+Usage:
+
+    python -m benchmarks.compression --rows 100000 --levels 0 1 6 9
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import (
+    format_bytes,
+    seed_transactions,
+    setup_django,
+    test_database,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(10)))
+    args = parser.parse_args()
+
+    setup_django()
+
+    from apps.pages.exports import EXPORT_FORMATS, iter_row_chunks
+    from apps.pages.models import Transaction
+
+    def run(format: str, **options) -> tuple[float, int]:
+        qs = Transaction.objects.filter(created_by=user).order_by("-date_time")
+        stream = EXPORT_FORMATS[format].stream(iter_row_chunks(qs), **options)
+        started = time.perf_counter()
+        size = sum(len(block) for block in stream)
+        return time.perf_counter() - started, size
+
+    with test_database():
+        user = seed_transactions(args.rows)
+        print(
+            f"{'format':<7}  {'level':>5}  {'rows/s':>10}  {'size':>11}  {'ratio':>6}"
+        )
+
+        elapsed, csv_size = run("csv")
+        print(
+            f"{'csv':<7}  {'-':>5}  {args.rows / elapsed:>10,.0f}  "
+            f"{format_bytes(csv_size):>11}  {1:>6.2f}"
+        )
+        for format in ("csv.gz", "zip"):
+            for level in args.levels:
+                elapsed, size = run(format, compresslevel=level)
+                print(
+                    f"{format:<7}  {level:>5}  {args.rows / elapsed:>10,.0f}  "
+                    f"{format_bytes(size):>11}  {csv_size / size:>6.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
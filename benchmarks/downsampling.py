@@ -0,0 +1,74 @@
+"""
+Benchmark chart series downsampling: time, payload size & peaks kept.
+
+Usage:
+
+    python -m benchmarks.downsampling --points 100000 1000000 --max-points 2000
+"""
+
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.utils import format_bytes, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--series", type=int, default=2)
+    parser.add_argument("--max-points", type=int, default=2_000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    from apps.pages.downsampling import downsample_series
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'points':>10}  {'series':>6}  {'kept':>6}  {'downsample s':>12}  "
+        f"{'payload':>10}  {'full payload':>12}  {'peaks kept':>10}"
+    )
+    for points in args.points:
+        # Daily buckets, e.g. 1M points: one per day over ~2,700 years
+        start = date(1, 1, 1)
+        buckets = [start + timedelta(days=day) for day in range(points)]
+        series = []
+        for key in range(args.series):
+            totals = np.abs(rng.normal(100, 30, points)).round(2)
+            # A few isolated spikes, as a single large purchase would be
+            totals[rng.integers(points, size=5)] *= 50
+            series.append(
+                {
+                    "key": f"series {key}",
+                    "totals": totals.tolist(),
+                    "counts": rng.integers(1, 10, points).tolist(),
+                }
+            )
+        data = {"bucket": "day", "group_by": None, "buckets": buckets, "series": series}
+
+        started = time.perf_counter()
+        downsampled = downsample_series(data, args.max_points)
+        elapsed = time.perf_counter() - started
+
+        peaks_kept = all(
+            max(item["totals"]) == max(full["totals"])
+            and min(item["totals"]) == min(full["totals"])
+            for item, full in zip(downsampled["series"], series)
+        )
+        payload = len(json.dumps(downsampled, cls=DjangoJSONEncoder))
+        full_payload = len(json.dumps(data, cls=DjangoJSONEncoder))
+        print(
+            f"{points:>10,}  {args.series:>6}  {len(downsampled['buckets']):>6,}  "
+            f"{elapsed:>12.3f}  {format_bytes(payload):>10}  "
+            f"{format_bytes(full_payload):>12}  {str(peaks_kept):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark XLSX exports: former pandas/openpyxl path vs. write-only engine.
+
+Usage:
+
+    python -m benchmarks.exports --rows 10000 100000 1000000
+"""
+
+import argparse
+
+from benchmarks.utils import (
+    format_bytes,
+    measure,
+    seed_transactions,
+    setup_django,
+    test_database,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    import tempfile
+
+    import pandas as pd
+
+    from apps.pages.exports import (
+        EXPORT_COLUMNS,
+        EXPORT_DATETIME_FORMAT,
+        EXPORT_FIELDS,
+        iter_row_chunks,
+        write_xlsx,
+    )
+    from apps.pages.models import Transaction
+
+    def pandas_xlsx(qs) -> None:
+        with tempfile.TemporaryFile() as fileobj:
+            df = pd.DataFrame(qs.values_list(*EXPORT_FIELDS), columns=EXPORT_COLUMNS)
+            df["Datetime"] = df["Datetime"].dt.strftime(EXPORT_DATETIME_FORMAT)
+            with pd.ExcelWriter(fileobj, engine="openpyxl") as writer:
+                df.to_excel(writer, index=False)
+
+    def write_only_xlsx(qs) -> None:
+        with tempfile.TemporaryFile() as fileobj:
+            write_xlsx(iter_row_chunks(qs), fileobj)
+
+    with test_database():
+        print(f"{'rows':>9}  {'engine':<10}  {'wall time':>10}  {'peak memory':>12}")
+        for index, rows in enumerate(args.rows):
+            user = seed_transactions(rows, username=f"bench{index}")
+            qs = Transaction.objects.filter(created_by=user).order_by("-date_time")
+            for name, engine in (
+                ("pandas", pandas_xlsx),
+                ("write-only", write_only_xlsx),
+            ):
+                elapsed, peak = measure(lambda: engine(qs))
+                print(
+                    f"{rows:>9}  {name:<10}  {elapsed:>9.2f}s  {format_bytes(peak):>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the statement importer: rows/s & peak memory of CSV/XLSX imports.
+
+Usage:
+
+    python -m benchmarks.imports --rows 10000 100000
+"""
+
+import argparse
+import tempfile
+
+from benchmarks.utils import (
+    format_bytes,
+    measure,
+    seed_transactions,
+    setup_django,
+    test_database,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from apps.pages.exports import iter_row_chunks, stream_csv, write_xlsx
+    from apps.pages.imports import IMPORT_FORMATS, TransactionImporter
+    from apps.pages.models import Transaction
+
+    writers = {
+        "csv": lambda chunks, fileobj: fileobj.writelines(stream_csv(chunks)),
+        "xlsx": write_xlsx,
+    }
+
+    with test_database():
+        importer_user = get_user_model().objects.create_user(username="importer")
+        print(
+            f"{'rows':>9}  {'format':<6}  {'seconds':>8}  {'rows/s':>10}  "
+            f"{'peak memory':>12}"
+        )
+        for rows in args.rows:
+            user = seed_transactions(rows, username=f"bench-{rows}")
+            qs = Transaction.objects.filter(created_by=user)
+            for name, write in writers.items():
+                with tempfile.TemporaryFile() as fileobj:
+                    write(iter_row_chunks(qs), fileobj)
+
+                    def run() -> None:
+                        fileobj.seek(0)
+                        TransactionImporter(user=importer_user).run(
+                            IMPORT_FORMATS[name].read(fileobj)
+                        )
+
+                    elapsed, peak = measure(run)
+                print(
+                    f"{rows:>9,}  {name:<6}  {elapsed:>8.2f}  {rows / elapsed:>10,.0f}  "
+                    f"{format_bytes(peak):>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
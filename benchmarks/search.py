@@ -0,0 +1,74 @@
+"""
+Benchmark remarks search: LIKE scan vs full-text index.
+
+Usage:
+
+    python -m benchmarks.search --rows 100000 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.utils import seed_transactions, setup_django, test_database
+
+# Queries from rare to common words, as typed (prefixes) or complete.
+QUERIES = ("zzyz", "merch", "merchant9", "grab food", "groceries")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import override_settings
+
+    from apps.pages.models import Transaction
+    from apps.pages.search import SEARCH_RANK, search
+
+    words = ["groceries", "grab", "food", "parking", "salary", "rent", "coffee"]
+    merchants = [f"merchant{i}" for i in range(50_000)]
+
+    def make_remarks(rng: random.Random) -> str:
+        return " ".join([*rng.sample(words, 2), rng.choice(merchants)])
+
+    def first_page(user, query: str, ranked: bool) -> list:
+        queryset = search(Transaction.objects.filter(created_by=user), query, ranked)
+        ordering = (f"-{SEARCH_RANK}", "-id") if ranked else ("-date_time", "-id")
+        return list(queryset.order_by(*ordering).values("id")[:50])
+
+    def timed(func, repeat: int) -> float:
+        func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1000
+
+    with test_database():
+        print(
+            f"{'rows':>9}  {'query':<10}  {'like ms':>8}  {'index ms':>9}  "
+            f"{'ranked ms':>9}  {'matches':>8}"
+        )
+        for rows in args.rows:
+            user = seed_transactions(
+                rows, username=f"bench-{rows}", make_remarks=make_remarks
+            )
+            for query in QUERIES:
+                with override_settings(SEARCH_BACKEND="like"):
+                    like = timed(lambda: first_page(user, query, False), args.repeat)
+                index = timed(lambda: first_page(user, query, False), args.repeat)
+                ranked = timed(lambda: first_page(user, query, True), args.repeat)
+                matches = search(
+                    Transaction.objects.filter(created_by=user), query
+                ).count()
+                print(
+                    f"{rows:>9,}  {query:<10}  {like:>8.1f}  {index:>9.1f}  "
+                    f"{ranked:>9.1f}  {matches:>8,}"
+                )
+
+
+if __name__ == "__main__":
+    main()
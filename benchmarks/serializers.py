@@ -0,0 +1,58 @@
+"""
+Benchmark the Transactions API read path: serialize time per 10k rows.
+
+Usage:
+
+    python -m benchmarks.serializers --rows 10000 50000
+"""
+
+import argparse
+
+from benchmarks.utils import (
+    format_bytes,
+    measure,
+    seed_transactions,
+    setup_django,
+    test_database,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    args = parser.parse_args()
+
+    setup_django()
+
+    from apps.api.serializers import TransactionReadSerializer, TransactionSerializer
+    from apps.pages.models import Transaction
+
+    engines = {
+        # What `TransactionViewSet.list` used to run: one category query per row
+        "serializer": lambda qs: TransactionSerializer(qs, many=True).data,
+        "serializer+join": lambda qs: TransactionSerializer(
+            qs.select_related("category"), many=True
+        ).data,
+        "values": lambda qs: TransactionReadSerializer.many(
+            TransactionReadSerializer.values(qs)
+        ),
+    }
+
+    with test_database():
+        print(
+            f"{'rows':>9}  {'engine':<16}  {'seconds':>8}  {'s/10k rows':>10}  "
+            f"{'peak memory':>12}"
+        )
+        for rows in args.rows:
+            user = seed_transactions(rows, username=f"bench-{rows}")
+            qs = Transaction.objects.filter(created_by=user).order_by("-date_time")
+            for name, engine in engines.items():
+                elapsed, peak = measure(lambda: engine(qs))
+                print(
+                    f"{rows:>9,}  {name:<16}  {elapsed:>8.2f}  "
+                    f"{elapsed / rows * 10_000:>10.3f}  {format_bytes(peak):>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Shared helpers for the standalone benchmark scripts.
+
+Every benchmark runs against a throwaway test database (same as
+`manage.py test` would create), so the development DB is never touched.
+"""
+
+import os
+import random
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database() -> Iterator[None]:
+    """Create the test database for the duration of the block."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_transactions(
+    rows: int,
+    batch_size: int = 10_000,
+    username: str = "bench",
+    make_remarks: Callable[[random.Random], str] | None = None,
+):
+    """
+    Bulk insert `rows` random Transactions for a fresh user & return the user.
+
+    Remarks are picked off a short list, unless `make_remarks(rng)` is given.
+    """
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.pages.models import Category, Transaction
+
+    user = get_user_model().objects.create_user(username=username)
+    categories = [
+        Category.objects.get_or_create(name=name)[0]
+        for name in ("Food", "Transportation", "Health", "Entertainment", "Other")
+    ]
+    payment_types = Transaction.PaymentType.values
+    transaction_types = Transaction.TransactionType.values
+    remarks = ["Groceries", "Salary", "Bus fare", "Movie night", "Pharmacy", ""]
+    start = timezone.now() - timedelta(days=3650)
+    rng = random.Random(42)
+
+    for offset in range(0, rows, batch_size):
+        Transaction.objects.bulk_create(
+            Transaction(
+                category=rng.choice(categories),
+                amount=Decimal(rng.randint(1, 500_000)) / 100,
+                date_time=start + timedelta(seconds=rng.randint(0, 3650 * 86400)),
+                payment_type=rng.choice(payment_types),
+                transaction_type=rng.choice(transaction_types),
+                remarks=make_remarks(rng) if make_remarks else rng.choice(remarks),
+                created_by=user,
+            )
+            for _ in range(min(batch_size, rows - offset))
+        )
+    return user
+
+
+def measure(func: Callable[[], object]) -> tuple[float, int]:
+    """
+    Run `func` twice: once for wall time, once under tracemalloc for its
+    peak Python heap usage. Returns (seconds, peak bytes).
+    """
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -72,6 +72,8 @@ INSTALLED_APPS = [
     "apps.api",
     # Charts
     "apps.charts",
+    # Background jobs (exports, reports...)
+    "apps.jobs",
     # Tooling API-GEN
     "rest_framework",
     "rest_framework.authtoken",
@@ -95,7 +97,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "djangorestframework_camel_case.middleware.CamelCaseMiddleWare",
+    "apps.api.camel_case.CamelCaseMiddleWare",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -153,6 +155,34 @@ else:
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_BACKEND: "locmem" (default), "file" or "redis" (any Redis-compatible
+# server, e.g. Valkey/KeyDB/Dragonfly, given as CACHE_LOCATION=redis://...)
+# Cached data is versioned off the DB, whatever the backend; locmem keeps a
+# cache (& its hit/miss counters) per process though.
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_DEFAULT_LOCATIONS = {
+    "locmem": "finance-tracker",
+    "file": os.path.join(BASE_DIR, "cache"),
+    "redis": "redis://127.0.0.1:6379",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv("CACHE_LOCATION", CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND]),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 60 * 60)),
+        "KEY_PREFIX": "finance-tracker",
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -200,6 +230,15 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, "static"),)
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 LOGIN_REDIRECT_URL = "/"
+
+# Background jobs, run via `python manage.py run_jobs`
+JOBS_RESULT_DIR = os.getenv("JOBS_RESULT_DIR", os.path.join(BASE_DIR, "job_results"))
+JOBS_WORKER_CONCURRENCY = int(os.getenv("JOBS_WORKER_CONCURRENCY", 1))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 2))
+# Seconds without a heartbeat before a running Job counts as dead (failed)
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", 900))
+# Days finished Jobs & their result files are kept
+JOBS_RESULT_DAYS = int(os.getenv("JOBS_RESULT_DAYS", 7))
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 ########################################
@@ -210,12 +249,10 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.TokenAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
-        "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
-    ),
-    "DEFAULT_PARSER_CLASSES": (
-        "djangorestframework_camel_case.parser.CamelCaseJSONParser",
+        "apps.api.camel_case.CamelCaseJSONRenderer",
+        "apps.api.camel_case.CamelCaseBrowsableAPIRenderer",
     ),
+    "DEFAULT_PARSER_CLASSES": ("apps.api.camel_case.CamelCaseJSONParser",),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
@@ -223,6 +260,24 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Default & upper bound of the `?page_size=` API clients may ask for
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 50))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 500))
+# Upper bound of the items of one `POST /api/transactions/bulk/`
+API_BULK_MAX_ITEMS = int(os.getenv("API_BULK_MAX_ITEMS", 10_000))
+# Default & upper bound of the changes of one `GET /api/transactions/sync/`
+API_SYNC_BATCH_SIZE = int(os.getenv("API_SYNC_BATCH_SIZE", 1000))
+# Days tombstones of deleted Transactions are kept for delta sync clients,
+# see `apps.pages.sync` & the `prune_tombstones` command
+SYNC_TOMBSTONE_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", 90))
+
+# Default & upper bound of the `?max_points=` per chart series, see
+# `apps.pages.downsampling`
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", 2000))
+
+# Remarks search: "auto" (full-text index of the database engine) or "like"
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
 ###############################################################################
 # OPENAPI SCHEMA / API DOCS
 ###############################################################################